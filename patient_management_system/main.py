@@ -1,10 +1,16 @@
-from utils.helpers import clear_screen
+from utils.helpers import clear_screen, recover_transactions
+from utils.expiry import sweep_expired
 from modules.login import login, register, reset_password
 from modules.admin import admin_menu
 from modules.patient import patient_menu
 
 
 def main():
+    # finish any booking/cancellation interrupted by a crash
+    recover_transactions()
+    # mark appointments that have already taken place as attended
+    sweep_expired()
+
     while True:
         clear_screen()
         print("\n===== Monash Patient Management System =====")
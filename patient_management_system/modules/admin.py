@@ -6,10 +6,25 @@ from utils.helpers import (
     is_valid_email,
     load_csv_data,
     save_csv_data,
+    append_csv_row,
+    append_csv_rows,
+    update_csv_field,
+    update_csv_fields,
+    Transaction,
     get_next_id,
+    reserve_ids,
+    data_lock,
     is_valid_date_format  # newly needed for date prompts
 )
-from modules.report_generator import generate_clinic_report, generate_gp_report
+from utils import data_store
+from utils.pager import Pager
+from utils.slot_index import SlotConflicts, normalize_time
+from utils.roster import parse_hours, generate_roster
+from utils.slot_stats import SlotColumns, slot_statistics
+from utils.slots import slot_of_appointment
+from utils.filters import RecordFilter
+from utils.expiry import sweep_if_due
+from modules.report_generator import generate_clinic_report, generate_gp_report, export_analytics_data
 from datetime import datetime
 
 
@@ -25,12 +40,14 @@ NOTIFICATIONS_FILE = os.path.join(DATA_DIR, 'notifications.csv')
 def admin_menu():
     """Main administrator menu"""
     while True:
+        sweep_if_due()
         choice = display_menu("Administrator Menu", [
             "Manage Clinics",
             "Manage GPs",
             "Manage GP Appointment Slots",
             "Generate Clinic Report",
             "Generate GP Report",
+            "Export Data for Analytics",
             "Cancel Appointment",
             "Logout"
         ])
@@ -46,8 +63,10 @@ def admin_menu():
         elif choice == 5:
             generate_gp_report()
         elif choice == 6:
+            export_analytics_data()
+        elif choice == 7:
             cancel_appointment_admin()
-        elif choice == 7 or choice == 8:
+        elif choice == 8 or choice == 9:
             return  # Return to login screen
 
 def manage_clinics():
@@ -93,9 +112,6 @@ def add_clinic():
     clear_screen()
     print("\n===== Add New Clinic =====")
     
-    clinics = load_csv_data(CLINICS_FILE)
-    new_id = get_next_id(clinics)
-    
     # Get clinic details with validation
     name = input_with_validation("Enter clinic name: ", 
                                 lambda x: x.strip() != "", 
@@ -113,17 +129,18 @@ def add_clinic():
     
     # Create new clinic record
     new_clinic = {
-        'id': new_id,
+        'id': None,  # allocated when the clinic is saved
         'name': name,
         'location': location,
         'services': services,
         'operating_hours': operating_hours
     }
     
-    clinics.append(new_clinic)
-    
-    # Save updated clinics list
-    if save_csv_data(CLINICS_FILE, clinics, new_clinic.keys()):
+    # Append the new clinic
+    with data_lock():
+        new_clinic['id'] = get_next_id(CLINICS_FILE)
+        saved = append_csv_row(CLINICS_FILE, new_clinic, new_clinic.keys())
+    if saved:
         print("\n Clinic added successfully!")
     else:
         print("\n Failed to add clinic.")
@@ -167,8 +184,9 @@ def update_clinic():
         input("\nPress Enter to continue...")
         return
 
-    # 保存修改前的 clinic_id
+    # 保存修改前的 clinic_id 和字段值
     old_id = clinic_to_update['id']
+    original = dict(clinic_to_update)
 
     # Begin editing fields
     print(f"\nUpdating clinic: {clinic_to_update['name']}")
@@ -212,8 +230,13 @@ def update_clinic():
     # Update the clinic in the list
     clinics[clinic_index] = clinic_to_update
 
-    # Save updated clinics list
-    if save_csv_data(CLINICS_FILE, clinics, clinic_to_update.keys()):
+    # Save only the changed fields (keeps the search index current); a new ID rewrites the table
+    if old_id != clinic_to_update['id']:
+        saved = save_csv_data(CLINICS_FILE, clinics, clinic_to_update.keys())
+    else:
+        saved = update_csv_fields(CLINICS_FILE, [(old_id, field, value) for field, value in clinic_to_update.items()
+                                                 if original.get(field) != value])
+    if saved:
         print("\nClinic updated successfully!")
     else:
         print("\nFailed to update clinic.")
@@ -355,16 +378,14 @@ def add_doctor():
     clear_screen()
     print("\n===== Add New GP =====")
     
-    doctors = load_csv_data(DOCTORS_FILE)
-    clinics = load_csv_data(CLINICS_FILE)
+    doctors = data_store.get_rows(DOCTORS_FILE)
+    clinics = data_store.get_rows(CLINICS_FILE)
     
     if not clinics:
         print(" No clinics available. Please add a clinic first.")
         input("\nPress Enter to continue...")
         return
     
-    new_id = get_next_id(doctors)
-    
     # Get doctor details with validation
     full_name = input_with_validation("Enter full name (with title, e.g., Dr. John Smith): ", 
                                      lambda x: x.strip() != "" and x.strip().startswith("Dr."), 
@@ -401,7 +422,7 @@ def add_doctor():
     
     # Create new doctor record
     new_doctor = {
-        'id': new_id,
+        'id': None,  # allocated when the GP is saved
         'full_name': full_name,
         'email': email,
         'clinic_id': clinic_id,
@@ -409,10 +430,11 @@ def add_doctor():
         'availability': availability
     }
     
-    doctors.append(new_doctor)
-    
-    # Save updated doctors list
-    if save_csv_data(DOCTORS_FILE, doctors, new_doctor.keys()):
+    # Append the new doctor
+    with data_lock():
+        new_doctor['id'] = get_next_id(DOCTORS_FILE)
+        saved = append_csv_row(DOCTORS_FILE, new_doctor, new_doctor.keys())
+    if saved:
         print("\n GP added successfully!")
     else:
         print("\n Failed to add GP.")
@@ -452,7 +474,6 @@ def update_doctor():
     for i, doctor in enumerate(doctors):
         if doctor['id'] == doctor_id:
             doctor_to_update = doctor
-            doctor_index = i
             break
     
     if doctor_to_update is None:
@@ -461,6 +482,7 @@ def update_doctor():
         return
     
     # Update doctor details
+    original = dict(doctor_to_update)
     print(f"\nUpdating GP: {doctor_to_update['full_name']}")
     
     full_name = input_with_validation(f"Enter new name (current: {doctor_to_update['full_name']}) or press Enter to keep current: ", 
@@ -502,11 +524,9 @@ def update_doctor():
     if availability:
         doctor_to_update['availability'] = availability
     
-    # Update the doctor in the list
-    doctors[doctor_index] = doctor_to_update
-    
-    # Save updated doctors list
-    if save_csv_data(DOCTORS_FILE, doctors, doctor_to_update.keys()):
+    # Save only the changed fields (keeps the search index current)
+    if update_csv_fields(DOCTORS_FILE, [(doctor_id, field, value) for field, value in doctor_to_update.items()
+                                        if original.get(field) != value]):
         print("\n GP updated successfully!")
     else:
         print("\n Failed to update GP.")
@@ -595,22 +615,15 @@ def cancel_appointment_admin():
     print("\n===== Admin: Cancel Appointment =====")
 
     print(f"Loading appointments from: {APPOINTMENTS_FILE}")
-    appointments = load_csv_data(APPOINTMENTS_FILE)
-    print(f"  → {len(appointments)} rows loaded")
-    doctors   = load_csv_data(DOCTORS_FILE)
-    clinics   = load_csv_data(CLINICS_FILE)
-    users     = load_csv_data(USERS_FILE)
+    by_start = data_store.get_date_index(APPOINTMENTS_FILE)
+    print(f"  → {len(by_start)} rows loaded")
+    doctor_lookup = data_store.get_lookup(DOCTORS_FILE)
+    clinic_lookup = data_store.get_lookup(CLINICS_FILE)
 
+    # 只看未来的预约：按时间排序的索引上二分查找
     now = datetime.now()
-    upcoming = []
-    for appt in appointments:
-        dt_str = f"{appt.get('date','')} {appt.get('time','')}"
-        try:
-            appt_dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-        except ValueError:
-            continue
-        if appt.get('status','').strip().lower() == 'confirmed' and appt_dt > now:
-            upcoming.append(appt)
+    upcoming = [appt for appt in by_start.after(now)
+                if appt.get('status','').strip().lower() == 'confirmed']
 
     if not upcoming:
         print("No upcoming confirmed appointments to cancel.")
@@ -620,8 +633,8 @@ def cancel_appointment_admin():
     print(f"\n{'#':<3} {'Patient':<25} {'GP':<25} {'Date':<12} {'Time':<6} {'Clinic':<20}")
     print("-" * 95)
     for i, appt in enumerate(upcoming, start=1):
-        doc = next((d for d in doctors if d['id'] == appt['doctor_id']), {})
-        cli = next((c for c in clinics if c['id'] == appt['clinic_id']), {})
+        doc = doctor_lookup.get(appt['doctor_id'], {})
+        cli = clinic_lookup.get(appt['clinic_id'], {})
         print(f"{i:<3} {appt['patient_email']:<25} {doc.get('full_name',''):<25} "
               f"{appt['date']:<12} {appt['time']:<6} {cli.get('name',''):<20}")
 
@@ -640,44 +653,33 @@ def cancel_appointment_admin():
         input("\nPress Enter to continue...")
         return
 
-    # 修改 appointment 状态
-    for appt in appointments:
-        if appt['id'] == selected['id']:
-            appt['status'] = 'cancelled by clinic'
-            break
+    # 修改 appointment 状态，恢复对应 slot 为可用，并写入通知中心（同一事务）
+    txn = Transaction()
+    txn.update(APPOINTMENTS_FILE, selected['id'], 'status', 'cancelled by clinic', expected='confirmed')
+    slot = slot_of_appointment(selected)
+    if slot is not None:
+        txn.update(SLOTS_FILE, slot['id'], 'status', 'available')
 
-    if save_csv_data(APPOINTMENTS_FILE, appointments, appointments[0].keys()):
-        # 恢复对应 slot 为可用
-        slots = load_csv_data(SLOTS_FILE)
-        for slot in slots:
-            if (slot['doctor_id'] == selected['doctor_id'] and
-                slot['date']      == selected['date'] and
-                slot['time']      == selected['time']):
-                slot['status'] = 'available'
-                break
-        save_csv_data(SLOTS_FILE, slots, slots[0].keys())
-
-        # ── 写入通知中心 ──
-        # 根据 patient_email 找到用户 ID
-        patient = next((u for u in users if u.get('email') == selected['patient_email']), {})
-        user_id = patient.get('id', selected['patient_email'])
-        notifs = load_csv_data(NOTIFICATIONS_FILE)
-        notifs.append({
+    # 根据 patient_email 找到用户 ID
+    patient = data_store.get_lookup(USERS_FILE, 'email').get(selected['patient_email'], {})
+    user_id = patient.get('id', selected['patient_email'])
+    txn.append(
+        NOTIFICATIONS_FILE,
+        [{
             'user_id':   user_id,
             'message':   f"Your appointment {selected['date']} {selected['time']} has been canceled by clinic",
             'timestamp': now.strftime("%Y-%m-%d %H:%M"),
             'read':      'False'
-        })
-        save_csv_data(
-            NOTIFICATIONS_FILE,
-            notifs,
-            notifs[0].keys() if notifs else ['user_id','message','timestamp','read']
-        )
+        }],
+        ['user_id', 'message', 'timestamp', 'read']
+    )
+
+    if txn.commit():
 
         # 显示取消确认
         clear_screen()
-        doc = next((d for d in doctors if d['id'] == selected['doctor_id']), {})
-        cli = next((c for c in clinics if c['id'] == selected['clinic_id']), {})
+        doc = doctor_lookup.get(selected['doctor_id'], {})
+        cli = clinic_lookup.get(selected['clinic_id'], {})
         print(f"\nNotification sent to patient {selected['patient_email']}")
         print("\nCancellation Details:")
         print(f"GP     : {doc.get('full_name','Unknown')}")
@@ -685,6 +687,9 @@ def cancel_appointment_admin():
         print(f"Time   : {selected['time']}")
         print(f"Clinic : {cli.get('name','Unknown')}")
         input("\nPress Enter to continue...")
+    elif txn.conflicts:
+        print("This appointment has already been cancelled.")
+        input("\nPress Enter to continue...")
     else:
         print("Failed to cancel appointment. Please try again.")
         input("\nPress Enter to continue...")
@@ -696,6 +701,7 @@ def manage_gp_slots():
         choice = display_menu("Manage GP Appointment Slots", [
             "View GP Slots",
             "Add New Slots",
+            "Generate Slots from GP Availability",
             "Update Slot Duration",
             "View Slot Statistics",
             "Return to Admin Menu"
@@ -706,10 +712,12 @@ def manage_gp_slots():
         elif choice == 2:
             add_new_slots()
         elif choice == 3:
-            update_slot_duration()
+            generate_roster_slots()
         elif choice == 4:
+            update_slot_duration()
+        elif choice == 5:
             view_slot_statistics()
-        elif choice == 5 or choice == 6:
+        elif choice == 6 or choice == 7:
             return
 
 def view_gp_slots():
@@ -717,14 +725,14 @@ def view_gp_slots():
     clear_screen()
     print("\n===== View GP Appointment Slots =====")
     
-    # 加载数据
-    slots = load_csv_data(SLOTS_FILE)
-    doctors = load_csv_data(DOCTORS_FILE)
-    clinics = load_csv_data(CLINICS_FILE)
+    # 加载数据（缓存，只读）
+    slots = data_store.get_rows(SLOTS_FILE)
+    doctors = data_store.get_rows(DOCTORS_FILE)
+    clinics = data_store.get_rows(CLINICS_FILE)
     
     # 创建查找字典
-    doctor_lookup = {doc['id']: doc for doc in doctors}
-    clinic_lookup = {clinic['id']: clinic for clinic in clinics}
+    doctor_lookup = data_store.get_lookup(DOCTORS_FILE)
+    clinic_lookup = data_store.get_lookup(CLINICS_FILE)
     
     # 显示筛选选项
     print("\nFilter Options:")
@@ -739,7 +747,7 @@ def view_gp_slots():
         "Please enter a valid choice (1-4)"
     ) 
     
-    filtered_slots = slots
+    slot_filter = RecordFilter()
     
     if filter_choice == '1':
         # 显示所有GP
@@ -752,7 +760,7 @@ def view_gp_slots():
             lambda x: x in [doc['id'] for doc in doctors],
             "Please enter a valid GP ID"
         )
-        filtered_slots = [slot for slot in slots if slot['doctor_id'] == gp_id]
+        slot_filter = slot_filter.where(doctor_id=gp_id)
 
     elif filter_choice == '4':
         return  # 返回上级菜单
@@ -778,27 +786,30 @@ def view_gp_slots():
             f"Please enter a number between 1 and {len(suburb_list)}"
         )
         
-        selected_suburb = suburb_list[int(suburb_choice) - 1]
-        clinic_ids = [c['id'] for c in clinics if selected_suburb.lower() in c.get('location', '').lower()]
-        filtered_slots = [slot for slot in slots if slot['clinic_id'] in clinic_ids]
+        slot_filter = slot_filter.where(suburb=suburb_list[int(suburb_choice) - 1])
     
-    # 显示筛选后的时段
-    if not filtered_slots:
+    # 按GP筛选时先用索引取该GP的时段，其余条件一次筛完
+    if slot_filter.doctor_id:
+        slots = data_store.get_index(SLOTS_FILE, 'doctor_id').get(slot_filter.doctor_id, [])
+    filtered_slots = slot_filter.apply(slots)
+    
+    # 显示筛选后的时段（分页）
+    def format_slot(slot):
+        doctor = doctor_lookup.get(slot['doctor_id'], {})
+        clinic = clinic_lookup.get(slot['clinic_id'], {})
+        return (f"{slot['date']:<12} {slot['time']:<8} {slot['duration']+'min':<10} "
+                f"{doctor.get('full_name', 'Unknown'):<25} "
+                f"{clinic.get('name', 'Unknown'):<25} "
+                f"{slot['status']:<15}")
+
+    pager = Pager(filtered_slots, "GP Appointment Slots",
+                  f"{'Date':<12} {'Time':<8} {'Duration':<10} {'GP':<25} {'Clinic':<25} {'Status':<15}",
+                  format_slot)
+    if pager.is_empty():
         print("\nNo slots found matching your criteria.")
+        input("\nPress Enter to continue...")
     else:
-        print(f"\n{'Date':<12} {'Time':<8} {'Duration':<10} {'GP':<25} {'Clinic':<25} {'Status':<15}")
-        print("-" * 95)
-        
-        for slot in filtered_slots:
-            doctor = doctor_lookup.get(slot['doctor_id'], {})
-            clinic = clinic_lookup.get(slot['clinic_id'], {})
-            
-            print(f"{slot['date']:<12} {slot['time']:<8} {slot['duration']+'min':<10} "
-                  f"{doctor.get('full_name', 'Unknown'):<25} "
-                  f"{clinic.get('name', 'Unknown'):<25} "
-                  f"{slot['status']:<15}")
-    
-    input("\nPress Enter to continue...")
+        pager.run()
 
 def add_new_slots():
     """添加新的预约时段"""
@@ -806,9 +817,8 @@ def add_new_slots():
     print("\n===== Add New Appointment Slots =====")
     
     # 加载数据
-    doctors = load_csv_data(DOCTORS_FILE)
-    clinics = load_csv_data(CLINICS_FILE)
-    slots = load_csv_data(SLOTS_FILE)
+    doctors = data_store.get_rows(DOCTORS_FILE)
+    clinics = data_store.get_rows(CLINICS_FILE)
     
     # 选择GP
     print("\nAvailable GPs:")
@@ -863,6 +873,7 @@ def add_new_slots():
     print("\nEnter time slots (24-hour format, e.g., 09:00, 10:00):")
     print("Enter times separated by commas, or 'done' to finish")
     
+    conflicts = SlotConflicts(data_store.get_index(SLOTS_FILE, 'doctor_id', 'date'))
     new_slots = []
     while True:
         time_input = input("\nEnter time (or 'done'): ").strip()
@@ -878,19 +889,16 @@ def add_new_slots():
                 print(f"Invalid time format: {time}. Please use HH:MM format.")
                 continue
             
-            # 检查是否与现有时段冲突
-            conflict = False
-            for existing_slot in slots:
-                if (existing_slot['doctor_id'] == gp_id and
-                    existing_slot['date'] == date and
-                    existing_slot['time'] == time):
-                    print(f"Conflict: Slot already exists at {time}")
-                    conflict = True
-                    break
-            
-            if not conflict:
+            # 检查是否与现有时段（含本批次）冲突
+            clash = conflicts.find(gp_id, date, time, duration)
+            if clash == normalize_time(time):
+                print(f"Conflict: Slot already exists at {time}")
+            elif clash:
+                print(f"Conflict: {time} overlaps the slot at {clash}")
+            else:
+                conflicts.add(gp_id, date, time, duration)
                 new_slot = {
-                    'id': str(get_next_id(slots)),
+                    'id': None,  # allocated below as one range
                     'doctor_id': gp_id,
                     'clinic_id': clinic_id,
                     'date': date,
@@ -902,8 +910,11 @@ def add_new_slots():
                 print(f"Time slot {time} successfully added.")  # 添加反馈消息
     
     if new_slots:
-        slots.extend(new_slots)
-        if save_csv_data(SLOTS_FILE, slots, slots[0].keys()):
+        with data_lock():
+            for new_slot, slot_id in zip(new_slots, reserve_ids(SLOTS_FILE, len(new_slots))):
+                new_slot['id'] = slot_id
+            saved = append_csv_rows(SLOTS_FILE, new_slots, new_slots[0].keys())
+        if saved:
             print(f"\nSuccessfully added {len(new_slots)} new slots!")
         else:
             print("\nFailed to save new slots.")
@@ -912,14 +923,63 @@ def add_new_slots():
     
     input("\nPress Enter to continue...")
 
+def generate_roster_slots():
+    """按GP的可用时间批量生成预约时段"""
+    clear_screen()
+    print("\n===== Generate Slots from GP Availability =====")
+    
+    doctors = data_store.get_rows(DOCTORS_FILE)
+    clinic_lookup = data_store.get_lookup(CLINICS_FILE)
+    
+    print(f"\n{'ID':<4} {'GP':<25} {'Availability':<35} {'Clinic Hours':<35}")
+    print("-" * 100)
+    for doc in doctors:
+        hours = clinic_lookup.get(doc['clinic_id'], {}).get('operating_hours', '')
+        note = "" if parse_hours(doc.get('availability')) else "  (not recognised, skipped)"
+        print(f"{doc['id']:<4} {doc['full_name']:<25} {doc.get('availability', ''):<35} {hours:<35}{note}")
+    
+    gp_input = input_with_validation(
+        "\nEnter GP IDs separated by commas, or 'all': ",
+        lambda x: x.lower() == 'all' or all(
+            i.strip() in [doc['id'] for doc in doctors] for i in x.split(',')),
+        "Please enter valid GP IDs or 'all'"
+    )
+    doctor_ids = None if gp_input.lower() == 'all' else {i.strip() for i in gp_input.split(',')}
+    
+    date_from = input_with_validation(
+        "Enter start date (YYYY-MM-DD): ",
+        is_valid_date_format,
+        "Please enter a valid date format (YYYY-MM-DD)"
+    )
+    date_to = input_with_validation(
+        "Enter end date (YYYY-MM-DD): ",
+        lambda x: is_valid_date_format(x) and x >= date_from,
+        "Please enter a valid date (YYYY-MM-DD) on or after the start date"
+    )
+    
+    duration_map = {'1': 15, '2': 25, '3': 40, '4': 60}
+    duration_choice = input_with_validation(
+        "Slot duration - 1. 15 min  2. 25 min  3. 40 min  4. 60 min: ",
+        lambda x: x in duration_map,
+        "Please enter a valid choice (1-4)"
+    )
+    
+    result = generate_roster(date_from, date_to, doctor_ids, duration_map[duration_choice])
+    if result is None:
+        print("\nFailed to save the generated slots.")
+    else:
+        created, skipped = result
+        print(f"\nCreated {created} new slots ({skipped} skipped as they already exist or overlap).")
+    
+    input("\nPress Enter to continue...")
+
 def update_slot_duration():
     """更新预约时段时长"""
     clear_screen()
     print("\n===== Update Slot Duration =====")
     
-    # 加载数据
-    slots = load_csv_data(SLOTS_FILE)
-    doctors = load_csv_data(DOCTORS_FILE)
+    # 加载数据（缓存，只读）
+    doctors = data_store.get_rows(DOCTORS_FILE)
     
     # 选择GP
     print("\nAvailable GPs:")
@@ -937,7 +997,7 @@ def update_slot_duration():
         return  # 返回上级菜单或退出当前操作
     
     # 显示该GP的所有时段
-    gp_slots = [slot for slot in slots if slot['doctor_id'] == gp_id]
+    gp_slots = data_store.get_index(SLOTS_FILE, 'doctor_id').get(gp_id, [])
     if not gp_slots:
         print("\nNo slots found for this GP.")
         input("\nPress Enter to continue...")
@@ -984,17 +1044,11 @@ def update_slot_duration():
     new_duration = duration_map[duration_choice]
     
     # 更新时段
-    updated = False
-    for slot in slots:
-        if (slot['doctor_id'] == gp_id and
-            slot['date'] == date and
-            slot['time'] == time):
-            slot['duration'] = new_duration
-            updated = True
-            break
+    day_slots = data_store.select(SLOTS_FILE, doctor_id=gp_id, date=date)
+    slot = next((s for s in day_slots if s['time'] == time), None)
     
-    if updated:
-        if save_csv_data(SLOTS_FILE, slots, slots[0].keys()):
+    if slot is not None:
+        if update_csv_field(SLOTS_FILE, slot['id'], 'duration', new_duration):
             print("\nSlot duration updated successfully!")
         else:
             print("\nFailed to update slot duration.")
@@ -1008,58 +1062,28 @@ def view_slot_statistics():
     clear_screen()
     print("\n===== Slot Statistics =====")
     
-    # 加载数据
-    slots = load_csv_data(SLOTS_FILE)
-    doctors = load_csv_data(DOCTORS_FILE)
-    clinics = load_csv_data(CLINICS_FILE)
-    
-    # 创建查找字典
-    doctor_lookup = {doc['id']: doc for doc in doctors}
-    clinic_lookup = {clinic['id']: clinic for clinic in clinics}
+    # 加载数据（缓存，只读）；时段表按列编码，一次遍历统计
+    doctor_lookup = data_store.get_lookup(DOCTORS_FILE)
+    clinic_lookup = data_store.get_lookup(CLINICS_FILE)
+    columns = data_store.get_maintained(SLOTS_FILE, 'columns', SlotColumns)
+    gp_stats, suburb_stats = slot_statistics(columns, clinic_lookup)
     
     # 按GP统计
     print("\nStatistics by GP:")
     print(f"{'GP Name':<25} {'Total Slots':<15} {'Available':<15} {'Booked':<15}")
     print("-" * 70)
     
-    gp_stats = {}
-    for slot in slots:
-        gp_id = slot['doctor_id']
-        if gp_id not in gp_stats:
-            gp_stats[gp_id] = {'total': 0, 'available': 0, 'booked': 0}
-        
-        gp_stats[gp_id]['total'] += 1
-        if slot['status'] == 'available':
-            gp_stats[gp_id]['available'] += 1
-        else:
-            gp_stats[gp_id]['booked'] += 1
-    
-    for gp_id, stats in gp_stats.items():
+    for gp_id, (total, available) in gp_stats.items():
         gp_name = doctor_lookup.get(gp_id, {}).get('full_name', 'Unknown')
-        print(f"{gp_name:<25} {stats['total']:<15} {stats['available']:<15} {stats['booked']:<15}")
+        print(f"{gp_name:<25} {total:<15} {available:<15} {total - available:<15}")
     
     # 按诊所区域统计
     print("\nStatistics by Clinic Suburb:")
     print(f"{'Suburb':<25} {'Total Slots':<15} {'Available':<15} {'Booked':<15}")
     print("-" * 70)
     
-    suburb_stats = {}
-    for slot in slots:
-        clinic = clinic_lookup.get(slot['clinic_id'], {})
-        location = clinic.get('location', '')
-        suburb = location.split(',')[0] if ',' in location else location
-        
-        if suburb not in suburb_stats:
-            suburb_stats[suburb] = {'total': 0, 'available': 0, 'booked': 0}
-        
-        suburb_stats[suburb]['total'] += 1
-        if slot['status'] == 'available':
-            suburb_stats[suburb]['available'] += 1
-        else:
-            suburb_stats[suburb]['booked'] += 1
-    
-    for suburb, stats in suburb_stats.items():
-        print(f"{suburb:<25} {stats['total']:<15} {stats['available']:<15} {stats['booked']:<15}")
+    for suburb, (total, available) in suburb_stats.items():
+        print(f"{suburb:<25} {total:<15} {available:<15} {total - available:<15}")
     
     input("\nPress Enter to continue...")
 
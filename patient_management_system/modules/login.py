@@ -1,7 +1,10 @@
 import os
-import csv
 from datetime import datetime
-from utils.helpers import clear_screen, input_with_validation, is_valid_email, validate_password, log_login_event
+from utils.helpers import clear_screen, input_with_validation, is_valid_email, validate_password
+from utils.login_log import log_login_event
+from utils.helpers import append_csv_row
+from utils.users import find_user, set_password
+from utils.passwords import hash_password, verify_password, needs_rehash
 
 DATA_DIR = '../data'
 USERS_FILE = os.path.join(DATA_DIR, 'users.csv')
@@ -28,35 +31,24 @@ def login():
 
 
 def authenticate(email, password):
-    users = load_users()
-    for user in users:
-        if user['email'].lower() == email.lower() and user['password'] == password:
-            return user
-    return None
-
-
-def load_users():
-    users = []
-    try:
-        with open(USERS_FILE, 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                users.append(row)
-    except FileNotFoundError:
-        print(f"User data file not found at {USERS_FILE}. Please ensure the file exists.")
-    return users
+    user = find_user(email)
+    if not user or not verify_password(password, user['password']):
+        return None
+    if needs_rehash(user['password']):
+        # plaintext or an old cost: store a fresh hash now that the password is known
+        set_password(user['email'], hash_password(password))
+    return dict(user)
 
 
 def register():
     clear_screen()
     print("\n===== Patient Registration =====")
-    users = load_users()
 
     # email校验允许student和staff邮箱
     email = input_with_validation("Enter Monash email (@student.monash.edu or @monash.edu): ",
                                   lambda x: is_valid_email(x) and (x.endswith('@student.monash.edu') or x.endswith('@monash.edu')),
                                   "❌ Invalid email. Must be Monash email.")
-    if any(u['email'].lower() == email.lower() for u in users):
+    if find_user(email):
         print("\n❌ Email already registered.")
         input("\nPress Enter to continue...")
         return
@@ -78,7 +70,7 @@ def register():
 
     new_user = {
         'email': email,
-        'password': password,
+        'password': hash_password(password),
         'role': 'patient',
         'first_name': first_name,
         'last_name': last_name,
@@ -88,8 +80,7 @@ def register():
         'address': address
     }
 
-    users.append(new_user)
-    save_users(users, new_user.keys())
+    append_csv_row(USERS_FILE, new_user, new_user.keys())
     print("\n✅ Registration successful! Please return to the main menu to log in.")
     input("\nPress Enter to continue...")
 
@@ -97,29 +88,22 @@ def register():
 def reset_password():
     clear_screen()
     print("\n===== Password Reset =====")
-    users = load_users()
     email = input_with_validation("Enter registered email: ", is_valid_email, "Invalid email.")
-    for user in users:
-        if user['email'].lower() == email.lower():
-            new_password = input_with_validation("Enter new password (≥8 chars, 1 uppercase, 1 number): ",
-                                                 validate_password,
-                                                 "❌ Weak password.")
-            user['password'] = new_password
-            save_users(users, user.keys())
+    user = find_user(email)
+    if user:
+        new_password = input_with_validation("Enter new password (≥8 chars, 1 uppercase, 1 number): ",
+                                             validate_password,
+                                             "❌ Weak password.")
+        if set_password(user['email'], hash_password(new_password)):
             print("\n✅ Password reset successful!")
-            input("\nPress Enter to continue...")
-            return
+        else:
+            print("\n❌ Failed to reset password. Please try again.")
+        input("\nPress Enter to continue...")
+        return
     print("\n❌ Email not found.")
     input("\nPress Enter to continue...")
 
 
-def save_users(users, fieldnames):
-    with open(USERS_FILE, 'w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(users)
-
-
 # === 新增辅助校验函数 ===
 
 def is_valid_dob(dob_str):
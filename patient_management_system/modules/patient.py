@@ -1,6 +1,14 @@
 import os
 from utils.helpers import clear_screen, display_menu, input_with_validation
 from utils.helpers import is_valid_date_format, load_csv_data, save_csv_data, get_next_id
+from utils.helpers import Transaction, data_lock
+from utils import data_store
+from utils.pager import Pager
+from utils.timeline import get_patient_timeline
+from utils.filters import RecordFilter
+from utils.search_index import doctor_search, clinic_search, suburb_of
+from utils.slots import slot_of_appointment
+from utils.expiry import sweep_if_due
 from datetime import datetime, timedelta
 
 
@@ -15,6 +23,7 @@ NOTIFICATIONS_FILE = os.path.join(DATA_DIR, 'notifications.csv')
 def patient_menu(patient_email):
     """Main patient menu"""
     while True:
+        sweep_if_due()
         choice = display_menu("Patient Menu", [
             "Book Appointment",
             "View My Appointments",
@@ -135,19 +144,14 @@ def book_appointment(patient_email):
     clear_screen()
     print("\n===== Book New Appointment =====")
     
-    # Load required data
-    slots = load_csv_data(SLOTS_FILE)
-    doctors = load_csv_data(DOCTORS_FILE)
-    clinics = load_csv_data(CLINICS_FILE)
+    # Load required data (cached, read-only)
+    doctor_lookup = data_store.get_lookup(DOCTORS_FILE)
+    clinic_lookup = data_store.get_lookup(CLINICS_FILE)
     
-    # Create lookup dictionaries
-    doctor_lookup = {doc['id']: doc for doc in doctors}
-    clinic_lookup = {clinic['id']: clinic for clinic in clinics}
+    # Available slots, bucketed by doctor, clinic and date
+    availability = data_store.get_slot_availability(SLOTS_FILE)
     
-    # Filter only available slots
-    available_slots = [slot for slot in slots if slot['status'] == 'available']
-    
-    if not available_slots:
+    if not len(availability):
         print("No available appointment slots found.")
         input("\nPress Enter to continue...")
         return
@@ -164,102 +168,75 @@ def book_appointment(patient_email):
     filter_method = input("\nEnter your choice (1-4): ").strip()
     
     # 初始化筛选条件
-    doctor_filter = ""
-    date_filter = ""
-    suburb_filter = ""
+    slot_filter = RecordFilter()
     
     # 根据用户选择获取相应的筛选条件
     if filter_method == "1":
         # 显示可用医生
         print("\nAvailable GPs:")
-        unique_doctors = set(slot['doctor_id'] for slot in available_slots)
-        for doc_id in unique_doctors:
+        for doc_id in availability.doctor_ids():
             if doc_id in doctor_lookup:
                 doctor = doctor_lookup[doc_id]
                 print(f"{doc_id}: {doctor['full_name']} ({doctor['specialty']})")
                 
-        doctor_filter = input("\nEnter GP ID (or press Enter for all): ").strip()
+        slot_filter = slot_filter.where(doctor_id=input("\nEnter GP ID (or press Enter for all): ").strip())
     elif filter_method == "2":
+        print(f"\nSlots are available from {availability.dates[0]} to {availability.dates[-1]}.")
         date_filter = input("\nEnter date (YYYY-MM-DD): ").strip()
         # 验证日期格式
         if date_filter and not is_valid_date_format(date_filter):
             print("Invalid date format. Using format YYYY-MM-DD.")
             date_filter = ""
+        slot_filter = slot_filter.on_date(date_filter)
     elif filter_method == "3":
         # 显示可用诊所和区域
         print("\nAvailable Clinic Suburbs:")
-        unique_clinics = set(slot['clinic_id'] for slot in available_slots)
-        for clinic_id in unique_clinics:
+        for clinic_id in availability.clinic_ids():
             if clinic_id in clinic_lookup:
                 location = clinic_lookup[clinic_id].get('location', '')
                 suburb = location.split(',')[0] if ',' in location else location
                 print(f"{clinic_id}: {suburb}")
                 
-        suburb_filter = input("\nEnter Clinic ID: ").strip()
+        slot_filter = slot_filter.where(clinic_id=input("\nEnter Clinic ID: ").strip())
     elif filter_method == "4":
         pass  # 不进行筛选
     else:
         print("Invalid choice. Showing all available slots.")
     
-    # 应用筛选条件
-    filtered_slots = available_slots
-    if doctor_filter:
-        filtered_slots = [slot for slot in filtered_slots if slot['doctor_id'] == doctor_filter]
-    if date_filter:
-        filtered_slots = [slot for slot in filtered_slots if slot['date'] == date_filter]
-    if suburb_filter:
-        filtered_slots = [slot for slot in filtered_slots if slot['clinic_id'] == suburb_filter]
+    # 应用筛选条件：先用可用时段索引缩小范围，再按其余条件一次筛完
+    candidates = availability.query(doctor_id=slot_filter.doctor_id, clinic_id=slot_filter.clinic_id,
+                                    date_from=slot_filter.date_from, date_to=slot_filter.date_to)
+    filtered_slots = slot_filter.apply(candidates)
     
     if not filtered_slots:
         print("\nNo slots match your filter criteria.")
         input("\nPress Enter to continue...")
         return
     
-    # Display available slots
-    clear_screen()
-    print("\n===== Available Appointment Slots =====")
-    print(f"{'#':<4} {'Date':<12} {'Time':<8} {'Duration':<10} {'Doctor':<25} {'Clinic':<30}")
-    print("-" * 89)
-    
-    for i, slot in enumerate(filtered_slots, 1):
+    # Show the slots a page at a time; rows are only formatted when shown
+    def format_slot(slot):
         doctor_name = doctor_lookup.get(slot['doctor_id'], {}).get('full_name', 'Unknown')
         clinic_name = clinic_lookup.get(slot['clinic_id'], {}).get('name', 'Unknown')
-        print(f"{i:<4} {slot['date']:<12} {slot['time']:<8} {slot['duration']+'min':<10} "
-              f"{doctor_name:<25} {clinic_name:<30}")
+        return (f"{slot['id']:<6} {slot['date']:<12} {slot['time']:<8} {slot['duration']+'min':<10} "
+                f"{doctor_name:<25} {clinic_name:<30}")
+
+    pager = Pager(filtered_slots, "Available Appointment Slots",
+                  f"{'ID':<6} {'Date':<12} {'Time':<8} {'Duration':<10} {'Doctor':<25} {'Clinic':<30}",
+                  format_slot, key=lambda slot: slot['id'])
     
     # Get user selection
     while True:
-        selection = input("\nEnter slot number to view details (or 'c' to cancel): ").strip()
-        
-        if selection.lower() == 'c':
+        selected_slot = pager.run()
+        if selected_slot is None:
             return
         
-        try:
-            slot_index = int(selection) - 1
-            if 0 <= slot_index < len(filtered_slots):
-                selected_slot = filtered_slots[slot_index]
-                display_slot_details(selected_slot, doctor_lookup, clinic_lookup)
-                
-                book_choice = input("\nWould you like to book this appointment? (y/n): ").strip().lower()
-                if book_choice == 'y':
-                    create_new_appointment(patient_email, selected_slot)
-                    return
-                else:
-                    # Return to slot selection
-                    clear_screen()
-                    print("\n===== Available Appointment Slots =====")
-                    print(f"{'#':<4} {'Date':<12} {'Time':<8} {'Duration':<10} {'Doctor':<25} {'Clinic':<30}")
-                    print("-" * 89)
-                    
-                    for i, slot in enumerate(filtered_slots, 1):
-                        doctor_name = doctor_lookup.get(slot['doctor_id'], {}).get('full_name', 'Unknown')
-                        clinic_name = clinic_lookup.get(slot['clinic_id'], {}).get('name', 'Unknown')
-                        print(f"{i:<4} {slot['date']:<12} {slot['time']:<8} {slot['duration']+'min':<10} "
-                            f"{doctor_name:<25} {clinic_name:<30}")
-            else:
-                print("Invalid selection. Please try again.")
-        except ValueError:
-            print("Please enter a valid number.")
+        display_slot_details(selected_slot, doctor_lookup, clinic_lookup)
+        
+        book_choice = input("\nWould you like to book this appointment? (y/n): ").strip().lower()
+        if book_choice == 'y':
+            create_new_appointment(patient_email, selected_slot)
+            return
+        # otherwise return to the same page of slots
 
 def display_slot_details(slot, doctor_lookup, clinic_lookup):
     """Display detailed information about a specific appointment slot"""
@@ -283,9 +260,6 @@ def display_slot_details(slot, doctor_lookup, clinic_lookup):
 
 def create_new_appointment(patient_email, slot):
     """Create a new appointment based on the selected slot"""
-    appointments = load_csv_data(APPOINTMENTS_FILE)
-    new_id = get_next_id(appointments)
-    
     # Ask for the reason for the appointment
     reason = input_with_validation("\nPlease enter the reason for your appointment: ", 
                                   lambda x: x.strip() != "", 
@@ -293,7 +267,7 @@ def create_new_appointment(patient_email, slot):
     
     # Create new appointment record
     new_appointment = {
-        'id': new_id,
+        'id': None,  # allocated when the booking is committed
         'patient_email': patient_email,
         'doctor_id': slot['doctor_id'],
         'clinic_id': slot['clinic_id'],
@@ -301,7 +275,8 @@ def create_new_appointment(patient_email, slot):
         'time': slot['time'],
         'duration': slot['duration'],
         'reason': reason,
-        'status': 'confirmed'
+        'status': 'confirmed',
+        'slot_id': slot['id']
     }
     
     # Display confirmation screen
@@ -310,13 +285,8 @@ def create_new_appointment(patient_email, slot):
     print("\nPlease review your appointment details:")
     
     # Load doctor and clinic information
-    doctors = load_csv_data(DOCTORS_FILE)
-    clinics = load_csv_data(CLINICS_FILE)
-    doctor_lookup = {doc['id']: doc for doc in doctors}
-    clinic_lookup = {clinic['id']: clinic for clinic in clinics}
-    
-    doctor = doctor_lookup.get(slot['doctor_id'], {})
-    clinic = clinic_lookup.get(slot['clinic_id'], {})
+    doctor = data_store.get_lookup(DOCTORS_FILE).get(slot['doctor_id'], {})
+    clinic = data_store.get_lookup(CLINICS_FILE).get(slot['clinic_id'], {})
     
     print(f"Date: {new_appointment['date']}")
     print(f"Time: {new_appointment['time']}")
@@ -333,12 +303,16 @@ def create_new_appointment(patient_email, slot):
         input("\nPress Enter to continue...")
         return
     
-    # Update slot status and save appointment
-    update_slot_status(slot['id'], 'booked')
-    appointments.append(new_appointment)
+    # Book the slot and save the appointment together. The slot is only taken
+    # if it is still available, in case another terminal booked it meanwhile.
+    txn = Transaction()
+    with data_lock():
+        new_appointment['id'] = get_next_id(APPOINTMENTS_FILE)
+        txn.update(SLOTS_FILE, slot['id'], 'status', 'booked', expected='available')
+        txn.append(APPOINTMENTS_FILE, [new_appointment], new_appointment.keys())
+        booked = txn.commit()
     
-    # Save updated appointments
-    if save_csv_data(APPOINTMENTS_FILE, appointments, new_appointment.keys()):
+    if booked:
         print("\n✅ Appointment booked successfully!")
         
         # Ask if the user wants to view their appointments
@@ -346,67 +320,32 @@ def create_new_appointment(patient_email, slot):
         if view_choice == 'y':
             view_appointments(patient_email)
             return
+    elif txn.conflicts:
+        print("\n❌ Sorry, this slot has just been booked by someone else. Please choose another slot.")
     else:
         print("\n❌ Failed to book appointment.")
     
     input("\nPress Enter to continue...")
 
-def update_slot_status(slot_id, new_status):
-    """Update a slot's status in the slots CSV file"""
-    slots = load_csv_data(SLOTS_FILE)
-    
-    for slot in slots:
-        if slot['id'] == slot_id:
-            slot['status'] = new_status
-            break
-    
-    fieldnames = slots[0].keys() if slots else []
-    return save_csv_data(SLOTS_FILE, slots, fieldnames)
-
 def view_appointments(patient_email):
     """View and filter existing appointments"""
     clear_screen()
     print("\n===== My Appointments =====")
     
-    # Load data
-    appointments = load_csv_data(APPOINTMENTS_FILE)
-    doctors = load_csv_data(DOCTORS_FILE)
-    clinics = load_csv_data(CLINICS_FILE)
+    # Load data (cached, read-only)
+    doctor_lookup = data_store.get_lookup(DOCTORS_FILE)
+    clinic_lookup = data_store.get_lookup(CLINICS_FILE)
     
-    # Create lookup dictionaries
-    doctor_lookup = {doc['id']: doc for doc in doctors}
-    clinic_lookup = {clinic['id']: clinic for clinic in clinics}
+    # 该患者的时间线（已排序、已分为未来/过去，并带好GP和诊所名称）
+    timeline = get_patient_timeline(patient_email)
     
-    # 更新过期预约的状态
-    now = datetime.now()
-    updated = False
-    for appt in appointments:
-        if appt['patient_email'] == patient_email:
-            try:
-                appt_date = datetime.strptime(f"{appt['date']} {appt['time']}", "%Y-%m-%d %H:%M")
-                # 如果预约已过期且状态仍为confirmed，标记为attended
-                if appt_date < now and appt['status'] == 'confirmed':
-                    appt['status'] = 'attended'
-                    updated = True
-            except ValueError:
-                pass
-    
-    # 如果有状态更新，保存到文件
-    if updated:
-        save_csv_data(APPOINTMENTS_FILE, appointments, appointments[0].keys())
-    
-    # Filter appointments for this patient
-    my_appointments = [appt for appt in appointments if appt['patient_email'] == patient_email]
-    
-    if not my_appointments:
+    if not timeline:
         print("You have no appointments.")
         input("\nPress Enter to continue...")
         return
     
-    # 初始化筛选变量
-    filtered_appointments = my_appointments
-    filter_active = False
-    filter_description = "All appointments"
+    # 初始化筛选条件（可叠加）
+    appt_filter = RecordFilter()
     view_mode = "all"  # 默认查看所有预约
     
     while True:
@@ -421,65 +360,25 @@ def view_appointments(patient_email):
         else:
             print("Viewing: All appointments")
             
-        if filter_active:
-            print(f"Filter: {filter_description}")
-        
-        # 根据当前时间区分过去和未来的预约
-        now = datetime.now()
-        current_appts = []
-        
-        for appt in filtered_appointments:
-            try:
-                appt_date = datetime.strptime(f"{appt['date']} {appt['time']}", "%Y-%m-%d %H:%M")
-                # 根据查看模式筛选预约
-                if view_mode == "upcoming" and appt_date > now and appt['status'] == 'confirmed':
-                    current_appts.append(appt)
-                elif view_mode == "past" and (appt_date <= now or appt['status'] == 'cancelled' or 
-                                              appt['status'] == 'cancelled by patient' or appt['status'] == 'attended'):
-                    current_appts.append(appt)
-                elif view_mode == "all":
-                    current_appts.append(appt)
-            except ValueError:
-                # 日期格式错误的情况下，仍然显示该预约
-                if (view_mode == "upcoming" and appt['status'] == 'confirmed') or \
-                   (view_mode == "past" and (appt['status'] == 'cancelled' or appt['status'] == 'cancelled by patient' or 
-                                            appt['status'] == 'attended')) or \
-                   view_mode == "all":
-                    current_appts.append(appt)
+        if appt_filter:
+            print(f"Filter: {appt_filter.describe()}")
         
-        # 按日期和时间排序
-        current_appts.sort(key=lambda x: (x['date'], x['time']))
+        # 时间线在该患者的预约变化时才重建，切换视图只是取现成的分区
+        timeline = get_patient_timeline(patient_email)
+        current_entries = appt_filter.apply(timeline.view(view_mode))
+        current_appts = [entry.appointment for entry in current_entries]
         
         # 只显示要求的四个字段
         print(f"\n{'#':<3} {'GP Name':<25} {'Date':<12} {'Time':<8} {'Clinic Suburb':<25} {'Status':<15}")
         print("-" * 98)
         
-        if not current_appts:
+        if not current_entries:
             print("\nNo appointments found matching your criteria.")
         else:
-            for i, appt in enumerate(current_appts, 1):
-                doctor = doctor_lookup.get(appt['doctor_id'], {})
-                clinic = clinic_lookup.get(appt['clinic_id'], {})
-                
-                doctor_name = doctor.get('full_name', 'Unknown')
-                location = clinic.get('location', '')
-                suburb = location.split(',')[0] if ',' in location else location
-                
-                # 美化状态显示
-                status = appt['status']
-                if status == 'confirmed':
-                    status_display = "Confirmed"
-                elif status == 'cancelled':
-                    status_display = "Cancelled by Clinic"
-                elif status == 'cancelled by patient':
-                    status_display = "Cancelled by Patient"
-                elif status == 'attended':
-                    status_display = "Attended"
-                else:
-                    status_display = status.capitalize()
-                
-                print(f"{i:<3} {doctor_name:<25} {appt['date']:<12} {appt['time']:<8} "
-                      f"{suburb:<25} {status_display:<15}")
+            for i, entry in enumerate(current_entries, 1):
+                appt = entry.appointment
+                print(f"{i:<3} {entry.doctor_name:<25} {appt['date']:<12} {appt['time']:<8} "
+                      f"{entry.suburb:<25} {entry.status_display:<15}")
         
         # 修改：菜单选项，移除不必要的"查看全部预约"选项
         print("\nOptions:")
@@ -516,14 +415,7 @@ def view_appointments(patient_email):
         elif choice == '2':
             # 取消预约功能
             cancel_appointment(current_appts, patient_email)
-            # 重新加载预约，以反映变化
-            appointments = load_csv_data(APPOINTMENTS_FILE)
-            my_appointments = [appt for appt in appointments if appt['patient_email'] == patient_email]
-            # 重置筛选条件
-            if filter_active:
-                filtered_appointments = apply_filters(my_appointments, filter_description)
-            else:
-                filtered_appointments = my_appointments
+            # 取消后时间线会自动重建，筛选条件保持不变
                 
         elif choice == '3':
             # 查看即将到来的预约
@@ -538,61 +430,36 @@ def view_appointments(patient_email):
             date_filter = input_with_validation("Enter date (YYYY-MM-DD): ", 
                                               is_valid_date_format, 
                                               "Please enter a valid date format (YYYY-MM-DD)")
-            filtered_appointments = [appt for appt in my_appointments if appt['date'] == date_filter]
-            filter_active = True
-            filter_description = f"Date: {date_filter}"
+            appt_filter = appt_filter.on_date(date_filter)
             view_mode = "all"  # 重置视图模式为全部
             
         elif choice == '6': # 原先的选项7
             # 按GP筛选
             print("\nYour doctors:")
-            unique_doctors = set(appt['doctor_id'] for appt in my_appointments)
-            for doc_id in unique_doctors:
-                if doc_id in doctor_lookup:
-                    print(f"- {doctor_lookup[doc_id]['full_name']}")
+            for doctor_name in sorted(set(entry.doctor_name for entry in timeline.entries)):
+                print(f"- {doctor_name}")
             
             gp_filter = input("Enter GP name (partial name is OK): ").strip()
-            filtered_appointments = []
-            
-            for appt in my_appointments:
-                doctor_name = doctor_lookup.get(appt['doctor_id'], {}).get('full_name', '').lower()
-                if gp_filter.lower() in doctor_name:
-                    filtered_appointments.append(appt)
-                    
-            filter_active = True
-            filter_description = f"GP: {gp_filter}"
+            suggest_similar(doctor_search(), gp_filter, "GP",
+                            lambda doc_id: doctor_lookup.get(doc_id, {}).get('full_name'))
+            appt_filter = appt_filter.where(gp=gp_filter)
             view_mode = "all"  # 重置视图模式为全部
             
         elif choice == '7': # 原先的选项8
             # 按诊所区域筛选
             print("\nYour clinic suburbs:")
-            unique_clinics = set(appt['clinic_id'] for appt in my_appointments)
-            suburbs = []
-            for clinic_id in unique_clinics:
-                if clinic_id in clinic_lookup:
-                    location = clinic_lookup[clinic_id].get('location', '')
-                    suburb = location.split(',')[0] if ',' in location else location
-                    suburbs.append(suburb)
-                    print(f"- {suburb}")
+            for suburb in sorted(set(entry.suburb for entry in timeline.entries if entry.suburb)):
+                print(f"- {suburb}")
             
             suburb_filter = input("Enter clinic suburb: ").strip()
-            filtered_appointments = []
-            
-            for appt in my_appointments:
-                clinic_location = clinic_lookup.get(appt['clinic_id'], {}).get('location', '').lower()
-                suburb = clinic_location.split(',')[0].lower() if ',' in clinic_location else clinic_location.lower()
-                if suburb_filter.lower() in suburb:
-                    filtered_appointments.append(appt)
-                    
-            filter_active = True
-            filter_description = f"Suburb: {suburb_filter}"
+            suggest_similar(clinic_search(), suburb_filter, "suburb",
+                            lambda clinic_id: suburb_of(clinic_lookup.get(clinic_id, {}).get('location', '')))
+            appt_filter = appt_filter.where(suburb=suburb_filter)
             view_mode = "all"  # 重置视图模式为全部
             
         elif choice == '8': # 原先的选项9
             # 清除筛选条件
-            filtered_appointments = my_appointments
-            filter_active = False
-            filter_description = "All appointments"
+            appt_filter = RecordFilter()
             view_mode = "all"  # 重置视图模式为全部
             
         elif choice == '0':
@@ -602,14 +469,26 @@ def view_appointments(patient_email):
         # 添加一个"全部"选项的快捷方式
         elif choice == '9':
             view_mode = "all"
-            filtered_appointments = my_appointments
-            filter_active = False
-            filter_description = "All appointments"
+            appt_filter = RecordFilter()
             
         else:
             input("Invalid choice. Press Enter to continue...")
 
 
+def suggest_similar(search, query, label, name_of):
+    """如果搜索没有结果，提示相近的名称（拼写错误时）"""
+    if not query or search.search(query):
+        return
+    names = []
+    for row_id in search.similar(query):
+        name = name_of(row_id)
+        if name and name not in names:
+            names.append(name)
+    if names:
+        print(f"\nNo {label} matches '{query}'. Did you mean: {', '.join(names)}?")
+        input("Press Enter to continue...")
+
+
 def view_appointment_details(appointment, doctor_lookup, clinic_lookup):
     """显示单个预约的详细信息"""
     clear_screen()
@@ -651,10 +530,9 @@ def view_appointment_details(appointment, doctor_lookup, clinic_lookup):
     print(f"Status: {status_display}")
     
     # 确定预约是过去的还是未来的
-    try:
-        now = datetime.now()
-        appt_date = datetime.strptime(f"{appointment['date']} {appointment['time']}", "%Y-%m-%d %H:%M")
-        
+    now = datetime.now()
+    appt_date = appointment.start
+    if appt_date is not None:
         if appt_date > now:
             time_diff = appt_date - now
             days, remainder = divmod(time_diff.total_seconds(), 86400)
@@ -663,45 +541,9 @@ def view_appointment_details(appointment, doctor_lookup, clinic_lookup):
             print(f"Time until appointment: {int(days)} days and {int(hours)} hours")
         else:
             print(f"\nThis appointment is in the past.")
-    except ValueError:
-        pass
     
     input("\nPress Enter to return to appointment list...")
 
-def apply_filters(appointments, filter_description):
-    """根据筛选描述应用筛选条件"""
-    if "Date:" in filter_description:
-        date_filter = filter_description.split("Date:")[1].strip()
-        return [appt for appt in appointments if appt['date'] == date_filter]
-    elif "GP:" in filter_description:
-        gp_filter = filter_description.split("GP:")[1].strip().lower()
-        filtered = []
-        from utils.helpers import load_csv_data
-        doctors = load_csv_data(DOCTORS_FILE)
-        doctor_lookup = {doc['id']: doc for doc in doctors}
-        
-        for appt in appointments:
-            doctor_name = doctor_lookup.get(appt['doctor_id'], {}).get('full_name', '').lower()
-            if gp_filter in doctor_name:
-                filtered.append(appt)
-        return filtered
-    elif "Suburb:" in filter_description:
-        suburb_filter = filter_description.split("Suburb:")[1].strip().lower()
-        filtered = []
-        from utils.helpers import load_csv_data
-        clinics = load_csv_data(CLINICS_FILE)
-        clinic_lookup = {clinic['id']: clinic for clinic in clinics}
-        
-        for appt in appointments:
-            clinic_location = clinic_lookup.get(appt['clinic_id'], {}).get('location', '').lower()
-            suburb = clinic_location.split(',')[0].lower() if ',' in clinic_location else clinic_location.lower()
-            if suburb_filter in suburb:
-                filtered.append(appt)
-        return filtered
-    else:
-        return appointments
-
-
 def cancel_appointment(appointments, patient_email):
     """Cancel an existing appointment"""
     if not appointments:
@@ -714,14 +556,12 @@ def cancel_appointment(appointments, patient_email):
     active_appointments = []
     
     for appt in appointments:
-        try:
-            appt_date = datetime.strptime(f"{appt['date']} {appt['time']}", "%Y-%m-%d %H:%M")
-            if appt['status'] == 'confirmed' and appt_date > now:
+        if appt.start is not None:
+            if appt['status'] == 'confirmed' and appt.start > now:
                 active_appointments.append(appt)
-        except ValueError:
+        elif appt['status'] == 'confirmed':
             # 如果日期格式有问题，仍然考虑该预约
-            if appt['status'] == 'confirmed':
-                active_appointments.append(appt)
+            active_appointments.append(appt)
     
     if not active_appointments:
         print("\nYou have no upcoming confirmed appointments to cancel.")
@@ -735,11 +575,8 @@ def cancel_appointment(appointments, patient_email):
     print(f"\n{'#':<3} {'GP Name':<25} {'Date':<12} {'Time':<8} {'Clinic Suburb':<25}")
     print("-" * 83)
     
-    from utils.helpers import load_csv_data
-    doctors = load_csv_data(DOCTORS_FILE)
-    clinics = load_csv_data(CLINICS_FILE)
-    doctor_lookup = {doc['id']: doc for doc in doctors}
-    clinic_lookup = {clinic['id']: clinic for clinic in clinics}
+    doctor_lookup = data_store.get_lookup(DOCTORS_FILE)
+    clinic_lookup = data_store.get_lookup(CLINICS_FILE)
     
     for i, appt in enumerate(active_appointments, 1):
         doctor = doctor_lookup.get(appt['doctor_id'], {})
@@ -763,8 +600,8 @@ def cancel_appointment(appointments, patient_email):
     
     # 计算当前时间与预约时间的差距
     now = datetime.now()
-    appt_date = datetime.strptime(f"{selected_appt['date']} {selected_appt['time']}", "%Y-%m-%d %H:%M")
-    time_diff = appt_date - now
+    appt_date = selected_appt.start
+    time_diff = appt_date - now if appt_date else timedelta(0)
     
     # 显示取消确认和可能的罚款
     clear_screen()
@@ -796,25 +633,15 @@ def cancel_appointment(appointments, patient_email):
         input("\nPress Enter to continue...")
         return
     
-    # 更新所有预约数据
-    all_appointments = load_csv_data(APPOINTMENTS_FILE)
-    for appt in all_appointments:
-        if appt['id'] == selected_appt['id']:
-            appt['status'] = 'cancelled by patient'  # 更新状态为"由患者取消"
-            break
+    # 更新状态为"由患者取消"，并释放时间槽以供其他人使用（同一事务）
+    txn = Transaction()
+    txn.update(APPOINTMENTS_FILE, selected_appt['id'], 'status', 'cancelled by patient', expected='confirmed')
+    slot = slot_of_appointment(selected_appt)
+    if slot is not None:
+        txn.update(SLOTS_FILE, slot['id'], 'status', 'available')
     
     # 保存更改
-    if save_csv_data(APPOINTMENTS_FILE, all_appointments, all_appointments[0].keys() if all_appointments else []):
-        # 释放时间槽以供其他人使用
-        slots = load_csv_data(SLOTS_FILE)
-        for slot in slots:
-            if (slot['doctor_id'] == selected_appt['doctor_id'] and
-                slot['date'] == selected_appt['date'] and
-                slot['time'] == selected_appt['time']):
-                slot['status'] = 'available'
-                break
-        
-        save_csv_data(SLOTS_FILE, slots, slots[0].keys() if slots else [])
+    if txn.commit():
         
         # 显示取消确认通知
         clear_screen()
@@ -833,6 +660,9 @@ def cancel_appointment(appointments, patient_email):
         print(f"Doctor: {doctor.get('full_name', 'Unknown')}")
         print(f"Clinic: {clinic.get('name', 'Unknown')}")
         
+        input("\nPress Enter to continue...")
+    elif txn.conflicts:
+        print("\n❌ This appointment has already been cancelled.")
         input("\nPress Enter to continue...")
     else:
         print("\n❌ Failed to cancel appointment. Please try again.")
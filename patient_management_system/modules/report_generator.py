@@ -2,13 +2,16 @@
 
 import os
 import csv
+import gzip
 from datetime import datetime
 from utils.helpers import (
     clear_screen,
     input_with_validation,
-    is_valid_date_format,
-    load_csv_data
+    is_valid_date_format
 )
+from utils import data_store
+from utils.report_index import get_appointment_counts
+from utils import columnar_export
 
 DATA_DIR = '../data'
 APPOINTMENTS_FILE = os.path.join(DATA_DIR, 'appointments.csv')
@@ -35,33 +38,71 @@ def _prompt_date_range():
     return start_dt, end_dt
 
 
-def _filter_by_date(appts, start_dt, end_dt):
-    """Keep only those appointments whose datetime falls within [start_dt, end_dt]."""
-    if not start_dt and not end_dt:
-        return appts
+def _range_totals(start_dt, end_dt):
+    """Appointment counts per (clinic, GP, reason, status) for whole days in the range."""
+    return get_appointment_counts().totals(
+        start_dt.strftime("%Y-%m-%d") if start_dt else None,
+        end_dt.strftime("%Y-%m-%d") if end_dt else None)
 
-    filtered = []
-    for a in appts:
-        dt_str = f"{a['date']} {a['time']}"
-        # parse "YYYY-MM-DD H:MM" or "YYYY-MM-DD HH:MM"
-        try:
-            a_dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-        except ValueError:
-            # in case seconds are present or unexpected format, you could add more patterns here
-            raise ValueError(f"Cannot parse appointment datetime: {dt_str}")
-        if (not start_dt or a_dt >= start_dt) and (not end_dt or a_dt <= end_dt):
-            filtered.append(a)
-    return filtered
+
+def _tidy_rows(agg, group_name, dimensions):
+    """Yield one (group, total, dimension, value, count) row per group and dimension value."""
+    for gid, data in agg.items():
+        name = group_name(gid)
+        for label, _heading, key, value_name in dimensions:
+            for value, cnt in data[key].items():
+                yield (name, data['total'], label, value_name(value), cnt)
+
+
+def _text_lines(agg, title, group_name, dimensions):
+    """Yield the lines of the plain-text export."""
+    for gid, data in agg.items():
+        yield f"{title}: {group_name(gid)} (Total: {data['total']})\n"
+        for _label, heading, key, value_name in dimensions:
+            yield f"  {heading}:\n"
+            for value, cnt in data[key].items():
+                yield f"    {value_name(value)}: {cnt}\n"
+        yield "\n"
+
+
+def _export_report(prefix, start_dt, end_dt, agg, title, group_name, dimensions):
+    """
+    Offer to export a report and stream it to disk.
+
+    The CSV export is tidy: one row per group and dimension value (e.g. one
+    per clinic and GP), so its size grows with the number of groups rather
+    than with the product of the dimensions. Names come from the cached
+    lookups, and either format can be gzip-compressed.
+    """
+    choice = input("\nExport report? (1) CSV  (2) Text  (Enter to skip): ").strip()
+    if choice not in ('1', '2'):
+        return
+    compress = input("Compress with gzip? (y/n): ").strip().lower() == 'y'
+    fmt = 'csv' if choice == '1' else 'txt'
+    start_tag = start_dt.date() if start_dt else 'all'
+    end_tag   = end_dt.date()   if end_dt   else 'all'
+    fname = f"{prefix}_{start_tag}_{end_tag}.{fmt}" + ('.gz' if compress else '')
+    path = os.path.join(DATA_DIR, fname)
+
+    opener = gzip.open if compress else open
+    with opener(path, 'wt', newline='') as f:
+        if fmt == 'csv':
+            w = csv.writer(f)
+            w.writerow([title, 'Total', 'Dimension', 'Value', 'Count'])
+            w.writerows(_tidy_rows(agg, group_name, dimensions))
+        else:
+            f.writelines(_text_lines(agg, title, group_name, dimensions))
+
+    print(f"\n Report exported to {path}")
 
 
 def generate_clinic_report():
     clear_screen()
     print("\n===== Clinic Report =====")
 
-    # load data
-    appts   = load_csv_data(APPOINTMENTS_FILE)
-    clinics = load_csv_data(CLINICS_FILE)
-    doctors = {d['id']: d for d in load_csv_data(DOCTORS_FILE)}
+    # load data (cached, read-only)
+    clinics = data_store.get_lookup(CLINICS_FILE)
+    doctors = data_store.get_lookup(DOCTORS_FILE)
 
     # # date filter
     # start_dt, end_dt = _prompt_date_range()
@@ -87,21 +128,17 @@ def generate_clinic_report():
         except ValueError:
             print("Invalid date format. Please try again.")
     
-    appts = _filter_by_date(appts, start_dt, end_dt)
-
-    # aggregate
+    # aggregate: sum the pre-aggregated daily counts in the range
     agg = {}
-    for a in appts:
-        cid = a['clinic_id']
+    for (cid, gid, reason, _status), cnt in _range_totals(start_dt, end_dt).items():
         clinic = agg.setdefault(cid, {'total': 0, 'by_gp': {}, 'by_type': {}})
-        clinic['total'] += 1
-        clinic['by_gp'][a['doctor_id']] = clinic['by_gp'].get(a['doctor_id'], 0) + 1
-        reason = a.get('reason', 'Unknown')
-        clinic['by_type'][reason] = clinic['by_type'].get(reason, 0) + 1
+        clinic['total'] += cnt
+        clinic['by_gp'][gid] = clinic['by_gp'].get(gid, 0) + cnt
+        clinic['by_type'][reason] = clinic['by_type'].get(reason, 0) + cnt
 
     # display
     for cid, data in agg.items():
-        name = next((c['name'] for c in clinics if c['id'] == cid), 'Unknown')
+        name = clinics.get(cid, {}).get('name', 'Unknown')
         print(f"\nClinic: {name}  (Total patients: {data['total']})")
         print(" • Appointments per GP:")
         for gid, cnt in data['by_gp'].items():
@@ -112,38 +149,12 @@ def generate_clinic_report():
             print(f"    - {typ}: {cnt}")
 
     # export
-    choice = input("\nExport report? (1) CSV  (2) Text  (Enter to skip): ").strip()
-    if choice in ('1', '2'):
-        fmt = 'csv' if choice == '1' else 'txt'
-        start_tag = start_dt.date() if start_dt else 'all'
-        end_tag   = end_dt.date()   if end_dt   else 'all'
-        fname = f"clinic_report_{start_tag}_{end_tag}.{fmt}"
-        path = os.path.join(DATA_DIR, fname)
-
-        with open(path, 'w', newline='') as f:
-            if fmt == 'csv':
-                w = csv.writer(f)
-                w.writerow(['Clinic', 'Total', 'GP', 'GP Count', 'Type', 'Type Count'])
-                for cid, data in agg.items():
-                    clinic_name = next((c['name'] for c in clinics if c['id'] == cid), '')
-                    for gid, cnt in data['by_gp'].items():
-                        for typ, tcnt in data['by_type'].items():
-                            w.writerow([clinic_name, data['total'],
-                                        doctors.get(gid, {}).get('full_name', ''),
-                                        cnt, typ, tcnt])
-            else:
-                for cid, data in agg.items():
-                    clinic_name = next((c['name'] for c in clinics if c['id'] == cid), '')
-                    f.write(f"Clinic: {clinic_name} (Total: {data['total']})\n")
-                    f.write("  GP Counts:\n")
-                    for gid, cnt in data['by_gp'].items():
-                        f.write(f"    {doctors.get(gid, {}).get('full_name', '')}: {cnt}\n")
-                    f.write("  Type Breakdown:\n")
-                    for typ, tcnt in data['by_type'].items():
-                        f.write(f"    {typ}: {tcnt}\n")
-                    f.write("\n")
-
-        print(f"\n Report exported to {path}")
+    clinic_name = lambda cid: clinics.get(cid, {}).get('name', '')
+    gp_name     = lambda gid: doctors.get(gid, {}).get('full_name', '')
+    _export_report("clinic_report", start_dt, end_dt, agg, "Clinic", clinic_name, [
+        ("GP", "GP Counts", 'by_gp', gp_name),
+        ("Type", "Type Breakdown", 'by_type', str),
+    ])
 
     input("\nPress Enter to continue...")
 
@@ -152,8 +163,8 @@ def generate_gp_report():
     clear_screen()
     print("\n===== GP Report =====")
 
-    appts   = load_csv_data(APPOINTMENTS_FILE)
-    doctors = load_csv_data(DOCTORS_FILE)
+    doctors = data_store.get_lookup(DOCTORS_FILE)
+    clinics = data_store.get_lookup(CLINICS_FILE)
 
     # # date filter
     # start_dt, end_dt = _prompt_date_range()
@@ -178,63 +189,58 @@ def generate_gp_report():
         except ValueError:
             print("Invalid date format. Please try again.")
 
-    appts = _filter_by_date(appts, start_dt, end_dt)
-
-    # aggregate per GP
+    # aggregate per GP from the pre-aggregated daily counts
     agg = {}
-    for a in appts:
-        gid = a['doctor_id']
+    for (cid, gid, reason, _status), cnt in _range_totals(start_dt, end_dt).items():
         gp  = agg.setdefault(gid, {'total': 0, 'by_clinic': {}, 'by_type': {}})
-        gp['total'] += 1
-        gp['by_clinic'][a['clinic_id']] = gp['by_clinic'].get(a['clinic_id'], 0) + 1
-        reason = a.get('reason', 'Unknown')
-        gp['by_type'][reason] = gp['by_type'].get(reason, 0) + 1
+        gp['total'] += cnt
+        gp['by_clinic'][cid] = gp['by_clinic'].get(cid, 0) + cnt
+        gp['by_type'][reason] = gp['by_type'].get(reason, 0) + cnt
 
     # display
     for gid, data in agg.items():
-        name = next((d['full_name'] for d in doctors if d['id'] == gid), 'Unknown')
+        name = doctors.get(gid, {}).get('full_name', 'Unknown')
         print(f"\nGP: {name}  (Total patients: {data['total']})")
         print(" • Appointments per Clinic:")
-        clinics = load_csv_data(CLINICS_FILE)
         for cid, cnt in data['by_clinic'].items():
-            cname = next((c['name'] for c in clinics if c['id'] == cid), 'Unknown')
+            cname = clinics.get(cid, {}).get('name', 'Unknown')
             print(f"    - {cname}: {cnt}")
         print(" • Breakdown by type:")
         for typ, cnt in data['by_type'].items():
             print(f"    - {typ}: {cnt}")
 
     # export
-    choice = input("\nExport report? (1) CSV  (2) Text  (Enter to skip): ").strip()
-    if choice in ('1', '2'):
-        fmt = 'csv' if choice == '1' else 'txt'
-        start_tag = start_dt.date() if start_dt else 'all'
-        end_tag   = end_dt.date()   if end_dt   else 'all'
-        fname = f"gp_report_{start_tag}_{end_tag}.{fmt}"
-        path = os.path.join(DATA_DIR, fname)
-
-        with open(path, 'w', newline='') as f:
-            if fmt == 'csv':
-                w = csv.writer(f)
-                w.writerow(['GP', 'Total', 'Clinic', 'Clinic Count', 'Type', 'Type Count'])
-                for gid, data in agg.items():
-                    gp_name = next((d['full_name'] for d in doctors if d['id'] == gid), '')
-                    for cid, cnt in data['by_clinic'].items():
-                        for typ, tcnt in data['by_type'].items():
-                            w.writerow([gp_name, data['total'], cid, cnt, typ, tcnt])
-            else:
-                for gid, data in agg.items():
-                    gp_name = next((d['full_name'] for d in doctors if d['id'] == gid), '')
-                    f.write(f"GP: {gp_name} (Total: {data['total']})\n")
-                    f.write("  Clinic Counts:\n")
-                    clinics = load_csv_data(CLINICS_FILE)
-                    for cid, cnt in data['by_clinic'].items():
-                        cname = next((c['name'] for c in clinics if c['id'] == cid), '')
-                        f.write(f"    {cname}: {cnt}\n")
-                    f.write("  Type Breakdown:\n")
-                    for typ, tcnt in data['by_type'].items():
-                        f.write(f"    {typ}: {tcnt}\n")
-                    f.write("\n")
-
-        print(f"\n Report exported to {path}")
+    gp_name     = lambda gid: doctors.get(gid, {}).get('full_name', '')
+    clinic_name = lambda cid: clinics.get(cid, {}).get('name', '')
+    _export_report("gp_report", start_dt, end_dt, agg, "GP", gp_name, [
+        ("Clinic", "Clinic Counts", 'by_clinic', clinic_name),
+        ("Type", "Type Breakdown", 'by_type', str),
+    ])
+
+    input("\nPress Enter to continue...")
+
+
+def export_analytics_data():
+    clear_screen()
+    print("\n===== Export Data for Analytics =====")
+
+    if not columnar_export.AVAILABLE:
+        print("\nColumnar export needs pyarrow (pip install pyarrow).")
+        input("\nPress Enter to continue...")
+        return
+
+    choice = input("\nFormat? (1) Parquet  (2) Arrow IPC  (Enter to cancel): ").strip()
+    if choice not in ('1', '2'):
+        return
+    fmt = 'parquet' if choice == '1' else 'arrow'
+
+    try:
+        written = columnar_export.export_datasets(fmt)
+    except Exception as e:
+        print(f"\n Export failed: {e}")
+    else:
+        print("\n Exported (partitioned by month):")
+        for name, directory in written.items():
+            print(f"    - {name}: {directory}")
 
     input("\nPress Enter to continue...")
@@ -0,0 +1,36 @@
+"""
+Shared set-up for tests that read and write a data folder.
+
+The app resolves '../data' against the working directory, so each test runs
+in a fresh temporary 'app' folder with an empty 'data' folder beside it.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils import data_store
+from utils.storage import CsvBackend
+
+
+class DataDirTestCase(unittest.TestCase):
+    """Runs each test against an empty temporary data folder (CSV backend)."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, 'app'))
+        os.makedirs(os.path.join(self.root, 'data'))
+        self.cwd = os.getcwd()
+        os.chdir(os.path.join(self.root, 'app'))
+        self.addCleanup(self._tear_down)
+        data_store.invalidate()
+
+    def _tear_down(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.root)
+        data_store.invalidate()
+
+    def write_table(self, filepath, rows, fieldnames):
+        """Seed a table on disk and drop anything cached for it."""
+        CsvBackend().write_table(filepath, rows, fieldnames)
+        data_store.invalidate()
@@ -0,0 +1,68 @@
+"""
+Appending rows without rewriting the table.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from utils import data_store
+from utils.helpers import append_csv_row, append_csv_rows
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+NOTIFICATIONS_FILE = os.path.join(DATA_DIR, 'notifications.csv')
+FIELDS = ['id', 'user_id', 'message']
+
+
+def _read(path):
+    with open(path, newline='') as file:
+        return file.read()
+
+
+class AppendTest(DataDirTestCase):
+
+    def test_new_table_gets_a_header(self):
+        self.assertTrue(append_csv_row(NOTIFICATIONS_FILE, {'id': '1', 'user_id': 'a', 'message': 'hi'}, FIELDS))
+        self.assertEqual(_read(NOTIFICATIONS_FILE).splitlines(), ['id,user_id,message', '1,a,hi'])
+
+    def test_existing_content_is_left_in_place(self):
+        self.write_table(NOTIFICATIONS_FILE, [{'id': '1', 'user_id': 'a', 'message': 'hi'}], FIELDS)
+        before = _read(NOTIFICATIONS_FILE)
+
+        self.assertTrue(append_csv_rows(NOTIFICATIONS_FILE, [
+            {'id': '2', 'user_id': 'b', 'message': 'one'},
+            {'id': '3', 'user_id': 'c', 'message': 'two'},
+        ], FIELDS))
+        after = _read(NOTIFICATIONS_FILE)
+        self.assertTrue(after.startswith(before))
+        self.assertEqual(after[len(before):].splitlines(), ['2,b,one', '3,c,two'])
+
+    def test_missing_final_newline_is_repaired(self):
+        with open(NOTIFICATIONS_FILE, 'w', newline='') as file:
+            file.write('id,user_id,message\n1,a,hi')
+        append_csv_row(NOTIFICATIONS_FILE, {'id': '2', 'user_id': 'b', 'message': 'yo'})
+        self.assertEqual(_read(NOTIFICATIONS_FILE).splitlines()[1:], ['1,a,hi', '2,b,yo'])
+
+    def test_new_column_widens_the_header(self):
+        self.write_table(NOTIFICATIONS_FILE, [{'id': '1', 'user_id': 'a', 'message': 'hi'}], FIELDS)
+        append_csv_row(NOTIFICATIONS_FILE, {'id': '2', 'user_id': 'b', 'message': 'yo', 'read': 'no'})
+
+        self.assertEqual(data_store.get_fieldnames(NOTIFICATIONS_FILE), FIELDS + ['read'])
+        self.assertEqual(data_store.get_lookup(NOTIFICATIONS_FILE)['1']['read'], '')
+        self.assertEqual(data_store.get_lookup(NOTIFICATIONS_FILE)['2']['read'], 'no')
+
+    def test_cached_table_is_extended_in_place(self):
+        self.write_table(NOTIFICATIONS_FILE, [{'id': '1', 'user_id': 'a', 'message': 'hi'}], FIELDS)
+        rows = data_store.get_rows(NOTIFICATIONS_FILE)
+        by_user = data_store.get_index(NOTIFICATIONS_FILE, 'user_id')
+
+        append_csv_row(NOTIFICATIONS_FILE, {'id': '2', 'user_id': 'a', 'message': 'again'})
+        self.assertIs(data_store.get_rows(NOTIFICATIONS_FILE), rows)
+        self.assertEqual([row['id'] for row in by_user['a']], ['1', '2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Parquet / Arrow IPC export layout.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from utils import columnar_export
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+APPOINTMENTS_FILE = os.path.join(DATA_DIR, 'appointments.csv')
+SLOTS_FILE = os.path.join(DATA_DIR, 'slots.csv')
+EXPORT_DIR = os.path.join(DATA_DIR, 'exports')
+
+SLOT_FIELDS = ['id', 'doctor_id', 'clinic_id', 'date', 'time', 'duration', 'status']
+APPOINTMENT_FIELDS = ['id', 'patient_email', 'doctor_id', 'clinic_id', 'date', 'time',
+                      'duration', 'reason', 'status', 'slot_id']
+
+
+def _appointment(appt_id, date):
+    return {'id': appt_id, 'patient_email': 'patient1@student.monash.edu', 'doctor_id': '1',
+            'clinic_id': '1', 'date': date, 'time': '09:00', 'duration': '15',
+            'reason': 'Checkup', 'status': 'confirmed', 'slot_id': appt_id}
+
+
+def _slot(slot_id, date):
+    return {'id': slot_id, 'doctor_id': '1', 'clinic_id': '1', 'date': date,
+            'time': '09:00', 'duration': '15', 'status': 'booked'}
+
+
+def _months(fmt, name):
+    return sorted(os.listdir(os.path.join(EXPORT_DIR, fmt, name)))
+
+
+@unittest.skipUnless(columnar_export.AVAILABLE, "pyarrow is not installed")
+class ColumnarExportTest(DataDirTestCase):
+
+    def _seed(self, dates):
+        self.write_table(APPOINTMENTS_FILE, [_appointment(str(i), d) for i, d in enumerate(dates, 1)],
+                         APPOINTMENT_FIELDS)
+        self.write_table(SLOTS_FILE, [_slot(str(i), d) for i, d in enumerate(dates, 1)], SLOT_FIELDS)
+
+    def test_each_format_gets_its_own_directory(self):
+        self._seed(['2030-01-05'])
+        parquet = columnar_export.export_datasets('parquet', EXPORT_DIR)
+        arrow = columnar_export.export_datasets('arrow', EXPORT_DIR)
+
+        self.assertEqual(parquet['slots'], os.path.join(EXPORT_DIR, 'parquet', 'slots'))
+        self.assertEqual(arrow['slots'], os.path.join(EXPORT_DIR, 'arrow', 'slots'))
+        for directory in list(parquet.values()) + list(arrow.values()):
+            self.assertEqual(os.listdir(directory), ['month=2030-01'])
+
+    def test_export_replaces_months_without_rows(self):
+        self._seed(['2030-01-05', '2030-02-05'])
+        columnar_export.export_datasets('parquet', EXPORT_DIR)
+        self.assertEqual(_months('parquet', 'appointments'), ['month=2030-01', 'month=2030-02'])
+
+        self._seed(['2030-02-05'])
+        columnar_export.export_datasets('parquet', EXPORT_DIR)
+        self.assertEqual(_months('parquet', 'appointments'), ['month=2030-02'])
+        self.assertEqual(_months('parquet', 'slots'), ['month=2030-02'])
+        self.assertFalse(any(name.endswith('.tmp') for name in os.listdir(os.path.join(EXPORT_DIR, 'parquet'))))
+
+    def test_exported_rows_read_back(self):
+        self._seed(['2030-01-05', '2030-02-05'])
+        written = columnar_export.export_datasets('arrow', EXPORT_DIR)
+        table = columnar_export.pa_dataset.dataset(written['appointments'], format='ipc', partitioning='hive').to_table()
+        self.assertEqual(sorted(table.column('id').to_pylist()), ['1', '2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
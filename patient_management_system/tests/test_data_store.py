@@ -0,0 +1,64 @@
+"""
+The cached, indexed table store.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from utils import data_store
+from utils.helpers import load_csv_data, save_csv_data
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+CLINICS_FILE = os.path.join(DATA_DIR, 'clinics.csv')
+CLINIC_FIELDS = ['id', 'name', 'location']
+
+
+class DataStoreTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_table(CLINICS_FILE, [
+            {'id': '1', 'name': 'Monash Medical Center', 'location': 'Clayton, VIC 3168'},
+            {'id': '2', 'name': 'City Health Clinic', 'location': 'Melbourne CBD, VIC 3000'},
+            {'id': '3', 'name': 'Eastside Family Practice', 'location': 'Clayton, VIC 3168'},
+        ], CLINIC_FIELDS)
+
+    def test_table_is_parsed_once_while_unchanged(self):
+        rows = data_store.get_rows(CLINICS_FILE)
+        self.assertIs(data_store.get_rows(CLINICS_FILE), rows)
+        self.assertIs(data_store.get_lookup(CLINICS_FILE), data_store.get_lookup(CLINICS_FILE))
+
+    def test_lookup_and_grouped_index(self):
+        self.assertEqual(data_store.get_lookup(CLINICS_FILE)['2']['name'], 'City Health Clinic')
+        by_location = data_store.get_index(CLINICS_FILE, 'location')
+        self.assertEqual([row['id'] for row in by_location['Clayton, VIC 3168']], ['1', '3'])
+        self.assertEqual([row['id'] for row in data_store.select(CLINICS_FILE, location='Clayton, VIC 3168')],
+                         ['1', '3'])
+
+    def test_change_by_another_process_is_picked_up(self):
+        rows = data_store.get_rows(CLINICS_FILE)
+        with open(CLINICS_FILE, 'a', newline='') as file:
+            file.write('4,Southbank Clinic,"Southbank, VIC 3006"\r\n')
+
+        reloaded = data_store.get_rows(CLINICS_FILE)
+        self.assertIsNot(reloaded, rows)
+        self.assertEqual(data_store.get_lookup(CLINICS_FILE)['4']['name'], 'Southbank Clinic')
+
+    def test_load_csv_data_returns_an_editable_copy(self):
+        rows = load_csv_data(CLINICS_FILE)
+        rows[0]['name'] = 'Renamed'
+        self.assertEqual(data_store.get_lookup(CLINICS_FILE)['1']['name'], 'Monash Medical Center')
+
+        self.assertTrue(save_csv_data(CLINICS_FILE, rows, CLINIC_FIELDS))
+        self.assertEqual(data_store.get_lookup(CLINICS_FILE)['1']['name'], 'Renamed')
+
+    def test_missing_table_reads_as_empty(self):
+        self.assertEqual(data_store.get_rows(os.path.join(DATA_DIR, 'missing.csv')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Date-range queries over the sorted date index.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+from datetime import datetime
+
+from utils import data_store
+from utils.date_index import DateRangeIndex
+from utils.helpers import append_csv_row, update_csv_field
+from utils.records import Appointment
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+APPOINTMENTS_FILE = os.path.join(DATA_DIR, 'appointments.csv')
+APPOINTMENT_FIELDS = ['id', 'date', 'time', 'status']
+
+
+def _appointment(appt_id, date, time):
+    return {'id': appt_id, 'date': date, 'time': time, 'status': 'confirmed'}
+
+
+ROWS = [
+    _appointment('1', '2030-01-02', '9:00'),
+    _appointment('2', '2030-01-01', '13:00'),
+    _appointment('3', '2030-01-01', '9:00'),
+    _appointment('4', 'someday', '9:00'),
+    _appointment('5', '2030-01-01', '9:00'),
+]
+
+
+def _ids(rows):
+    return [row['id'] for row in rows]
+
+
+class DateRangeIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = DateRangeIndex(Appointment(row) for row in ROWS)
+
+    def test_rows_are_in_date_order_with_ties_in_table_order(self):
+        self.assertEqual(_ids(self.index.between()), ['3', '5', '2', '1'])
+        self.assertEqual(_ids(self.index.undated), ['4'])
+        self.assertEqual(len(self.index), 5)
+
+    def test_between_is_half_open(self):
+        rows = self.index.between(datetime(2030, 1, 1, 9), datetime(2030, 1, 1, 13))
+        self.assertEqual(_ids(rows), ['3', '5'])
+        self.assertEqual(_ids(self.index.between(start=datetime(2030, 1, 1, 10))), ['2', '1'])
+
+    def test_after_is_strict(self):
+        self.assertEqual(_ids(self.index.after(datetime(2030, 1, 1, 13))), ['1'])
+        self.assertEqual(self.index.after(datetime(2031, 1, 1)), [])
+
+    def test_discard_and_re_add_after_a_change(self):
+        row = self.index.between()[0]
+        self.index.discard(row)
+        row['date'] = '2030-01-03'
+        self.index.add(row)
+        self.assertEqual(_ids(self.index.between()), ['5', '2', '1', '3'])
+
+        undated = self.index.undated[0]
+        self.index.discard(undated)
+        self.assertEqual(self.index.undated, [])
+
+
+class MaintainedDateIndexTest(DataDirTestCase):
+
+    def test_index_follows_writes_to_the_table(self):
+        self.write_table(APPOINTMENTS_FILE, ROWS, APPOINTMENT_FIELDS)
+        index = data_store.get_date_index(APPOINTMENTS_FILE)
+
+        append_csv_row(APPOINTMENTS_FILE, _appointment('6', '2029-12-31', '9:00'))
+        update_csv_field(APPOINTMENTS_FILE, '4', 'date', '2030-01-05')
+
+        self.assertIs(data_store.get_date_index(APPOINTMENTS_FILE), index)
+        self.assertEqual(_ids(index.between()), ['6', '3', '5', '2', '1', '4'])
+
+
+if __name__ == '__main__':
+    unittest.main()
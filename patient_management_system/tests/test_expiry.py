@@ -0,0 +1,88 @@
+"""
+Sweeping past appointments to attended.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from utils import data_store, expiry
+from utils.expiry import sweep_expired, sweep_if_due
+from utils.helpers import append_csv_row
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+APPOINTMENTS_FILE = os.path.join(DATA_DIR, 'appointments.csv')
+APPOINTMENT_FIELDS = ['id', 'patient_email', 'doctor_id', 'clinic_id', 'date', 'time',
+                      'duration', 'reason', 'status', 'slot_id']
+
+
+def _appointment(appt_id, date, time, status='confirmed'):
+    return {'id': appt_id, 'patient_email': 'patient1@student.monash.edu', 'doctor_id': '1',
+            'clinic_id': '1', 'date': date, 'time': time, 'duration': '15',
+            'reason': 'Checkup', 'status': status, 'slot_id': ''}
+
+
+def _statuses():
+    return {row['id']: row['status'] for row in data_store.get_rows(APPOINTMENTS_FILE)}
+
+
+class SweepTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(expiry._state, swept_until=None, last_run=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.write_table(APPOINTMENTS_FILE, [
+            _appointment('1', '2030-01-01', '9:00'),
+            _appointment('2', '2030-01-01', '10:00', status='cancelled'),
+            _appointment('3', '2030-01-01', '11:00'),
+            _appointment('4', '2030-01-02', '9:00'),
+        ], APPOINTMENT_FIELDS)
+
+    def test_only_confirmed_appointments_that_started_are_swept(self):
+        self.assertEqual(sweep_expired(datetime(2030, 1, 1, 10, 30)), 1)
+        self.assertEqual(_statuses(), {'1': 'attended', '2': 'cancelled', '3': 'confirmed', '4': 'confirmed'})
+
+        data_store.invalidate()
+        self.assertEqual(_statuses()['1'], 'attended')
+
+    def test_later_passes_take_what_started_since(self):
+        sweep_expired(datetime(2030, 1, 1, 10, 30))
+        self.assertEqual(sweep_expired(datetime(2030, 1, 1, 10, 45)), 0)
+        self.assertEqual(sweep_expired(datetime(2030, 1, 2, 12, 0)), 2)
+        self.assertEqual(_statuses()['4'], 'attended')
+
+    def test_booking_made_for_a_time_already_swept_is_caught(self):
+        sweep_expired(datetime(2030, 1, 1, 10, 30))
+        append_csv_row(APPOINTMENTS_FILE, _appointment('5', '2030-01-01', '8:00'))
+
+        self.assertEqual(sweep_expired(datetime(2030, 1, 1, 10, 35)), 1)
+        self.assertEqual(_statuses()['5'], 'attended')
+
+    def test_late_booking_is_caught_after_a_reload(self):
+        sweep_expired(datetime(2030, 1, 1, 10, 30))
+        # another terminal books a past slot
+        with open(APPOINTMENTS_FILE, 'a', newline='') as file:
+            file.write('5,p@student.monash.edu,1,1,2030-01-01,8:00,15,Checkup,confirmed,\r\n')
+
+        self.assertEqual(sweep_expired(datetime(2030, 1, 1, 10, 35)), 1)
+        self.assertEqual(_statuses()['5'], 'attended')
+
+    def test_sweep_if_due_waits_between_passes(self):
+        with mock.patch.object(expiry, 'sweep_expired') as sweep:
+            sweep_if_due()
+            self.assertEqual(sweep.call_count, 1)
+        expiry._state['last_run'] = expiry.time.monotonic()
+        with mock.patch.object(expiry, 'sweep_expired') as sweep:
+            sweep_if_due()
+            sweep.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Composable record filters.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from utils.filters import RecordFilter
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+CLINICS_FILE = os.path.join(DATA_DIR, 'clinics.csv')
+DOCTORS_FILE = os.path.join(DATA_DIR, 'doctors.csv')
+
+
+def _slot(slot_id, doctor_id, clinic_id, date, status='available'):
+    return {'id': slot_id, 'doctor_id': doctor_id, 'clinic_id': clinic_id, 'date': date, 'status': status}
+
+
+SLOTS = [
+    _slot('1', '1', '1', '2030-01-01'),
+    _slot('2', '2', '1', '2030-01-02', status='booked'),
+    _slot('3', '1', '2', '2030-01-03'),
+    _slot('4', '2', '2', '2030-01-04'),
+]
+
+
+def _ids(rows):
+    return [row['id'] for row in rows]
+
+
+class RecordFilterTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_table(DOCTORS_FILE, [
+            {'id': '1', 'full_name': 'Dr John Smith', 'specialty': 'General Practice'},
+            {'id': '2', 'full_name': 'Dr Mei Lee', 'specialty': 'Dermatology'},
+        ], ['id', 'full_name', 'specialty'])
+        self.write_table(CLINICS_FILE, [
+            {'id': '1', 'location': 'Clayton, VIC 3168'},
+            {'id': '2', 'location': 'Ringwood, VIC 3134'},
+        ], ['id', 'location'])
+
+    def test_no_criteria_keeps_every_row(self):
+        flt = RecordFilter(gp='', status=None)
+        self.assertFalse(flt)
+        self.assertEqual(_ids(flt.apply(SLOTS)), ['1', '2', '3', '4'])
+        self.assertEqual(flt.describe(), "All appointments")
+
+    def test_criteria_combine(self):
+        self.assertEqual(_ids(RecordFilter(doctor_id='1').apply(SLOTS)), ['1', '3'])
+        self.assertEqual(_ids(RecordFilter(date_from='2030-01-02', date_to='2030-01-03').apply(SLOTS)), ['2', '3'])
+        self.assertEqual(_ids(RecordFilter(status='available', clinic_id='2').apply(SLOTS)), ['3', '4'])
+
+    def test_text_criteria_go_through_the_search_indexes(self):
+        self.assertEqual(_ids(RecordFilter(gp='smith').apply(SLOTS)), ['1', '3'])
+        self.assertEqual(_ids(RecordFilter(gp='derm').apply(SLOTS)), ['2', '4'])
+        self.assertEqual(_ids(RecordFilter(suburb='3134').apply(SLOTS)), ['3', '4'])
+        # an id and a text criterion must both hold
+        self.assertEqual(RecordFilter(doctor_id='2', gp='smith').apply(SLOTS), [])
+
+    def test_where_returns_a_new_filter(self):
+        base = RecordFilter(gp='smith')
+        narrowed = base.where(date_from='2030-01-02')
+        self.assertEqual(base.criteria, {'gp': 'smith'})
+        self.assertEqual(_ids(narrowed.apply(SLOTS)), ['3'])
+        self.assertEqual(narrowed.where(gp='').criteria, {'date_from': '2030-01-02'})
+
+    def test_describe(self):
+        self.assertEqual(RecordFilter().on_date('2030-01-01').describe(), "Date: 2030-01-01")
+        self.assertEqual(RecordFilter(date_to='2030-01-01', suburb='clayton').describe(),
+                         "Until: 2030-01-01, Suburb: clayton")
+
+    def test_unknown_field_is_rejected(self):
+        with self.assertRaises(ValueError):
+            RecordFilter(colour='red')
+
+
+if __name__ == '__main__':
+    unittest.main()
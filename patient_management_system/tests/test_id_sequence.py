@@ -0,0 +1,50 @@
+"""
+Id allocation from the per-table sequence.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from utils.helpers import append_csv_row, get_next_id, reserve_ids
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+CLINICS_FILE = os.path.join(DATA_DIR, 'clinics.csv')
+FIELDS = ['id', 'name']
+
+
+class IdSequenceTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # ids are compared as numbers, and rows without one are skipped
+        self.write_table(CLINICS_FILE, [{'id': '9', 'name': 'a'}, {'id': '10', 'name': 'b'},
+                                        {'id': '', 'name': 'c'}], FIELDS)
+
+    def test_next_id_follows_the_highest_numeric_id(self):
+        self.assertEqual(get_next_id(CLINICS_FILE), '11')
+
+    def test_reserved_ranges_are_never_handed_out_twice(self):
+        self.assertEqual(reserve_ids(CLINICS_FILE, 3), ['11', '12', '13'])
+        self.assertEqual(get_next_id(CLINICS_FILE), '14')
+
+    def test_appended_ids_advance_the_sequence(self):
+        get_next_id(CLINICS_FILE)
+        append_csv_row(CLINICS_FILE, {'id': '50', 'name': 'd'})
+        self.assertEqual(get_next_id(CLINICS_FILE), '51')
+
+    def test_empty_table_starts_at_one(self):
+        self.assertEqual(get_next_id(os.path.join(DATA_DIR, 'missing.csv')), '1')
+
+    def test_sequence_is_rebuilt_after_another_process_writes(self):
+        get_next_id(CLINICS_FILE)
+        with open(CLINICS_FILE, 'a', newline='') as file:
+            file.write('70,e\r\n')
+        self.assertEqual(get_next_id(CLINICS_FILE), '71')
+
+
+if __name__ == '__main__':
+    unittest.main()
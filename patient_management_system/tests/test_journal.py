@@ -0,0 +1,87 @@
+"""
+Journalled single-field changes.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+from unittest import mock
+
+from utils import data_store, storage
+from utils.helpers import update_csv_field, update_csv_fields
+from utils.storage import CsvBackend
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+SLOTS_FILE = os.path.join(DATA_DIR, 'slots.csv')
+SLOTS_JOURNAL = os.path.join(DATA_DIR, 'slots.journal.csv')
+SLOT_FIELDS = ['id', 'doctor_id', 'clinic_id', 'date', 'time', 'duration', 'status']
+
+
+def _slot(slot_id):
+    return {'id': slot_id, 'doctor_id': '1', 'clinic_id': '1', 'date': '2030-01-01',
+            'time': '09:00', 'duration': '15', 'status': 'available'}
+
+
+def _read(path):
+    with open(path, newline='') as file:
+        return file.read()
+
+
+def _status_on_disk(slot_id):
+    rows, _ = CsvBackend().read_table(SLOTS_FILE)
+    return {row['id']: row['status'] for row in rows}[slot_id]
+
+
+class JournalTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_table(SLOTS_FILE, [_slot('1'), _slot('2')], SLOT_FIELDS)
+
+    def test_change_is_journalled_not_rewritten(self):
+        before = _read(SLOTS_FILE)
+        self.assertTrue(update_csv_field(SLOTS_FILE, '2', 'status', 'booked'))
+
+        self.assertEqual(_read(SLOTS_FILE), before)
+        self.assertEqual(_read(SLOTS_JOURNAL).splitlines(), ['id,field,value', '2,status,booked'])
+        self.assertEqual(_status_on_disk('2'), 'booked')
+        self.assertEqual(data_store.get_lookup(SLOTS_FILE)['2']['status'], 'booked')
+
+    def test_later_entries_win(self):
+        update_csv_fields(SLOTS_FILE, [('1', 'status', 'booked'), ('1', 'status', 'available')])
+        self.assertEqual(_status_on_disk('1'), 'available')
+
+    def test_torn_last_line_is_ignored(self):
+        update_csv_field(SLOTS_FILE, '1', 'status', 'booked')
+        with open(SLOTS_JOURNAL, 'a', newline='') as file:
+            file.write('2,status')  # an append cut short by a crash
+        self.assertEqual(_status_on_disk('1'), 'booked')
+        self.assertEqual(_status_on_disk('2'), 'available')
+
+        # the next entry starts on a line of its own
+        update_csv_field(SLOTS_FILE, '2', 'status', 'booked')
+        self.assertEqual(_status_on_disk('2'), 'booked')
+
+    def test_journal_is_compacted_into_the_table(self):
+        with mock.patch.object(storage, 'JOURNAL_COMPACT_BYTES', 40):
+            update_csv_field(SLOTS_FILE, '1', 'status', 'booked')
+            self.assertTrue(os.path.exists(SLOTS_JOURNAL))
+            update_csv_field(SLOTS_FILE, '2', 'status', 'booked')
+
+        self.assertFalse(os.path.exists(SLOTS_JOURNAL))
+        self.assertEqual(_read(SLOTS_FILE).count('booked'), 2)
+        data_store.invalidate()
+        self.assertEqual(data_store.get_lookup(SLOTS_FILE)['1']['status'], 'booked')
+
+    def test_full_rewrite_drops_the_journal(self):
+        update_csv_field(SLOTS_FILE, '1', 'status', 'booked')
+        CsvBackend().write_table(SLOTS_FILE, [_slot('1')], SLOT_FIELDS)
+        self.assertFalse(os.path.exists(SLOTS_JOURNAL))
+        self.assertEqual(_status_on_disk('1'), 'available')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+The data directory lock and compare-and-set bookings.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from utils import data_store, helpers
+from utils.helpers import Transaction, data_lock
+from utils.storage import CsvBackend
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+SLOTS_FILE = os.path.join(DATA_DIR, 'slots.csv')
+SLOT_FIELDS = ['id', 'doctor_id', 'clinic_id', 'date', 'time', 'duration', 'status']
+
+
+def _locked_elsewhere():
+    """Try the lock from a second open file, as another terminal would."""
+    with open(helpers.LOCK_FILE, 'a+') as file:
+        try:
+            helpers.fcntl.flock(file.fileno(), helpers.fcntl.LOCK_EX | helpers.fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        helpers.fcntl.flock(file.fileno(), helpers.fcntl.LOCK_UN)
+        return False
+
+
+@unittest.skipIf(helpers.fcntl is None, "needs fcntl")
+class DataLockTest(DataDirTestCase):
+
+    def test_lock_is_held_until_the_outermost_block_ends(self):
+        with data_lock():
+            with data_lock():
+                self.assertTrue(_locked_elsewhere())
+            self.assertTrue(_locked_elsewhere())
+        self.assertFalse(_locked_elsewhere())
+
+
+class CompareAndSetTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_table(SLOTS_FILE, [
+            {'id': '5', 'doctor_id': '1', 'clinic_id': '1', 'date': '2030-01-01',
+             'time': '09:00', 'duration': '15', 'status': 'available'},
+        ], SLOT_FIELDS)
+
+    def _book(self):
+        txn = Transaction()
+        txn.update(SLOTS_FILE, '5', 'status', 'booked', expected='available')
+        return txn
+
+    def test_slot_booked_meanwhile_is_a_conflict(self):
+        shown = data_store.get_lookup(SLOTS_FILE)['5']['status']
+        self.assertEqual(shown, 'available')
+        # another terminal books the slot while it is on screen here
+        CsvBackend().update_fields(SLOTS_FILE, [('5', 'status', 'booked')])
+
+        txn = self._book()
+        self.assertFalse(txn.commit())
+        self.assertEqual(txn.conflicts, [(SLOTS_FILE, '5', 'status')])
+
+    def test_second_booking_of_the_same_slot_is_refused(self):
+        self.assertTrue(self._book().commit())
+        self.assertFalse(self._book().commit())
+
+    def test_unknown_row_is_a_conflict(self):
+        txn = Transaction()
+        txn.update(SLOTS_FILE, '99', 'status', 'booked', expected='available')
+        self.assertFalse(txn.commit())
+        self.assertEqual(len(txn.conflicts), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
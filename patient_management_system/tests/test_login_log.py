@@ -0,0 +1,56 @@
+"""
+The background login audit log.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import csv
+import os
+import unittest
+from unittest import mock
+
+from utils import login_log
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+LOGIN_LOG_FILE = os.path.join(DATA_DIR, 'login_logs.csv')
+
+
+def _logged():
+    with open(LOGIN_LOG_FILE, newline='') as file:
+        return list(csv.DictReader(file))
+
+
+class LoginLogTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # skip the DNS lookup
+        patcher = mock.patch.dict(login_log._worker, ip='10.0.0.1')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_queued_events_are_written_on_flush(self):
+        login_log.log_login_event('a@monash.edu')
+        login_log.log_login_event('b@monash.edu')
+        login_log.flush()
+
+        rows = _logged()
+        self.assertEqual([row['email'] for row in rows], ['a@monash.edu', 'b@monash.edu'])
+        self.assertEqual(rows[0]['ip_address'], '10.0.0.1')
+        self.assertEqual(list(rows[0]), login_log.LOGIN_LOG_FIELDS)
+
+    def test_full_log_is_rolled_over(self):
+        login_log._write([{'email': 'a@monash.edu', 'timestamp': '2030-01-01 09:00:00'}])
+        with mock.patch.object(login_log, 'LOGIN_LOG_MAX_BYTES', 1):
+            login_log._write([{'email': 'b@monash.edu', 'timestamp': '2030-01-01 09:01:00'}])
+            login_log._write([{'email': 'c@monash.edu', 'timestamp': '2030-01-01 09:02:00'}])
+
+        rolled = sorted(name for name in os.listdir(DATA_DIR) if name.startswith('login_logs-'))
+        self.assertEqual(len(rolled), 2)  # names within the same second get a suffix
+        self.assertEqual([row['email'] for row in _logged()], ['c@monash.edu'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Paging through slot listings.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import io
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from utils import pager
+from utils.pager import Pager
+
+
+class CountingSource:
+    """A generator of numbered rows that records how many were pulled."""
+
+    def __init__(self, count):
+        self.count = count
+        self.pulled = 0
+
+    def __iter__(self):
+        for i in range(1, self.count + 1):
+            self.pulled += 1
+            yield {'id': str(i)}
+
+
+def _run(table, answers):
+    """Run a pager with scripted answers; return (result, printed text)."""
+    out = io.StringIO()
+    with mock.patch.object(pager, 'clear_screen'), \
+            mock.patch('builtins.input', side_effect=answers), redirect_stdout(out):
+        result = table.run()
+    return result, out.getvalue()
+
+
+def _pager(rows, **kwargs):
+    return Pager(rows, "Slots", "ID", lambda row: f"row {row['id']}", page_size=10, **kwargs)
+
+
+class PagerTest(unittest.TestCase):
+
+    def test_only_the_rows_needed_are_pulled(self):
+        source = CountingSource(1000)
+        table = _pager(iter(source))
+        self.assertFalse(table.is_empty())
+        self.assertEqual(source.pulled, 1)
+
+        _, text = _run(table, ['c'])
+        # one page plus one row to know there is a next page
+        self.assertEqual(source.pulled, 11)
+        self.assertIn("row 10", text)
+        self.assertNotIn("row 11", text)
+        self.assertIn("Page 1\n", text)  # total unknown for a generator
+
+    def test_next_prev_and_jump(self):
+        table = _pager([{'id': str(i)} for i in range(1, 26)])
+        _, text = _run(table, ['n', 'c'])
+        self.assertEqual(table.page, 1)
+        self.assertIn("Page 2 of 3", text)
+
+        _run(table, ['p', 'c'])
+        self.assertEqual(table.page, 0)
+
+        # jumping past the end stops at the last page
+        _, text = _run(table, ['j 9', 'c'])
+        self.assertEqual(table.page, 2)
+        self.assertIn("row 25", text)
+
+    def test_picking_a_row_by_key(self):
+        table = _pager([{'id': str(i)} for i in range(1, 26)], key=lambda row: row['id'])
+        row, _ = _run(table, ['7'])
+        self.assertEqual(row, {'id': '7'})
+
+        # rows not pulled yet cannot be picked
+        row, text = _run(table, ['20', '', 'c'])
+        self.assertIsNone(row)
+        self.assertIn("No row with that ID", text)
+
+    def test_empty_source(self):
+        self.assertTrue(_pager(iter([])).is_empty())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Password hashing, re-hashing on login, and the plaintext migration.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+from unittest import mock
+
+from modules import login
+from utils import data_store, passwords
+from utils.hash_passwords import hash_plaintext_passwords
+from utils.passwords import hash_password, verify_password, needs_rehash, is_hashed
+from utils.users import find_user
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+USERS_FILE = os.path.join(DATA_DIR, 'users.csv')
+USER_FIELDS = ['email', 'password', 'role']
+
+# keep the tests fast; the cost only has to match between hash and check
+ITERATIONS = 1000
+
+
+def _raw_users_file():
+    with open(USERS_FILE) as file:
+        return file.read()
+
+
+@mock.patch.object(passwords, 'PBKDF2_ITERATIONS', ITERATIONS)
+class PasswordHashTest(unittest.TestCase):
+
+    def test_hash_verifies_only_the_right_password(self):
+        stored = hash_password('Monash1234!')
+        self.assertTrue(is_hashed(stored))
+        self.assertTrue(verify_password('Monash1234!', stored))
+        self.assertFalse(verify_password('monash1234!', stored))
+
+    def test_same_password_gets_a_different_salt(self):
+        self.assertNotEqual(hash_password('Monash1234!'), hash_password('Monash1234!'))
+
+    def test_plaintext_and_other_costs_need_a_rehash(self):
+        self.assertTrue(needs_rehash('Monash1234!'))
+        self.assertTrue(needs_rehash(hash_password('Monash1234!', iterations=ITERATIONS + 1)))
+        self.assertFalse(needs_rehash(hash_password('Monash1234!')))
+
+
+@mock.patch.object(passwords, 'PBKDF2_ITERATIONS', ITERATIONS)
+class PlaintextPasswordTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_table(USERS_FILE, [
+            {'email': 'admin@monash.edu', 'password': 'Admin1234!', 'role': 'admin'},
+            {'email': 'patient1@student.monash.edu', 'password': 'Monash1234!', 'role': 'patient'},
+        ], USER_FIELDS)
+
+    def test_login_rewrites_the_plaintext_password_on_disk(self):
+        self.assertIsNotNone(login.authenticate('patient1@student.monash.edu', 'Monash1234!'))
+
+        self.assertNotIn('Monash1234!', _raw_users_file())
+        self.assertFalse(os.path.exists(USERS_FILE.replace('.csv', '.journal.csv')))
+        data_store.invalidate()
+        stored = find_user('patient1@student.monash.edu')['password']
+        self.assertTrue(is_hashed(stored))
+        self.assertIsNotNone(login.authenticate('patient1@student.monash.edu', 'Monash1234!'))
+
+    def test_wrong_password_changes_nothing(self):
+        self.assertIsNone(login.authenticate('patient1@student.monash.edu', 'Wrong1234!'))
+        self.assertIn('Monash1234!', _raw_users_file())
+
+    def test_migration_hashes_every_plaintext_row(self):
+        self.assertEqual(hash_plaintext_passwords(), 2)
+
+        raw = _raw_users_file()
+        self.assertNotIn('Admin1234!', raw)
+        self.assertNotIn('Monash1234!', raw)
+        data_store.invalidate()
+        self.assertIsNotNone(login.authenticate('admin@monash.edu', 'Admin1234!'))
+        self.assertEqual(hash_plaintext_passwords(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Typed appointment and slot records.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import csv
+import io
+import unittest
+from datetime import date, datetime
+
+from utils.records import Appointment, Slot, record_type
+
+
+def _slot(**changes):
+    row = {'id': '5', 'doctor_id': '1', 'clinic_id': '1', 'date': '2030-01-01',
+           'time': '9:05', 'duration': '15', 'status': 'available'}
+    row.update(changes)
+    return row
+
+
+class RecordTest(unittest.TestCase):
+
+    def test_date_and_time_are_parsed_once_loaded(self):
+        slot = Slot(_slot())
+        self.assertEqual(slot.start, datetime(2030, 1, 1, 9, 5))
+        self.assertEqual(slot.ordinal, date(2030, 1, 1).toordinal())
+
+    def test_changing_the_date_or_time_reparses(self):
+        slot = Slot(_slot())
+        slot['time'] = '14:30'
+        self.assertEqual(slot.start, datetime(2030, 1, 1, 14, 30))
+        slot['date'] = 'soon'
+        self.assertIsNone(slot.start)
+        self.assertIsNone(slot.ordinal)
+
+    def test_bad_time_keeps_the_day(self):
+        slot = Slot(_slot(time='noon'))
+        self.assertIsNone(slot.start)
+        self.assertEqual(slot.ordinal, date(2030, 1, 1).toordinal())
+
+    def test_reads_like_the_row_it_replaces(self):
+        row = _slot(note='walk-in')
+        slot = Slot(row)
+        self.assertEqual(dict(slot), row)
+        self.assertEqual(list(slot), list(row))
+        self.assertEqual(slot['note'], 'walk-in')
+        self.assertIsNone(slot.get('reason'))
+        self.assertNotIn('reason', slot)
+        with self.assertRaises(KeyError):
+            slot['reason']
+
+    def test_missing_columns_are_not_invented(self):
+        appt = Appointment({'id': '1', 'date': '2030-01-01', 'time': '9:00'})
+        self.assertEqual(len(appt), 3)
+        self.assertEqual(dict(appt), {'id': '1', 'date': '2030-01-01', 'time': '9:00'})
+
+    def test_can_be_written_by_dictwriter(self):
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=list(_slot()), lineterminator='\n')
+        writer.writerow(Slot(_slot()))
+        self.assertEqual(out.getvalue(), '5,1,1,2030-01-01,9:05,15,available\n')
+
+    def test_equality_is_by_identity(self):
+        first, second = Slot(_slot()), Slot(_slot())
+        self.assertNotEqual(first, second)
+        self.assertEqual(len({first, second}), 2)
+
+    def test_record_type_by_table(self):
+        self.assertIs(record_type('../data/slots.csv'), Slot)
+        self.assertIs(record_type('../data/appointments.csv'), Appointment)
+        self.assertIsNone(record_type('../data/users.csv'))
+
+
+if __name__ == '__main__':
+    unittest.main()
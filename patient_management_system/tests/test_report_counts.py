@@ -0,0 +1,90 @@
+"""
+Pre-aggregated appointment counts for the reports.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+from unittest import mock
+
+from utils import data_store
+from utils.helpers import update_csv_field
+from utils.report_index import AppointmentCounts, get_appointment_counts
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+APPOINTMENTS_FILE = os.path.join(DATA_DIR, 'appointments.csv')
+AGGREGATES_FILE = os.path.join(DATA_DIR, 'appointments.aggregates.json')
+APPOINTMENT_FIELDS = ['id', 'doctor_id', 'clinic_id', 'date', 'reason', 'status']
+
+
+def _appointment(appt_id, date, reason='Checkup', status='confirmed', doctor_id='1'):
+    return {'id': appt_id, 'doctor_id': doctor_id, 'clinic_id': '1', 'date': date,
+            'reason': reason, 'status': status}
+
+
+APPOINTMENTS = [
+    _appointment('1', '2030-01-01'),
+    _appointment('2', '2030-01-01'),
+    _appointment('3', '2030-01-02', reason=''),
+    _appointment('4', '2030-01-03', status='cancelled', doctor_id='2'),
+]
+
+
+class AppointmentCountsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.counts = AppointmentCounts(APPOINTMENTS)
+
+    def test_totals_over_a_date_range(self):
+        self.assertEqual(self.counts.totals(), {
+            ('1', '1', 'Checkup', 'confirmed'): 2,
+            ('1', '1', 'Unknown', 'confirmed'): 1,
+            ('1', '2', 'Checkup', 'cancelled'): 1,
+        })
+        self.assertEqual(self.counts.totals('2030-01-02', '2030-01-02'),
+                         {('1', '1', 'Unknown', 'confirmed'): 1})
+        self.assertEqual(self.counts.totals(date_to='2029-12-31'), {})
+
+    def test_status_change_moves_a_count(self):
+        row = dict(APPOINTMENTS[0])
+        self.counts.discard(row)
+        row['status'] = 'cancelled'
+        self.counts.add(row)
+        self.assertEqual(self.counts.totals('2030-01-01', '2030-01-01'), {
+            ('1', '1', 'Checkup', 'confirmed'): 1,
+            ('1', '1', 'Checkup', 'cancelled'): 1,
+        })
+
+    def test_json_round_trip(self):
+        restored = AppointmentCounts.from_json(self.counts.to_json())
+        self.assertEqual(restored.totals(), self.counts.totals())
+        self.assertEqual(restored.dates, self.counts.dates)
+
+
+class SidecarTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_table(APPOINTMENTS_FILE, APPOINTMENTS, APPOINTMENT_FIELDS)
+
+    def test_unchanged_table_is_answered_from_the_sidecar(self):
+        totals = get_appointment_counts().totals()
+        self.assertTrue(os.path.exists(AGGREGATES_FILE))
+
+        data_store.invalidate()
+        with mock.patch.object(data_store, 'get_maintained', side_effect=AssertionError("table read")):
+            self.assertEqual(get_appointment_counts().totals(), totals)
+
+    def test_changed_table_refreshes_the_counts(self):
+        get_appointment_counts()
+        update_csv_field(APPOINTMENTS_FILE, '1', 'status', 'attended')
+        totals = get_appointment_counts().totals('2030-01-01', '2030-01-01')
+        self.assertEqual(totals, {('1', '1', 'Checkup', 'confirmed'): 1,
+                                  ('1', '1', 'Checkup', 'attended'): 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
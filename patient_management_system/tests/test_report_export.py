@@ -0,0 +1,78 @@
+"""
+Streaming report exports.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import csv
+import gzip
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime
+from unittest import mock
+
+from modules import report_generator
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+
+AGG = {
+    '1': {'total': 3, 'by_gp': {'7': 2, '8': 1}, 'by_type': {'Checkup': 3}},
+    '2': {'total': 1, 'by_gp': {'7': 1}, 'by_type': {'Flu': 1}},
+}
+NAMES = {'1': 'Clayton', '2': 'Ringwood', '7': 'Dr Smith', '8': 'Dr Lee'}
+DIMENSIONS = [
+    ("GP", "GP Counts", 'by_gp', NAMES.get),
+    ("Type", "Type Breakdown", 'by_type', str),
+]
+
+
+def _export(answers, start_dt=None, end_dt=None):
+    with mock.patch('builtins.input', side_effect=answers), redirect_stdout(io.StringIO()):
+        report_generator._export_report("clinic_report", start_dt, end_dt, AGG, "Clinic",
+                                        NAMES.get, DIMENSIONS)
+
+
+class TidyRowsTest(unittest.TestCase):
+
+    def test_one_row_per_group_and_dimension_value(self):
+        rows = list(report_generator._tidy_rows(AGG, NAMES.get, DIMENSIONS))
+        self.assertEqual(rows, [
+            ('Clayton', 3, 'GP', 'Dr Smith', 2),
+            ('Clayton', 3, 'GP', 'Dr Lee', 1),
+            ('Clayton', 3, 'Type', 'Checkup', 3),
+            ('Ringwood', 1, 'GP', 'Dr Smith', 1),
+            ('Ringwood', 1, 'Type', 'Flu', 1),
+        ])
+
+    def test_text_lines(self):
+        text = ''.join(report_generator._text_lines(AGG, "Clinic", NAMES.get, DIMENSIONS))
+        self.assertTrue(text.startswith("Clinic: Clayton (Total: 3)\n  GP Counts:\n    Dr Smith: 2\n"))
+        self.assertIn("Clinic: Ringwood (Total: 1)\n", text)
+
+
+class ExportReportTest(DataDirTestCase):
+
+    def test_csv_export(self):
+        _export(['1', 'n'], datetime(2030, 1, 1), datetime(2030, 1, 31))
+        with open(os.path.join(DATA_DIR, 'clinic_report_2030-01-01_2030-01-31.csv'), newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['Clinic', 'Total', 'Dimension', 'Value', 'Count'])
+        self.assertEqual(rows[1], ['Clayton', '3', 'GP', 'Dr Smith', '2'])
+        self.assertEqual(len(rows), 6)
+
+    def test_gzip_text_export(self):
+        _export(['2', 'y'])
+        with gzip.open(os.path.join(DATA_DIR, 'clinic_report_all_all.txt.gz'), 'rt') as f:
+            self.assertTrue(f.read().startswith("Clinic: Clayton (Total: 3)\n"))
+
+    def test_skipping_writes_nothing(self):
+        _export([''])
+        self.assertEqual(os.listdir(DATA_DIR), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Parsing opening hours and generating roster slots.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from utils import data_store
+from utils.roster import parse_hours, roster_slots, generate_roster
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+DOCTORS_FILE = os.path.join(DATA_DIR, 'doctors.csv')
+CLINICS_FILE = os.path.join(DATA_DIR, 'clinics.csv')
+SLOTS_FILE = os.path.join(DATA_DIR, 'slots.csv')
+
+NINE_TO_FIVE = (9 * 60, 17 * 60)
+
+DOCTOR = {'id': '1', 'clinic_id': '1', 'availability': 'Mon,Wed: 9am-11am'}
+CLINIC = {'id': '1', 'operating_hours': 'Mon-Fri: 10am-6pm, Sat: 9am-1pm'}
+
+
+def _times(slots):
+    return [(slot['date'], slot['time']) for slot in slots]
+
+
+class ParseHoursTest(unittest.TestCase):
+
+    def test_day_lists_and_ranges(self):
+        hours = parse_hours("Mon,Tue,Thu,Fri: 9am-5pm")
+        self.assertEqual(sorted(hours), [0, 1, 3, 4])
+        self.assertEqual(hours[0], [NINE_TO_FIVE])
+
+        hours = parse_hours("Mon-Fri: 8:30am-5:30pm, Sat-Sun: 9am-12pm")
+        self.assertEqual(hours[4], [(8 * 60 + 30, 17 * 60 + 30)])
+        self.assertEqual(hours[6], [(9 * 60, 12 * 60)])
+
+    def test_full_day_names_and_24_hour_times(self):
+        self.assertEqual(parse_hours("Monday: 13:00-14:30"), {0: [(13 * 60, 14 * 60 + 30)]})
+
+    def test_noon_and_midnight(self):
+        self.assertEqual(parse_hours("Tue: 12am-12pm"), {1: [(0, 12 * 60)]})
+
+    def test_range_wrapping_over_the_weekend(self):
+        self.assertEqual(sorted(parse_hours("Sat-Mon: 9am-5pm")), [0, 5, 6])
+
+    def test_unparseable_text_gives_no_hours(self):
+        self.assertEqual(parse_hours("By appointment"), {})
+        self.assertEqual(parse_hours(None), {})
+
+
+class RosterSlotsTest(unittest.TestCase):
+
+    def test_doctor_hours_are_limited_to_the_clinic_hours(self):
+        # 2030-01-07 is a Monday
+        slots = list(roster_slots('2030-01-07', '2030-01-09', [DOCTOR], {'1': CLINIC}, 30))
+        self.assertEqual(_times(slots), [('2030-01-07', '10:00'), ('2030-01-07', '10:30'),
+                                         ('2030-01-09', '10:00'), ('2030-01-09', '10:30')])
+        self.assertEqual(slots[0]['status'], 'available')
+        self.assertEqual(slots[0]['duration'], '30')
+
+    def test_doctor_hours_are_used_when_the_clinic_hours_do_not_parse(self):
+        clinic = dict(CLINIC, operating_hours='Call us')
+        slots = list(roster_slots('2030-01-07', '2030-01-07', [DOCTOR], {'1': clinic}, 60))
+        self.assertEqual(_times(slots), [('2030-01-07', '9:00'), ('2030-01-07', '10:00')])
+
+
+class GenerateRosterTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_table(DOCTORS_FILE, [DOCTOR], list(DOCTOR))
+        self.write_table(CLINICS_FILE, [CLINIC], list(CLINIC))
+        self.write_table(SLOTS_FILE, [
+            {'id': '7', 'doctor_id': '1', 'clinic_id': '1', 'date': '2030-01-07',
+             'time': '10:15', 'duration': '15', 'status': 'booked'},
+        ], ['id', 'doctor_id', 'clinic_id', 'date', 'time', 'duration', 'status'])
+
+    def test_existing_and_overlapping_slots_are_skipped(self):
+        self.assertEqual(generate_roster('2030-01-07', '2030-01-07', duration=30), (1, 1))
+        rows = data_store.get_rows(SLOTS_FILE)
+        self.assertEqual([(row['id'], row['time']) for row in rows], [('7', '10:15'), ('8', '10:30')])
+
+    def test_running_twice_creates_nothing_new(self):
+        generate_roster('2030-01-07', '2030-01-09', duration=30)
+        created, _ = generate_roster('2030-01-07', '2030-01-09', duration=30)
+        self.assertEqual(created, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
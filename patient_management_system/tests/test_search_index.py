@@ -0,0 +1,103 @@
+"""
+Trigram search over GPs and clinic suburbs.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from utils.helpers import append_csv_row, update_csv_field
+from utils.search_index import (DoctorSearch, ClinicSearch, clinic_search, doctor_search,
+                                normalize, postcode_of, suburb_of)
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+DOCTORS_FILE = os.path.join(DATA_DIR, 'doctors.csv')
+CLINICS_FILE = os.path.join(DATA_DIR, 'clinics.csv')
+
+DOCTORS = [
+    {'id': '1', 'full_name': 'Dr. John Smith', 'specialty': 'General Practice'},
+    {'id': '2', 'full_name': 'Dr Mei Lee', 'specialty': 'Dermatology'},
+    {'id': '3', 'full_name': 'Dr Anna Smithson', 'specialty': 'Pediatrics'},
+]
+
+
+class TextTest(unittest.TestCase):
+
+    def test_normalize(self):
+        self.assertEqual(normalize("Dr. John  Smith"), "dr john smith")
+        self.assertEqual(normalize(None), "")
+
+    def test_location_parts(self):
+        self.assertEqual(suburb_of('Clayton, VIC 3168'), 'Clayton')
+        self.assertEqual(suburb_of('Ringwood'), 'Ringwood')
+        self.assertEqual(postcode_of('Clayton, VIC 3168'), '3168')
+        self.assertEqual(postcode_of('Ringwood'), '')
+
+
+class DoctorSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = DoctorSearch(DOCTORS)
+
+    def test_substring_of_name_or_specialty(self):
+        self.assertEqual(self.index.search('smith'), {'1', '3'})
+        self.assertEqual(self.index.search('JOHN SMITH'), {'1'})
+        self.assertEqual(self.index.search('derma'), {'2'})
+        self.assertEqual(self.index.search('cardio'), set())
+
+    def test_trigrams_out_of_order_are_not_a_match(self):
+        # 'ithsmi' shares trigrams with 'smith' but is not a substring
+        self.assertEqual(self.index.search('ithsmi'), set())
+
+    def test_short_and_empty_queries(self):
+        self.assertEqual(self.index.search('le'), {'2'})
+        self.assertEqual(self.index.search(''), {'1', '2', '3'})
+
+    def test_similar_ranks_typos(self):
+        self.assertEqual(self.index.similar('jon smith')[0], '1')
+        self.assertEqual(self.index.similar('dermatolgy'), ['2'])
+        self.assertEqual(self.index.similar('zzz'), [])
+
+    def test_discard_and_changed_rows(self):
+        self.index.discard(DOCTORS[0])
+        self.assertEqual(self.index.search('smith'), {'3'})
+        self.index.add(dict(DOCTORS[1], full_name='Dr Mei Smith'))
+        self.assertEqual(self.index.search('smith'), {'2', '3'})
+        self.assertEqual(self.index.search('lee'), set())
+        self.assertEqual(len(self.index), 2)
+
+
+class ClinicSearchTest(unittest.TestCase):
+
+    def test_suburb_and_postcode(self):
+        index = ClinicSearch([{'id': '1', 'name': 'Monash Medical', 'location': 'Clayton, VIC 3168'}])
+        self.assertEqual(index.search('clay'), {'1'})
+        self.assertEqual(index.search('3168'), {'1'})
+        self.assertEqual(index.search('monash'), set())  # the name is not indexed
+
+
+class MaintainedSearchTest(DataDirTestCase):
+
+    def test_indexes_follow_writes_to_their_tables(self):
+        self.write_table(DOCTORS_FILE, DOCTORS, ['id', 'full_name', 'specialty'])
+        self.write_table(CLINICS_FILE, [{'id': '1', 'location': 'Clayton, VIC 3168'}], ['id', 'location'])
+        doctors, clinics = doctor_search(), clinic_search()
+
+        append_csv_row(DOCTORS_FILE, {'id': '4', 'full_name': 'Dr Raj Patel', 'specialty': 'Psychology'})
+        update_csv_field(DOCTORS_FILE, '2', 'specialty', 'Cardiology')
+        update_csv_field(CLINICS_FILE, '1', 'location', 'Ringwood, VIC 3134')
+
+        self.assertIs(doctor_search(), doctors)
+        self.assertEqual(doctors.search('patel'), {'4'})
+        self.assertEqual(doctors.search('cardio'), {'2'})
+        self.assertEqual(doctors.search('derma'), set())
+        self.assertIs(clinic_search(), clinics)
+        self.assertEqual(clinics.search('ringwood'), {'1'})
+        self.assertEqual(clinics.search('clayton'), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
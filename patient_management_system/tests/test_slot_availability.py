@@ -0,0 +1,86 @@
+"""
+The available-slot index behind the booking filters.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from utils import data_store
+from utils.helpers import update_csv_field, append_csv_row
+from utils.slot_index import SlotAvailability
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+SLOTS_FILE = os.path.join(DATA_DIR, 'slots.csv')
+SLOT_FIELDS = ['id', 'doctor_id', 'clinic_id', 'date', 'time', 'duration', 'status']
+
+
+def _slot(slot_id, doctor_id, clinic_id, date, status='available'):
+    return {'id': slot_id, 'doctor_id': doctor_id, 'clinic_id': clinic_id, 'date': date,
+            'time': '09:00', 'duration': '15', 'status': status}
+
+
+SLOTS = [
+    _slot('1', '1', '1', '2030-01-03'),
+    _slot('2', '2', '1', '2030-01-01'),
+    _slot('3', '1', '2', '2030-01-02', status='booked'),
+    _slot('4', '1', '2', '2030-01-01'),
+]
+
+
+def _ids(rows):
+    return [row['id'] for row in rows]
+
+
+class SlotAvailabilityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SlotAvailability([dict(row) for row in SLOTS])
+
+    def test_only_available_slots_are_indexed(self):
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(sorted(self.index.doctor_ids()), ['1', '2'])
+        self.assertEqual(self.index.dates, ['2030-01-01', '2030-01-03'])
+
+    def test_filters_combine_and_keep_table_order(self):
+        self.assertEqual(_ids(self.index.query()), ['1', '2', '4'])
+        self.assertEqual(_ids(self.index.query(doctor_id='1')), ['1', '4'])
+        self.assertEqual(_ids(self.index.query(doctor_id='1', clinic_id='2')), ['4'])
+        self.assertEqual(_ids(self.index.query(date='2030-01-01')), ['2', '4'])
+        self.assertEqual(_ids(self.index.query(date_from='2030-01-02')), ['1'])
+        self.assertEqual(_ids(self.index.query(date_to='2030-01-02', clinic_id='1')), ['2'])
+        self.assertEqual(self.index.query(doctor_id='9'), [])
+
+    def test_booking_and_releasing_move_a_slot(self):
+        row = self.index.rows['1']
+        self.index.discard(row)
+        self.assertEqual(self.index.dates, ['2030-01-01'])
+        self.assertEqual(self.index.dates_between('2030-01-02'), [])
+
+        row['status'] = 'available'
+        self.index.add(row)
+        self.assertEqual(self.index.dates_between('2030-01-02'), ['2030-01-03'])
+        # a released slot goes back to its place in table order
+        self.assertEqual(_ids(self.index.query()), ['1', '2', '4'])
+
+
+class MaintainedAvailabilityTest(DataDirTestCase):
+
+    def test_index_follows_writes_to_the_table(self):
+        self.write_table(SLOTS_FILE, SLOTS, SLOT_FIELDS)
+        index = data_store.get_slot_availability(SLOTS_FILE)
+
+        update_csv_field(SLOTS_FILE, '1', 'status', 'booked')
+        update_csv_field(SLOTS_FILE, '3', 'status', 'available')
+        append_csv_row(SLOTS_FILE, _slot('5', '3', '1', '2030-01-04'))
+
+        self.assertIs(data_store.get_slot_availability(SLOTS_FILE), index)
+        self.assertEqual(_ids(index.query()), ['2', '3', '4', '5'])
+        self.assertEqual(index.dates, ['2030-01-01', '2030-01-02', '2030-01-04'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Duplicate and overlap checks for new slots.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import unittest
+
+from utils.slot_index import SlotConflicts, normalize_time
+
+
+def _slot(time, duration):
+    return {'doctor_id': '1', 'date': '2030-01-01', 'time': time, 'duration': str(duration)}
+
+
+def _conflicts(*slots):
+    return SlotConflicts({('1', '2030-01-01'): [_slot(time, duration) for time, duration in slots]})
+
+
+class SlotConflictsTest(unittest.TestCase):
+
+    def test_same_time_is_a_duplicate_whatever_the_padding(self):
+        self.assertEqual(_conflicts(('9:00', 15)).find('1', '2030-01-01', '09:00', 15), '09:00')
+
+    def test_free_time_between_slots_is_accepted(self):
+        conflicts = _conflicts(('09:00', 15), ('09:30', 15))
+        self.assertIsNone(conflicts.find('1', '2030-01-01', '09:15', 15))
+
+    def test_overlap_with_the_slot_before_or_after(self):
+        conflicts = _conflicts(('09:00', 30), ('10:00', 30))
+        self.assertEqual(conflicts.find('1', '2030-01-01', '09:15', 15), '09:00')
+        self.assertEqual(conflicts.find('1', '2030-01-01', '09:45', 30), '10:00')
+
+    def test_long_slot_behind_an_overlapping_one_is_found(self):
+        # saved slots can overlap once a duration is edited: 09:00 runs to 10:30
+        conflicts = _conflicts(('09:00', 90), ('09:30', 30))
+        self.assertEqual(conflicts.find('1', '2030-01-01', '10:00', 30), '09:00')
+        self.assertIsNone(conflicts.find('1', '2030-01-01', '10:30', 30))
+
+    def test_other_doctors_and_days_do_not_clash(self):
+        conflicts = _conflicts(('09:00', 30))
+        self.assertIsNone(conflicts.find('2', '2030-01-01', '09:00', 30))
+        self.assertIsNone(conflicts.find('1', '2030-01-02', '09:00', 30))
+
+    def test_slots_added_to_a_batch_are_checked_too(self):
+        conflicts = _conflicts()
+        self.assertIsNone(conflicts.find('1', '2030-01-01', '09:00', 60))
+        conflicts.add('1', '2030-01-01', '09:00', 60)
+        self.assertEqual(conflicts.find('1', '2030-01-01', '09:30', 15), '09:00')
+
+
+class NormalizeTimeTest(unittest.TestCase):
+
+    def test_pads_valid_times_and_rejects_invalid_ones(self):
+        self.assertEqual(normalize_time(' 9:05 '), '09:05')
+        self.assertIsNone(normalize_time('24:00'))
+        self.assertIsNone(normalize_time('9am'))
+        self.assertIsNone(normalize_time(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Appointments linked to the slot they were booked on.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+from utils import backfill_slot_ids, data_store
+from utils.slots import slot_of_appointment
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+SLOTS_FILE = os.path.join(DATA_DIR, 'slots.csv')
+APPOINTMENTS_FILE = os.path.join(DATA_DIR, 'appointments.csv')
+SLOT_FIELDS = ['id', 'doctor_id', 'clinic_id', 'date', 'time', 'duration', 'status']
+APPOINTMENT_FIELDS = ['id', 'patient_email', 'doctor_id', 'clinic_id', 'date', 'time',
+                      'duration', 'reason', 'status']
+
+
+def _slot(slot_id, time, status):
+    return {'id': slot_id, 'doctor_id': '1', 'clinic_id': '1', 'date': '2030-01-01',
+            'time': time, 'duration': '15', 'status': status}
+
+
+def _appointment(appt_id, time, **extra):
+    row = {'id': appt_id, 'patient_email': 'patient1@student.monash.edu', 'doctor_id': '1',
+           'clinic_id': '1', 'date': '2030-01-01', 'time': time, 'duration': '15',
+           'reason': 'Checkup', 'status': 'confirmed'}
+    row.update(extra)
+    return row
+
+
+class SlotLinkTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # slot 2 was cancelled and re-added at the same time as slot 3
+        self.write_table(SLOTS_FILE, [
+            _slot('1', '09:00', 'available'),
+            _slot('2', '9:15', 'available'),
+            _slot('3', '09:15', 'booked'),
+        ], SLOT_FIELDS)
+
+    def test_slot_is_found_by_its_id(self):
+        self.assertEqual(slot_of_appointment(_appointment('1', '9:15', slot_id='3'))['id'], '3')
+        self.assertIsNone(slot_of_appointment(_appointment('1', '9:15', slot_id='99')))
+
+    def test_older_appointments_fall_back_to_the_time(self):
+        self.assertEqual(slot_of_appointment(_appointment('1', '9:00'))['id'], '1')
+        self.assertIsNone(slot_of_appointment(_appointment('1', '10:00')))
+
+    def test_backfill_prefers_the_booked_slot(self):
+        self.write_table(APPOINTMENTS_FILE, [
+            _appointment('1', '9:15'),
+            _appointment('2', '10:00'),
+        ], APPOINTMENT_FIELDS)
+        with redirect_stdout(io.StringIO()) as out:
+            backfill_slot_ids.main()
+        self.assertIn("Recorded the slot of 1 appointments (1 without a matching slot)", out.getvalue())
+
+        data_store.invalidate()
+        appointments = data_store.get_lookup(APPOINTMENTS_FILE)
+        self.assertEqual(appointments['1']['slot_id'], '3')
+        self.assertEqual(appointments['2']['slot_id'], '')
+        self.assertEqual(data_store.get_fieldnames(APPOINTMENTS_FILE), APPOINTMENT_FIELDS + ['slot_id'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Slot statistics over encoded columns.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import unittest
+from unittest import mock
+
+from utils import slot_stats
+from utils.slot_stats import SlotColumns, slot_statistics
+
+CLINICS = {
+    '1': {'id': '1', 'location': 'Clayton, VIC 3168'},
+    '2': {'id': '2', 'location': 'Clayton, VIC 3168'},
+    '3': {'id': '3', 'location': 'Ringwood'},
+}
+
+
+def _slot(slot_id, doctor_id, clinic_id, status):
+    return {'id': slot_id, 'doctor_id': doctor_id, 'clinic_id': clinic_id, 'status': status}
+
+
+class SlotStatisticsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [
+            _slot('1', '7', '1', 'available'),
+            _slot('2', '7', '2', 'booked'),
+            _slot('3', '8', '3', 'available'),
+            _slot('4', '8', '3', 'available'),
+        ]
+        self.columns = SlotColumns(self.rows)
+
+    def test_counts_per_gp_and_suburb(self):
+        by_gp, by_suburb = slot_statistics(self.columns, CLINICS)
+        self.assertEqual(by_gp, {'7': (2, 1), '8': (2, 2)})
+        # two clinics in the same suburb are counted together
+        self.assertEqual(by_suburb, {'Clayton': (2, 1), 'Ringwood': (2, 2)})
+
+    def test_changed_and_removed_rows(self):
+        row = self.rows[0]
+        self.columns.discard(row)
+        row['status'] = 'booked'
+        self.columns.add(row)
+        self.columns.discard(self.rows[3])
+
+        by_gp, by_suburb = slot_statistics(self.columns, CLINICS)
+        self.assertEqual(by_gp, {'7': (2, 0), '8': (1, 1)})
+        self.assertEqual(by_suburb, {'Clayton': (2, 0), 'Ringwood': (1, 1)})
+
+    @unittest.skipIf(slot_stats.np is None, "NumPy is not installed")
+    def test_numpy_path_matches_the_plain_loop(self):
+        self.columns.discard(self.rows[1])
+        plain = self.columns.counts()
+        with mock.patch.object(slot_stats, 'NUMPY_MIN_ROWS', 0):
+            self.assertEqual(self.columns.counts(), plain)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+The SQLite storage backend.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+from unittest import mock
+
+from utils import data_store, storage
+from utils.helpers import Transaction, update_csv_field
+from utils.storage import SqliteBackend
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+SLOTS_FILE = os.path.join(DATA_DIR, 'slots.csv')
+USERS_FILE = os.path.join(DATA_DIR, 'users.csv')
+SLOT_FIELDS = ['id', 'doctor_id', 'date', 'status']
+
+
+def _slot(slot_id, status='available'):
+    return {'id': slot_id, 'doctor_id': '1', 'date': '2030-01-01', 'status': status}
+
+
+class SqliteBackendTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.backend = SqliteBackend(os.path.join(DATA_DIR, 'clinic.db'))
+        self.addCleanup(lambda: self.backend._conn and self.backend._conn.close())
+        self.backend.write_table(SLOTS_FILE, [_slot('1'), _slot('2')], SLOT_FIELDS)
+
+    def test_rows_round_trip_in_order(self):
+        rows, fieldnames = self.backend.read_table(SLOTS_FILE)
+        self.assertEqual(fieldnames, SLOT_FIELDS)
+        self.assertEqual(rows, [_slot('1'), _slot('2')])
+        self.assertEqual(self.backend.read_table(os.path.join(DATA_DIR, 'missing.csv')), ([], []))
+
+    def test_every_write_bumps_the_version(self):
+        version = self.backend.version(SLOTS_FILE)
+        self.backend.update_fields(SLOTS_FILE, [('2', 'status', 'booked')])
+        self.assertNotEqual(self.backend.version(SLOTS_FILE), version)
+        self.assertEqual(self.backend.select(SLOTS_FILE, {'status': 'booked'}), [_slot('2', 'booked')])
+
+    def test_append_adds_new_columns(self):
+        self.backend.append_rows(SLOTS_FILE, [dict(_slot('3'), slot_note='late')])
+        rows, fieldnames = self.backend.read_table(SLOTS_FILE)
+        self.assertEqual(fieldnames, SLOT_FIELDS + ['slot_note'])
+        self.assertEqual([row['slot_note'] for row in rows], ['', '', 'late'])
+
+    def test_users_are_addressed_by_email(self):
+        self.backend.write_table(USERS_FILE, [{'email': 'a@monash.edu', 'role': 'patient'}], ['email', 'role'])
+        self.backend.update_fields(USERS_FILE, [('a@monash.edu', 'role', 'admin')])
+        self.assertEqual(self.backend.read_table(USERS_FILE)[0], [{'email': 'a@monash.edu', 'role': 'admin'}])
+
+    def test_commit_is_all_or_nothing(self):
+        with self.assertRaises(Exception):
+            self.backend.commit([
+                {'op': 'update', 'path': SLOTS_FILE, 'updates': [['1', 'status', 'booked']]},
+                {'op': 'append', 'path': SLOTS_FILE, 'rows': [_slot('3')], 'fieldnames': SLOT_FIELDS},
+                # fails half-way through the commit
+                {'op': 'save', 'path': SLOTS_FILE, 'rows': None, 'fieldnames': SLOT_FIELDS},
+            ])
+        rows, _ = self.backend.read_table(SLOTS_FILE)
+        self.assertEqual(rows, [_slot('1'), _slot('2')])
+
+    def test_data_store_reads_through_the_backend(self):
+        with mock.patch.object(storage, '_backend', self.backend):
+            data_store.invalidate()
+            self.assertEqual(data_store.get_lookup(SLOTS_FILE)['1']['status'], 'available')
+            self.assertTrue(update_csv_field(SLOTS_FILE, '1', 'status', 'booked'))
+            self.assertEqual([row['id'] for row in data_store.select(SLOTS_FILE, status='booked')], ['1'])
+
+            txn = Transaction()
+            txn.update(SLOTS_FILE, '1', 'status', 'booked', expected='available')
+            self.assertFalse(txn.commit())
+            data_store.invalidate()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Per-patient appointment timelines.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+from datetime import datetime
+
+from utils.helpers import update_csv_field
+from utils.timeline import get_patient_timeline, status_display
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+APPOINTMENTS_FILE = os.path.join(DATA_DIR, 'appointments.csv')
+CLINICS_FILE = os.path.join(DATA_DIR, 'clinics.csv')
+DOCTORS_FILE = os.path.join(DATA_DIR, 'doctors.csv')
+APPOINTMENT_FIELDS = ['id', 'patient_email', 'doctor_id', 'clinic_id', 'date', 'time',
+                      'duration', 'reason', 'status', 'slot_id']
+
+PATIENT = 'patient1@student.monash.edu'
+OTHER = 'patient2@student.monash.edu'
+
+
+def _appointment(appt_id, date, time, status='confirmed', patient=PATIENT):
+    return {'id': appt_id, 'patient_email': patient, 'doctor_id': '1', 'clinic_id': '1',
+            'date': date, 'time': time, 'duration': '15', 'reason': 'Checkup',
+            'status': status, 'slot_id': ''}
+
+
+def _ids(entries):
+    return [entry.get('id') for entry in entries]
+
+
+class TimelineTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_table(DOCTORS_FILE, [{'id': '1', 'full_name': 'Dr Smith'}], ['id', 'full_name'])
+        self.write_table(CLINICS_FILE, [{'id': '1', 'location': 'Clayton, VIC 3168'}], ['id', 'location'])
+        self.write_table(APPOINTMENTS_FILE, [
+            _appointment('1', '2030-01-02', '9:00'),
+            _appointment('2', '2030-01-01', '13:00'),
+            _appointment('3', '2030-01-03', '9:00', status='cancelled'),
+            _appointment('4', '2030-01-01', '9:00'),
+            _appointment('5', '2030-01-01', '9:00', patient=OTHER),
+        ], APPOINTMENT_FIELDS)
+
+    def test_entries_are_sorted_and_joined(self):
+        timeline = get_patient_timeline(PATIENT)
+        self.assertEqual(_ids(timeline.view('all')), ['4', '2', '1', '3'])
+        entry = timeline.entries[0]
+        self.assertEqual((entry.doctor_name, entry.suburb, entry.status_display),
+                         ('Dr Smith', 'Clayton', 'Confirmed'))
+
+    def test_upcoming_and_past(self):
+        timeline = get_patient_timeline(PATIENT)
+        now = datetime(2030, 1, 1, 12, 0)
+        self.assertEqual(_ids(timeline.upcoming(now)), ['2', '1'])
+        self.assertEqual(_ids(timeline.past(now)), ['4', '3'])
+        # moving past the next start re-partitions
+        later = datetime(2030, 1, 1, 13, 0)
+        self.assertEqual(_ids(timeline.upcoming(later)), ['1'])
+        self.assertEqual(_ids(timeline.past(later)), ['4', '2', '3'])
+
+    def test_only_the_changed_patient_is_rebuilt(self):
+        mine, theirs = get_patient_timeline(PATIENT), get_patient_timeline(OTHER)
+        update_csv_field(APPOINTMENTS_FILE, '1', 'status', 'cancelled by patient')
+
+        self.assertIs(get_patient_timeline(OTHER), theirs)
+        rebuilt = get_patient_timeline(PATIENT)
+        self.assertIsNot(rebuilt, mine)
+        self.assertEqual(rebuilt.entries[2].status_display, 'Cancelled by Patient')
+
+    def test_gp_changes_rebuild_every_timeline(self):
+        timeline = get_patient_timeline(OTHER)
+        self.write_table(DOCTORS_FILE, [{'id': '1', 'full_name': 'Dr Nguyen-Li'}], ['id', 'full_name'])
+        rebuilt = get_patient_timeline(OTHER)
+        self.assertIsNot(rebuilt, timeline)
+        self.assertEqual(rebuilt.entries[0].doctor_name, 'Dr Nguyen-Li')
+
+    def test_status_display(self):
+        self.assertEqual(status_display('cancelled'), 'Cancelled by Clinic')
+        self.assertEqual(status_display('pending'), 'Pending')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Transaction commits with the CSV backend when applying the plan fails.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+from unittest import mock
+
+from utils import data_store, storage
+from utils.helpers import Transaction, recover_transactions, reserve_ids
+from utils.storage import CsvBackend
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+SLOTS_FILE = os.path.join(DATA_DIR, 'slots.csv')
+APPOINTMENTS_FILE = os.path.join(DATA_DIR, 'appointments.csv')
+
+SLOT_FIELDS = ['id', 'doctor_id', 'clinic_id', 'date', 'time', 'duration', 'status']
+APPOINTMENT_FIELDS = ['id', 'patient_email', 'doctor_id', 'clinic_id', 'date', 'time',
+                      'duration', 'reason', 'status', 'slot_id']
+
+
+def _appointment(appt_id, slot_id):
+    return {'id': appt_id, 'patient_email': 'patient1@student.monash.edu', 'doctor_id': '1',
+            'clinic_id': '1', 'date': '2030-01-01', 'time': '9:00', 'duration': '15',
+            'reason': 'Checkup', 'status': 'confirmed', 'slot_id': slot_id}
+
+
+def _booking(appt_id, slot_id):
+    txn = Transaction()
+    txn.update(SLOTS_FILE, slot_id, 'status', 'booked', expected='available')
+    appointment = _appointment(appt_id, slot_id)
+    txn.append(APPOINTMENTS_FILE, [appointment], appointment.keys())
+    return txn
+
+
+def failing_append(failures):
+    """A CsvBackend.append_rows that raises the first `failures` times it is called."""
+    real_append = CsvBackend.append_rows
+    remaining = [failures]
+
+    def append_rows(backend, *args, **kwargs):
+        if remaining[0]:
+            remaining[0] -= 1
+            raise OSError("disk full")
+        return real_append(backend, *args, **kwargs)
+
+    return append_rows
+
+
+class TransactionFailureTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_table(SLOTS_FILE, [
+            {'id': '5', 'doctor_id': '1', 'clinic_id': '1', 'date': '2030-01-01',
+             'time': '9:00', 'duration': '15', 'status': 'available'},
+            {'id': '6', 'doctor_id': '1', 'clinic_id': '1', 'date': '2030-01-01',
+             'time': '9:15', 'duration': '15', 'status': 'available'},
+        ], SLOT_FIELDS)
+        self.write_table(APPOINTMENTS_FILE, [], APPOINTMENT_FIELDS)
+
+    def _slot_status(self, slot_id):
+        return data_store.get_lookup(SLOTS_FILE)[slot_id]['status']
+
+    def _appointment_ids(self):
+        return [row['id'] for row in data_store.get_rows(APPOINTMENTS_FILE)]
+
+    def _assert_on_disk(self, slot_id, appointment_ids):
+        data_store.invalidate()
+        self.assertEqual(self._slot_status(slot_id), 'booked')
+        self.assertEqual(self._appointment_ids(), appointment_ids)
+
+    def test_failure_between_slot_update_and_append_is_rolled_forward(self):
+        with mock.patch.object(CsvBackend, 'append_rows', failing_append(1)):
+            self.assertTrue(_booking('99', '5').commit())
+
+        self.assertFalse(os.path.exists(storage.TRANSACTION_FILE))
+        self.assertEqual(self._slot_status('5'), 'booked')
+        self.assertEqual(self._appointment_ids(), ['99'])
+        self._assert_on_disk('5', ['99'])
+
+    def test_commit_stands_once_its_plan_is_durable(self):
+        # applying fails twice (and the roll-forward with it): the plan is
+        # on disk, so the booking is committed and finished later
+        with mock.patch.object(CsvBackend, 'append_rows', failing_append(2)):
+            self.assertTrue(_booking('99', '5').commit())
+        self.assertTrue(os.path.exists(storage.TRANSACTION_FILE))
+
+        # the next commit lands the first booking before its own
+        self.assertTrue(_booking('100', '6').commit())
+        self.assertFalse(os.path.exists(storage.TRANSACTION_FILE))
+        self.assertEqual(self._appointment_ids(), ['99', '100'])
+        self._assert_on_disk('5', ['99', '100'])
+        self.assertEqual(self._slot_status('6'), 'booked')
+
+    def test_failure_before_the_plan_is_written_fails_the_commit(self):
+        with mock.patch.object(CsvBackend, '_write_plan', side_effect=OSError("disk full")):
+            self.assertFalse(_booking('99', '5').commit())
+
+        self.assertFalse(os.path.exists(storage.TRANSACTION_FILE))
+        data_store.invalidate()
+        self.assertEqual(self._slot_status('5'), 'available')
+        self.assertEqual(self._appointment_ids(), [])
+
+    def test_rebooking_the_slot_of_an_unfinished_plan_conflicts(self):
+        with mock.patch.object(CsvBackend, 'append_rows', failing_append(2)):
+            self.assertTrue(_booking('99', '5').commit())
+
+        txn = _booking('100', '5')
+        self.assertFalse(txn.commit())
+        self.assertEqual(len(txn.conflicts), 1)
+        self._assert_on_disk('5', ['99'])
+
+    def test_ids_of_an_unfinished_plan_are_not_handed_out_again(self):
+        with mock.patch.object(CsvBackend, 'append_rows', failing_append(2)):
+            self.assertTrue(_booking('99', '5').commit())
+
+        self.assertEqual(reserve_ids(APPOINTMENTS_FILE), ['100'])
+        self.assertFalse(os.path.exists(storage.TRANSACTION_FILE))
+
+    def test_startup_recovery_finishes_an_unfinished_plan(self):
+        with mock.patch.object(CsvBackend, 'append_rows', failing_append(2)):
+            self.assertTrue(_booking('99', '5').commit())
+
+        self.assertTrue(recover_transactions())
+        self.assertFalse(os.path.exists(storage.TRANSACTION_FILE))
+        self._assert_on_disk('5', ['99'])
+
+    def test_new_plan_is_refused_while_one_is_pending(self):
+        with mock.patch.object(CsvBackend, 'append_rows', failing_append(2)):
+            self.assertTrue(_booking('99', '5').commit())
+
+        with self.assertRaises(RuntimeError):
+            CsvBackend._write_plan([])
+
+
+if __name__ == '__main__':
+    unittest.main()
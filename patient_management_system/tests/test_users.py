@@ -0,0 +1,62 @@
+"""
+Finding users through the e-mail index.
+
+Run from the patient_management_system folder:
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from utils.helpers import append_csv_row, update_csv_field
+from utils.users import EmailIndex, find_user
+from tests.support import DataDirTestCase
+
+DATA_DIR = '../data'
+USERS_FILE = os.path.join(DATA_DIR, 'users.csv')
+USER_FIELDS = ['email', 'password', 'role', 'first_name']
+
+
+class EmailIndexTest(unittest.TestCase):
+
+    def test_discard_only_removes_the_indexed_row(self):
+        old = {'email': 'a@monash.edu'}
+        new = {'email': 'A@monash.edu'}
+        index = EmailIndex([old])
+        index.add(new)
+        index.discard(old)  # the newer row under the same key stays
+        self.assertIs(index.by_email['a@monash.edu'], new)
+        index.discard(new)
+        self.assertEqual(index.by_email, {})
+
+
+class FindUserTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_table(USERS_FILE, [
+            {'email': 'Admin@Monash.edu', 'password': 'x', 'role': 'admin', 'first_name': 'Ada'},
+        ], USER_FIELDS)
+
+    def test_lookup_ignores_case_and_spaces(self):
+        self.assertEqual(find_user(' admin@monash.EDU ')['first_name'], 'Ada')
+        self.assertIsNone(find_user('nobody@monash.edu'))
+
+    def test_new_and_changed_users_are_found(self):
+        find_user('admin@monash.edu')
+        append_csv_row(USERS_FILE, {'email': 'p@student.monash.edu', 'password': 'y',
+                                    'role': 'patient', 'first_name': 'Pat'})
+        update_csv_field(USERS_FILE, 'Admin@Monash.edu', 'first_name', 'Adele')
+
+        self.assertEqual(find_user('p@student.monash.edu')['first_name'], 'Pat')
+        self.assertEqual(find_user('admin@monash.edu')['first_name'], 'Adele')
+
+    def test_user_added_by_another_process_is_found(self):
+        find_user('admin@monash.edu')
+        with open(USERS_FILE, 'a', newline='') as file:
+            file.write('late@monash.edu,z,patient,Lee\r\n')
+        self.assertEqual(find_user('late@monash.edu')['first_name'], 'Lee')
+
+
+if __name__ == '__main__':
+    unittest.main()
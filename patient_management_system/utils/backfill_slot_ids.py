@@ -0,0 +1,52 @@
+"""
+One-off migration: record the booked slot on every appointment.
+
+Run from the patient_management_system folder:
+
+    python -m utils.backfill_slot_ids
+
+Appointments without a slot_id are matched to the slot with the same doctor,
+date and time (compared after normalising '9:00' to '09:00'); a booked slot
+is preferred over an available one. Running it again only fills rows that are
+still empty.
+"""
+import os
+from utils import data_store
+from utils.helpers import load_csv_data, save_csv_data, data_lock
+from utils.slot_index import normalize_time
+
+DATA_DIR = '../data'
+APPOINTMENTS_FILE = os.path.join(DATA_DIR, 'appointments.csv')
+SLOTS_FILE = os.path.join(DATA_DIR, 'slots.csv')
+
+
+def main():
+    with data_lock():
+        slot_ids = {}
+        for slot in data_store.get_rows(SLOTS_FILE):
+            key = (slot['doctor_id'], slot['date'], normalize_time(slot['time']))
+            if key not in slot_ids or slot['status'] == 'booked':
+                slot_ids[key] = slot['id']
+
+        appointments = load_csv_data(APPOINTMENTS_FILE)
+        filled = missing = 0
+        for appt in appointments:
+            if appt.get('slot_id'):
+                continue
+            slot_id = slot_ids.get((appt['doctor_id'], appt['date'], normalize_time(appt['time'])))
+            if slot_id is None:
+                appt['slot_id'] = ''
+                missing += 1
+            else:
+                appt['slot_id'] = slot_id
+                filled += 1
+
+        fieldnames = data_store.get_fieldnames(APPOINTMENTS_FILE)
+        if 'slot_id' not in fieldnames:
+            fieldnames.append('slot_id')
+        if save_csv_data(APPOINTMENTS_FILE, appointments, fieldnames):
+            print(f"Recorded the slot of {filled} appointments ({missing} without a matching slot).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Columnar (Parquet / Arrow IPC) export of appointments, slots and the report
+aggregates, for analysis in pandas and similar tools.
+
+Each dataset is written as a directory per format, partitioned by month in
+the Hive layout, e.g. exports/parquet/appointments/month=2025-05/part-0.parquet,
+so a reader can load only the months and columns it needs. An export
+replaces the whole dataset directory, so months that no longer have rows do
+not linger. pyarrow is optional: without
+it AVAILABLE is False and the export menu says so.
+"""
+import os
+import shutil
+from utils import data_store
+from utils.report_index import get_appointment_counts
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pa_dataset
+except ImportError:  # optional dependency
+    pa = None
+
+AVAILABLE = pa is not None
+
+DATA_DIR = '../data'
+EXPORT_DIR = os.path.join(DATA_DIR, 'exports')
+APPOINTMENTS_FILE = os.path.join(DATA_DIR, 'appointments.csv')
+SLOTS_FILE = os.path.join(DATA_DIR, 'slots.csv')
+
+FORMATS = {'parquet': 'parquet', 'arrow': 'ipc'}  # our name -> pyarrow format
+
+
+def _month(date):
+    return date[:7] if date else 'unknown'
+
+
+def _table_of_rows(filepath):
+    """Arrow table of a dated table: its columns as strings, plus start and month."""
+    rows = data_store.get_rows(filepath)
+    columns = {field: pa.array([row.get(field) for row in rows], pa.string())
+               for field in data_store.get_fieldnames(filepath)}
+    columns['start'] = pa.array([row.start for row in rows], pa.timestamp('s'))
+    columns['month'] = pa.array([_month(row.get('date')) for row in rows], pa.string())
+    return pa.table(columns)
+
+
+def _table_of_aggregates():
+    """Arrow table of the daily report counts, one row per date and group."""
+    rows = get_appointment_counts().to_json()
+    names = ['date', 'clinic_id', 'doctor_id', 'reason', 'status']
+    columns = {name: pa.array([row[i] for row in rows], pa.string()) for i, name in enumerate(names)}
+    columns['count'] = pa.array([row[5] for row in rows], pa.int64())
+    columns['month'] = pa.array([_month(row[0]) for row in rows], pa.string())
+    return pa.table(columns)
+
+
+def export_datasets(fmt='parquet', export_dir=EXPORT_DIR):
+    """
+    Write appointments, slots and report aggregates under export_dir/fmt,
+    replacing any earlier export of each dataset in that format.
+
+    Returns {dataset name: directory}.
+    """
+    if not AVAILABLE:
+        raise RuntimeError("pyarrow is not installed")
+    tables = {
+        'appointments': _table_of_rows(APPOINTMENTS_FILE),
+        'slots': _table_of_rows(SLOTS_FILE),
+        'report_aggregates': _table_of_aggregates(),
+    }
+    written = {}
+    for name, table in tables.items():
+        directory = os.path.join(export_dir, fmt, name)
+        # write beside the old export and swap, so a failed write keeps it
+        staging = directory + '.tmp'
+        shutil.rmtree(staging, ignore_errors=True)
+        pa_dataset.write_dataset(
+            table, staging, format=FORMATS[fmt],
+            partitioning=['month'], partitioning_flavor='hive')
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging, directory)
+        written[name] = directory
+    return written
@@ -0,0 +1,42 @@
+"""
+One-shot import of the CSV tables into the SQLite backend.
+
+Run from the patient_management_system folder:
+
+    python -m utils.csv_to_sqlite
+
+then start the system with PMS_STORAGE=sqlite. The CSV files are left as
+they are, so switching back only means unsetting PMS_STORAGE.
+"""
+import os
+from utils.storage import DATA_DIR, SQLITE_FILE, CsvBackend, SqliteBackend
+from utils.helpers import data_lock
+
+TABLES = [
+    'users.csv',
+    'clinics.csv',
+    'doctors.csv',
+    'slots.csv',
+    'appointments.csv',
+    'notifications.csv',
+]
+
+
+def main():
+    """Copy every CSV table (with its journal applied) into the SQLite file"""
+    source = CsvBackend()
+    target = SqliteBackend()
+    with data_lock():
+        for name in TABLES:
+            filepath = os.path.join(DATA_DIR, name)
+            if not source.exists(filepath):
+                print(f"Skipped {filepath} (not found)")
+                continue
+            rows, fieldnames = source.read_table(filepath)
+            target.write_table(filepath, rows, fieldnames)
+            print(f"Imported {len(rows)} rows from {filepath}")
+    print(f"All tables imported into {SQLITE_FILE}")
+
+
+if __name__ == "__main__":
+    main()
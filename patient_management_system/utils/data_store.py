@@ -0,0 +1,253 @@
+import os
+from utils.storage import get_backend, primary_key
+from utils.slot_index import SlotAvailability
+from utils.records import record_type
+from utils.date_index import DateRangeIndex
+
+
+# filepath -> {'token', 'rows', 'fieldnames', 'indexes'}
+_tables = {}
+
+
+def _table_key(filepath):
+    """Normalise a data file path so '../data/x.csv' and friends share one entry."""
+    return os.path.abspath(filepath)
+
+
+def _stat_token(filepath):
+    """Return the backend's change token for a table (None if it does not exist)."""
+    return get_backend().version(filepath)
+
+
+def _load(filepath):
+    """Return the cached table, re-reading it only if it changed in storage."""
+    key = _table_key(filepath)
+    # take the token before reading so a write racing with the read forces a reload next time
+    token = _stat_token(filepath)
+    entry = _tables.get(key)
+    if entry is not None and entry['token'] == token:
+        return entry
+    if token is None:
+        # a missing file reads as an empty table, like load_csv_data() always did
+        rows, fieldnames = [], []
+    else:
+        rows, fieldnames = get_backend().read_table(filepath)
+        rows = _typed(filepath, rows)
+    entry = {'token': token, 'rows': rows, 'fieldnames': fieldnames, 'indexes': {}}
+    _tables[key] = entry
+    return entry
+
+
+def _typed(filepath, rows):
+    """Turn rows of tables with a record type (appointments, slots) into records."""
+    cls = record_type(filepath)
+    return rows if cls is None else [cls(row) for row in rows]
+
+
+def get_rows(filepath):
+    """
+    Return all rows of a table.
+
+    The returned list and its rows are shared with the cache, so callers must
+    treat them as read-only. Use helpers.load_csv_data() for an editable copy.
+    """
+    return _load(filepath)['rows']
+
+
+def get_fieldnames(filepath):
+    """Return the header of a table."""
+    return list(_load(filepath)['fieldnames'])
+
+
+def get_lookup(filepath, field='id'):
+    """Return a {value: row} map over a unique column (primary-key index)."""
+    return _build_lookup(_load(filepath), field)
+
+
+def _build_lookup(entry, field):
+    index_key = ('lookup', field)
+    lookup = entry['indexes'].get(index_key)
+    if lookup is None:
+        lookup = {row.get(field): row for row in entry['rows']}
+        entry['indexes'][index_key] = lookup
+    return lookup
+
+
+def get_index(filepath, *fields):
+    """
+    Return a {key: [rows]} map grouping rows by one or more columns.
+
+    With a single field the key is the column value, otherwise it is a tuple,
+    e.g. get_index(SLOTS_FILE, 'doctor_id', 'date')[('1', '2025-05-01')].
+    """
+    entry = _load(filepath)
+    index_key = ('group',) + fields
+    index = entry['indexes'].get(index_key)
+    if index is None:
+        index = {}
+        for row in entry['rows']:
+            if len(fields) == 1:
+                key = row.get(fields[0])
+            else:
+                key = tuple(row.get(f) for f in fields)
+            index.setdefault(key, []).append(row)
+        entry['indexes'][index_key] = index
+    return index
+
+
+def get_slot_availability(filepath):
+    """
+    Return the SlotAvailability index over a slots table.
+
+    Unlike the grouped indexes it is not dropped when a status changes:
+    record_changes() moves the affected slot between buckets in place.
+    """
+    return get_maintained(filepath, 'availability', SlotAvailability)
+
+
+def get_date_index(filepath):
+    """Return the DateRangeIndex (rows sorted by start datetime) of a dated table."""
+    return get_maintained(filepath, 'by_start', DateRangeIndex)
+
+
+def get_maintained(filepath, name, factory):
+    """
+    Return a maintained index over a table, building it with factory(rows)
+    the first time.
+
+    The index object must offer add(row) and discard(row): record_changes()
+    calls add() for appended rows and discard()/add() around each field change.
+    """
+    entry = _load(filepath)
+    index = entry['indexes'].get((name,))
+    if index is None:
+        index = factory(entry['rows'])
+        entry['indexes'][(name,)] = index
+    return index
+
+
+class _IdSequence:
+    """Highest numeric id in a table, including ids reserved but not yet written."""
+
+    def __init__(self, rows=()):
+        self.last = 0
+        for row in rows:
+            self.add(row)
+
+    def add(self, row):
+        try:
+            self.last = max(self.last, int(row.get('id')))
+        except (TypeError, ValueError):
+            pass
+
+    def discard(self, row):
+        pass  # ids are never handed out twice, even if a row goes away
+
+    def reserve(self, count):
+        first = self.last + 1
+        self.last += count
+        return [str(i) for i in range(first, first + count)]
+
+
+def reserve_ids(filepath, count=1):
+    """
+    Hand out count consecutive new ids for a table.
+
+    The sequence is derived from the table once when it is loaded and then
+    advanced by appends and reservations, so allocating is O(1) instead of a
+    max() scan per new row. Callers hold helpers.data_lock() until the rows
+    are written, so another terminal cannot take the same ids.
+    """
+    return get_maintained(filepath, 'id_sequence', _IdSequence).reserve(count)
+
+
+def stat_token(filepath):
+    """Public wrapper around the change token used by the cache."""
+    return _stat_token(filepath)
+
+
+def _index_key(row, fields):
+    return row.get(fields[0]) if len(fields) == 1 else tuple(row.get(f) for f in fields)
+
+
+def _index_row(entry, row):
+    """Add one row to every index already built for a table."""
+    for index_key, index in entry['indexes'].items():
+        kind, fields = index_key[0], index_key[1:]
+        if kind == 'lookup':
+            index[row.get(fields[0])] = row
+        elif kind == 'group':
+            index.setdefault(_index_key(row, fields), []).append(row)
+        else:
+            index.add(row)
+
+
+def record_changes(filepath, previous_token, appended=(), updates=()):
+    """
+    Fold rows just appended and (id, field, value) changes just written for a
+    table into its cached copy, instead of re-reading the whole table.
+
+    previous_token is the table's token taken before the write. If the cache
+    was not current at that point (another terminal wrote in between, or the
+    table was never loaded) the entry is simply dropped instead.
+    """
+    key = _table_key(filepath)
+    entry = _tables.get(key)
+    fieldnames = entry['fieldnames'] if entry is not None else []
+    if (entry is None or entry['token'] is None or entry['token'] != previous_token
+            or any(k not in fieldnames for row in appended for k in row)):
+        _tables.pop(key, None)
+        return
+
+    for row in appended:
+        # store the row as it would read back from storage
+        cached = {f: '' if row.get(f) is None else str(row.get(f)) for f in fieldnames}
+        cached = _typed(filepath, [cached])[0]
+        entry['rows'].append(cached)
+        _index_row(entry, cached)
+
+    by_key = _build_lookup(entry, primary_key(filepath)) if updates else {}
+    maintained = [index for index_key, index in entry['indexes'].items()
+                  if index_key[0] not in ('lookup', 'group')]
+    changed_fields = set()
+    for row_id, field, value in updates:
+        row = by_key.get(row_id)
+        if row is None:
+            continue
+        for index in maintained:
+            index.discard(row)
+        row[field] = value
+        for index in maintained:
+            index.add(row)
+        changed_fields.add(field)
+        if field not in fieldnames:
+            fieldnames.append(field)
+    # indexes over a changed column are rebuilt lazily, which keeps row order
+    for index_key in list(entry['indexes']):
+        if changed_fields.intersection(index_key[1:]):
+            del entry['indexes'][index_key]
+    entry['token'] = _stat_token(filepath)
+
+
+def select(filepath, **criteria):
+    """
+    Return the rows whose columns equal the given values.
+
+    Backends with query support (SQLite) answer from their own indexes
+    without loading the table; otherwise the cached grouped index is used.
+    The rows must be treated as read-only.
+    """
+    backend = get_backend()
+    if backend.supports_queries:
+        return _typed(filepath, backend.select(filepath, criteria))
+    fields = tuple(criteria)
+    key = criteria[fields[0]] if len(fields) == 1 else tuple(criteria[f] for f in fields)
+    return get_index(filepath, *fields).get(key, [])
+
+
+def invalidate(filepath=None):
+    """Drop the cached copy of one table (or all tables) after writing to it."""
+    if filepath is None:
+        _tables.clear()
+    else:
+        _tables.pop(_table_key(filepath), None)
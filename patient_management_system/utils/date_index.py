@@ -0,0 +1,66 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import count
+
+
+class DateRangeIndex:
+    """
+    Records (Appointment/Slot) kept sorted by their parsed start datetime.
+
+    Range queries are two bisects plus the matching rows, O(log n + k). Used
+    as a maintained index of the appointments table (data_store keeps it up to
+    date through add/discard) and for ad-hoc lists such as one patient's
+    appointments. Rows whose date or time could not be parsed are kept apart
+    in `undated`.
+    """
+
+    def __init__(self, rows=()):
+        self._keys = []     # sorted (start, seq)
+        self._rows = []     # rows, parallel to _keys
+        self._key_of = {}   # id(row) -> its key
+        self._seq = count()
+        self.undated = []
+        for row in sorted(rows, key=_sort_key):
+            self.add(row)
+
+    def __len__(self):
+        return len(self._rows) + len(self.undated)
+
+    def add(self, row):
+        if row.start is None:
+            self.undated.append(row)
+            return
+        key = (row.start, next(self._seq))
+        if not self._keys or key >= self._keys[-1]:
+            # rows mostly arrive in date order, so this is the common case
+            self._keys.append(key)
+            self._rows.append(row)
+        else:
+            i = bisect_left(self._keys, key)
+            self._keys.insert(i, key)
+            self._rows.insert(i, row)
+        self._key_of[id(row)] = key
+
+    def discard(self, row):
+        key = self._key_of.pop(id(row), None)
+        if key is None:
+            if row in self.undated:
+                self.undated.remove(row)
+            return
+        i = bisect_left(self._keys, key)
+        del self._keys[i]
+        del self._rows[i]
+
+    def between(self, start=None, end=None):
+        """Rows with start <= row.start < end, in date order (None for no limit)."""
+        lo = bisect_left(self._keys, (start,)) if start else 0
+        hi = bisect_left(self._keys, (end,)) if end else len(self._keys)
+        return self._rows[lo:hi]
+
+    def after(self, moment):
+        """Rows starting strictly after moment, in date order."""
+        return self._rows[bisect_right(self._keys, (moment, float('inf'))):]
+
+
+def _sort_key(row):
+    return row.start or datetime.min
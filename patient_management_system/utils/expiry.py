@@ -0,0 +1,68 @@
+"""
+Marks past appointments as attended.
+
+A confirmed appointment whose start time has passed becomes 'attended'. The
+sweep runs once at startup and again from the menus at most every
+SWEEP_SECONDS. Appointments are found through the table's start-time index:
+the first pass takes everything before now, later passes only the rows that
+started since the previous pass, and all changes go out in one journal write.
+Screens that list appointments therefore never write.
+
+A booking made after a pass for a time that has already gone (the slot list
+still offers past slots) would be missed by that window, so LateBookings, a
+maintained index of the appointments table, collects confirmed rows that
+start before the last pass and the next pass picks them up too.
+"""
+import os
+import time
+from datetime import datetime
+from utils import data_store
+from utils.helpers import update_csv_fields, data_lock
+
+DATA_DIR = '../data'
+APPOINTMENTS_FILE = os.path.join(DATA_DIR, 'appointments.csv')
+SWEEP_SECONDS = 300  # how often the menus re-run the sweep
+
+_state = {'swept_until': None, 'last_run': None}
+
+
+class LateBookings:
+    """Maintained index: ids of confirmed appointments starting before the last pass."""
+
+    def __init__(self, rows=()):
+        self.ids = set()
+        for row in rows:
+            self.add(row)
+
+    def add(self, row):
+        swept_until = _state['swept_until']
+        if (swept_until is not None and row['status'] == 'confirmed'
+                and row.start is not None and row.start < swept_until):
+            self.ids.add(row['id'])
+
+    def discard(self, row):
+        self.ids.discard(row['id'])
+
+
+def sweep_expired(now=None):
+    """Flip confirmed appointments that started before now to attended; returns how many."""
+    now = now or datetime.now()
+    with data_lock():
+        index = data_store.get_date_index(APPOINTMENTS_FILE)
+        late = data_store.get_maintained(APPOINTMENTS_FILE, 'late_bookings', LateBookings)
+        expired = [appt['id'] for appt in index.between(_state['swept_until'], now)
+                   if appt['status'] == 'confirmed']
+        expired += sorted(late.ids.difference(expired))
+        if expired and not update_csv_fields(APPOINTMENTS_FILE, [(appt_id, 'status', 'attended')
+                                                                 for appt_id in expired]):
+            return 0
+    _state['swept_until'] = now
+    _state['last_run'] = time.monotonic()
+    return len(expired)
+
+
+def sweep_if_due():
+    """Run sweep_expired() if the last pass was more than SWEEP_SECONDS ago."""
+    last_run = _state['last_run']
+    if last_run is None or time.monotonic() - last_run >= SWEEP_SECONDS:
+        sweep_expired()
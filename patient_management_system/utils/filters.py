@@ -0,0 +1,111 @@
+"""
+Composable filters over slot and appointment rows.
+
+A RecordFilter holds any combination of: a date range, a GP id or GP search
+text, a clinic id or suburb search text, and a status. Filters
+are immutable; where() returns a copy with criteria added or removed, so
+screens can stack filters one menu choice at a time:
+
+    flt = RecordFilter(gp='smith').where(date_from='2025-05-01')
+    rows = flt.apply(slots)
+
+The GP and suburb text criteria are resolved once per apply() through the
+directory search indexes (to the set of matching GP and clinic ids), so
+every row is then checked with plain comparisons in a single pass. 'gp'
+matches a GP's name or specialty, 'suburb' a clinic's suburb or postcode.
+"""
+from utils.search_index import doctor_search, clinic_search
+
+
+class RecordFilter:
+    """Filter criteria for rows with doctor_id, clinic_id, date and status columns."""
+
+    FIELDS = ('date_from', 'date_to', 'doctor_id', 'gp', 'clinic_id', 'suburb', 'status')
+
+    LABELS = {
+        'doctor_id': "GP ID",
+        'gp': "GP",
+        'clinic_id': "Clinic ID",
+        'suburb': "Suburb",
+        'status': "Status",
+    }
+
+    def __init__(self, **criteria):
+        unknown = set(criteria) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown filter field(s): {', '.join(sorted(unknown))}")
+        # empty values mean "no filter", like an empty answer at the prompts
+        self.criteria = {field: value for field, value in criteria.items() if value}
+
+    def where(self, **criteria):
+        """Return a copy with the given criteria set (an empty value removes one)."""
+        merged = dict(self.criteria)
+        merged.update(criteria)
+        return RecordFilter(**merged)
+
+    def on_date(self, date):
+        """Return a copy limited to a single day."""
+        return self.where(date_from=date, date_to=date)
+
+    def __bool__(self):
+        return bool(self.criteria)
+
+    def __getattr__(self, field):
+        if field in self.FIELDS:
+            return self.criteria.get(field)
+        raise AttributeError(field)
+
+    def describe(self):
+        """Readable summary, e.g. 'Date: 2025-05-01, GP: smith'."""
+        parts = []
+        date_from, date_to = self.date_from, self.date_to
+        if date_from and date_from == date_to:
+            parts.append(f"Date: {date_from}")
+        elif date_from and date_to:
+            parts.append(f"Dates: {date_from} to {date_to}")
+        elif date_from:
+            parts.append(f"From: {date_from}")
+        elif date_to:
+            parts.append(f"Until: {date_to}")
+        for field, label in self.LABELS.items():
+            if field in self.criteria:
+                parts.append(f"{label}: {self.criteria[field]}")
+        return ", ".join(parts) if parts else "All appointments"
+
+    def matcher(self):
+        """Return a function row -> bool for these criteria."""
+        doctor_ids = self._ids('doctor_id', 'gp', doctor_search)
+        clinic_ids = self._ids('clinic_id', 'suburb', clinic_search)
+        date_from, date_to, status = self.date_from, self.date_to, self.status
+
+        def match(row):
+            if doctor_ids is not None and row.get('doctor_id') not in doctor_ids:
+                return False
+            if clinic_ids is not None and row.get('clinic_id') not in clinic_ids:
+                return False
+            # dates are YYYY-MM-DD, so string order is date order
+            if date_from and row.get('date', '') < date_from:
+                return False
+            if date_to and row.get('date', '') > date_to:
+                return False
+            if status and row.get('status') != status:
+                return False
+            return True
+
+        return match
+
+    def _ids(self, id_field, text_field, search):
+        """The allowed ids for an id and/or text criterion (None: any)."""
+        ids = None
+        if id_field in self.criteria:
+            ids = {self.criteria[id_field]}
+        if text_field in self.criteria:
+            found = search().search(self.criteria[text_field])
+            ids = found if ids is None else ids & found
+        return ids
+
+    def apply(self, rows):
+        """Return the rows matching every criterion, in their original order."""
+        if not self.criteria:
+            return list(rows)
+        return list(filter(self.matcher(), rows))
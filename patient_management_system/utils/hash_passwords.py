@@ -0,0 +1,44 @@
+"""
+One-off migration: hash every password still stored as plaintext.
+
+Run from the patient_management_system folder:
+
+    python -m utils.hash_passwords
+
+Older data kept passwords in users.csv as plaintext; they are re-hashed on
+the next login, but accounts that never log in again would keep theirs.
+This hashes them all at once and rewrites the table (which also drops its
+journal). Hashes made with a different cost are left for the next login,
+since the password is needed to re-hash them. Running it again is a no-op.
+"""
+import os
+from utils import data_store
+from utils.helpers import load_csv_data, save_csv_data, data_lock
+from utils.passwords import hash_password, is_hashed
+
+DATA_DIR = '../data'
+USERS_FILE = os.path.join(DATA_DIR, 'users.csv')
+
+
+def hash_plaintext_passwords():
+    """Hash the plaintext passwords in users.csv. Returns how many were hashed, or None on failure."""
+    with data_lock():
+        users = load_csv_data(USERS_FILE)
+        hashed = 0
+        for user in users:
+            if user.get('password') and not is_hashed(user['password']):
+                user['password'] = hash_password(user['password'])
+                hashed += 1
+        if hashed and not save_csv_data(USERS_FILE, users, data_store.get_fieldnames(USERS_FILE)):
+            return None
+        return hashed
+
+
+def main():
+    hashed = hash_plaintext_passwords()
+    if hashed is not None:
+        print(f"Hashed {hashed} plaintext passwords.")
+
+
+if __name__ == "__main__":
+    main()
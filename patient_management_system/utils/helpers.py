@@ -1,10 +1,20 @@
 import os
-import csv
+import time
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 import re
-import socket
+from utils import data_store
+from utils.storage import get_backend, primary_key, CommitPending
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 DATA_DIR = '../data'  # Data directory path
+LOCK_FILE = os.path.join(DATA_DIR, 'data.lock')  # Advisory lock shared by all terminals
 
 def validate_email(email):
     """Validate email format using regex."""
@@ -24,22 +34,6 @@ def validate_password(password):
         any(c.isdigit() for c in password)
     )
 
-def log_login_event(email):
-    """Log login event with email, timestamp, and IP address to 'login_logs.csv'."""
-    log_file = os.path.join(DATA_DIR, 'login_logs.csv')
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    try:
-        ip_address = socket.gethostbyname(socket.gethostname())
-    except:
-        ip_address = 'unknown'
-    
-    exists = os.path.isfile(log_file)
-    with open(log_file, 'a', newline='') as file:
-        writer = csv.writer(file)
-        if not exists:
-            writer.writerow(['email', 'timestamp', 'ip_address'])
-        writer.writerow([email, timestamp, ip_address])
-
 def clear_screen():
     """Clear the terminal screen."""
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -91,36 +85,260 @@ def is_valid_date_format(date_str):
         return False
         
 def load_csv_data(filepath):
-    """Load data from a CSV file."""
-    data = []
-    try:
-        with open(filepath, 'r', newline='') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                data.append(row)
-        return data
-    except FileNotFoundError:
+    """Load a table as an editable copy of its cached rows."""
+    if not get_backend().exists(filepath):
         print(f"Error: File {filepath} not found.")
         return []
+    return [dict(row) for row in data_store.get_rows(filepath)]
 
 def save_csv_data(filepath, data, fieldnames):
-    """Save data to a CSV file."""
+    """
+    Replace a table's contents.
+
+    With the CSV backend this writes an fsynced temp file and renames it over
+    the table, so a crash never leaves a half-written file.
+    """
+    with data_lock():
+        try:
+            get_backend().write_table(filepath, data, fieldnames)
+            return True
+        except Exception as e:
+            print(f"Error saving data: {e}")
+            return False
+        finally:
+            data_store.invalidate(filepath)
+
+def append_csv_rows(filepath, rows, fieldnames=None):
+    """
+    Append rows to a table without rewriting it.
+
+    With the CSV backend the header is written only when the file is new or
+    empty. If a row carries a column the existing header lacks, the table is
+    rewritten once with the widened header instead.
+    """
+    rows = list(rows)
+    if not rows:
+        return True
+    with data_lock():
+        previous_token = data_store.stat_token(filepath)
+        try:
+            get_backend().append_rows(filepath, rows, fieldnames)
+        except Exception as e:
+            data_store.invalidate(filepath)
+            print(f"Error saving data: {e}")
+            return False
+        data_store.record_changes(filepath, previous_token, appended=rows)
+        return True
+
+def append_csv_row(filepath, row, fieldnames=None):
+    """Append a single row to a table."""
+    return append_csv_rows(filepath, [row], fieldnames)
+
+def update_csv_fields(filepath, updates):
+    """
+    Change single fields of rows addressed by primary key.
+
+    With the CSV backend each change is one line appended to the table's
+    journal, which is replayed on load and compacted into the table once it
+    grows, so flipping a status never rewrites the whole file.
+    """
+    updates = [(str(row_id), field, str(value)) for row_id, field, value in updates]
+    if not updates:
+        return True
+    with data_lock():
+        previous_token = data_store.stat_token(filepath)
+        try:
+            get_backend().update_fields(filepath, updates)
+        except Exception as e:
+            data_store.invalidate(filepath)
+            print(f"Error saving data: {e}")
+            return False
+        data_store.record_changes(filepath, previous_token, updates=updates)
+        return True
+
+def update_csv_field(filepath, row_id, field, value):
+    """Change a single field of one row."""
+    return update_csv_fields(filepath, [(row_id, field, value)])
+
+_lock_state = {'depth': 0, 'file': None}
+_thread_lock = threading.RLock()
+
+@contextmanager
+def data_lock():
+    """
+    Hold the advisory lock on the data directory.
+
+    Every write goes through this lock so several terminals can share one
+    data/ folder. It is re-entrant within a process, so helpers that write
+    can be called while a transaction already holds it.
+    """
+    with _thread_lock:
+        if _lock_state['depth'] == 0:
+            file = open(LOCK_FILE, 'a+')
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        file.seek(0)
+                        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.05)
+            _lock_state['file'] = file
+        _lock_state['depth'] += 1
+        try:
+            yield
+        finally:
+            _lock_state['depth'] -= 1
+            if _lock_state['depth'] == 0:
+                file = _lock_state['file']
+                _lock_state['file'] = None
+                if fcntl is not None:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+                else:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+                file.close()
+
+class Transaction:
+    """
+    A group of table writes that lands all-or-nothing.
+
+    The CSV backend stages full rewrites to fsynced temp files and writes the
+    whole plan to storage.TRANSACTION_FILE before any table is touched; once
+    that is written the commit stands. If a step fails while applying it,
+    commit() rolls the plan forward at once. A plan left behind (by a crash,
+    or a roll-forward that failed too) is finished by recover_transactions()
+    at startup, or before the next commit or id reservation. The SQLite
+    backend uses a database transaction. Either way a slot is never left
+    booked without its appointment.
+    """
+
+    def __init__(self):
+        self.operations = []
+        self.conflicts = []
+
+    def save(self, filepath, data, fieldnames):
+        """Queue a full rewrite of a table."""
+        self.operations.append({'op': 'save', 'path': filepath,
+                                'rows': [dict(row) for row in data],
+                                'fieldnames': list(fieldnames)})
+
+    def append(self, filepath, rows, fieldnames=None):
+        """Queue new rows for a table."""
+        rows = [{k: '' if v is None else str(v) for k, v in row.items()} for row in rows]
+        self.operations.append({'op': 'append', 'path': filepath, 'rows': rows,
+                                'fieldnames': list(fieldnames) if fieldnames else None})
+
+    def update(self, filepath, row_id, field, value, expected=None):
+        """
+        Queue a single field change.
+
+        With expected set the change is a compare-and-set: commit() fails and
+        lists it in self.conflicts if the field no longer holds that value,
+        e.g. a slot another terminal booked since it was displayed.
+        """
+        self.operations.append({'op': 'update', 'path': filepath,
+                                'updates': [[str(row_id), field, str(value)]],
+                                'expected': expected})
+
+    def commit(self):
+        """
+        Check, then apply the queued writes. Returns True once they are
+        committed, even if applying them has to be finished later.
+        """
+        with data_lock():
+            backend = get_backend()
+            # finish the earlier commit first, so conflicts are checked against it
+            if not _finish_pending(backend):
+                return False
+            self.conflicts = self._find_conflicts()
+            if self.conflicts:
+                return False
+
+            paths = list(dict.fromkeys(op['path'] for op in self.operations))
+            previous_tokens = {path: data_store.stat_token(path) for path in paths}
+            try:
+                backend.commit(self.operations)
+            except CommitPending as e:
+                data_store.invalidate()
+                print(f"Saved, but not yet written to every table ({e}); "
+                      "this is finished on the next save or restart.")
+                self.operations = []
+                return True
+            except Exception as e:
+                data_store.invalidate()
+                print(f"Error saving data: {e}")
+                return False
+
+            for path in paths:
+                ops = [op for op in self.operations if op['path'] == path]
+                if any(op['op'] == 'save' for op in ops):
+                    data_store.invalidate(path)
+                    continue
+                data_store.record_changes(
+                    path, previous_tokens[path],
+                    appended=[row for op in ops if op['op'] == 'append' for row in op['rows']],
+                    updates=[tuple(u) for op in ops if op['op'] == 'update' for u in op['updates']])
+            self.operations = []
+            return True
+
+    def _find_conflicts(self):
+        """Return the compare-and-set updates whose expected value is stale."""
+        conflicts = []
+        for op in self.operations:
+            if op['op'] != 'update' or op.get('expected') is None:
+                continue
+            # the store re-reads the table if another terminal changed it
+            lookup = data_store.get_lookup(op['path'], primary_key(op['path']))
+            for row_id, field, _ in op['updates']:
+                row = lookup.get(row_id)
+                if row is None or row.get(field) != op['expected']:
+                    conflicts.append((op['path'], row_id, field))
+        return conflicts
+
+def _finish_pending(backend):
+    """Finish a commit left unfinished, if there is one. Returns False on failure."""
+    if not backend.has_pending():
+        return True
     try:
-        with open(filepath, 'w', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data)
+        backend.recover()
         return True
     except Exception as e:
-        print(f"Error saving data: {e}")
+        print(f"Error recovering data: {e}")
         return False
+    finally:
+        data_store.invalidate()
 
-def get_next_id(data):
-    """Get the next available ID by finding the maximum existing ID and adding 1."""
-    if not data:
-        return "1"
-    try:
-        max_id = max(int(item['id']) for item in data)
-        return str(max_id + 1)
-    except (ValueError, KeyError):
-        return "1"
+def recover_transactions():
+    """
+    Finish a transaction interrupted by a crash and remove stale temp files.
+
+    Called once at startup. Replaces the old nightly reconciliation of
+    slots.csv against appointments.csv.
+    """
+    with data_lock():
+        try:
+            get_backend().recover()
+            return True
+        except Exception as e:
+            print(f"Error recovering data: {e}")
+            return False
+        finally:
+            data_store.invalidate()
+
+def reserve_ids(filepath, count=1):
+    """
+    Reserve count consecutive new IDs for a table (a range for bulk inserts).
+
+    Call it inside data_lock() and write the rows before releasing the lock.
+    """
+    with data_lock():
+        # ids taken by an unfinished commit are only seen once it has landed
+        _finish_pending(get_backend())
+        return data_store.reserve_ids(filepath, count)
+
+def get_next_id(filepath):
+    """Get the next available ID for a table."""
+    return reserve_ids(filepath)[0]
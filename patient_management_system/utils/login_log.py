@@ -0,0 +1,132 @@
+"""
+Login audit log, written in the background.
+
+log_login_event() only puts the event on a queue, so a login never waits for
+DNS or the disk. A worker thread resolves the host address once per process
+and appends queued events to data/login_logs.csv in batches. It writes the
+file directly with the csv module (as the log always was, also under the
+SQLite backend), so it never touches the shared table cache or database
+connection of the main thread. A failed write is reported and the worker
+carries on; events still queued are written when the program exits.
+
+Once login_logs.csv passes LOGIN_LOG_MAX_BYTES it is moved aside to
+login_logs-<date>-<time>.csv (ignored by git) and a new log is started.
+"""
+import os
+import csv
+import atexit
+import queue
+import socket
+import threading
+from datetime import datetime
+from utils.helpers import data_lock
+
+DATA_DIR = '../data'
+LOGIN_LOG_FILE = os.path.join(DATA_DIR, 'login_logs.csv')
+LOGIN_LOG_FIELDS = ['email', 'timestamp', 'ip_address']
+LOGIN_LOG_MAX_BYTES = 5 * 1024 * 1024  # roll over past this size
+LOGIN_LOG_BATCH = 100                   # most events written per append
+FLUSH_SECONDS = 1.0                     # wait this long for more events before writing
+
+_events = queue.Queue()
+_worker = {'thread': None, 'ip': None}
+_start_lock = threading.Lock()
+
+
+def log_login_event(email):
+    """Queue a login event (email, timestamp; the IP is added by the worker)."""
+    _events.put({'email': email, 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+    _ensure_worker()
+
+
+def _ensure_worker():
+    with _start_lock:
+        if _worker['thread'] is None:
+            thread = threading.Thread(target=_run, name='login-log', daemon=True)
+            _worker['thread'] = thread
+            thread.start()
+            atexit.register(flush)
+
+
+def _host_ip():
+    """Resolve this host's address once per process."""
+    if _worker['ip'] is None:
+        try:
+            _worker['ip'] = socket.gethostbyname(socket.gethostname())
+        except OSError:
+            _worker['ip'] = 'unknown'
+    return _worker['ip']
+
+
+def _run():
+    while True:
+        batch = _next_batch()
+        try:
+            _write(batch)
+        except Exception as e:
+            print(f"\nError writing login log ({len(batch)} events lost): {e}")
+        finally:
+            for _ in batch:
+                _events.task_done()
+
+
+def _next_batch(wait=True):
+    """Take up to LOGIN_LOG_BATCH queued events (waiting for the first if wait)."""
+    batch = [_events.get()] if wait else []
+    try:
+        while len(batch) < LOGIN_LOG_BATCH:
+            batch.append(_events.get(timeout=FLUSH_SECONDS) if wait else _events.get_nowait())
+    except queue.Empty:
+        pass
+    return batch
+
+
+def _write(batch):
+    ip_address = _host_ip()
+    with data_lock():
+        _roll_over()
+        exists = os.path.isfile(LOGIN_LOG_FILE) and os.path.getsize(LOGIN_LOG_FILE) > 0
+        with open(LOGIN_LOG_FILE, 'a', newline='') as file:
+            writer = csv.writer(file)
+            if not exists:
+                writer.writerow(LOGIN_LOG_FIELDS)
+            writer.writerows([event['email'], event['timestamp'], ip_address] for event in batch)
+
+
+def _roll_over():
+    """Move the current log aside once it is too big."""
+    try:
+        st = os.stat(LOGIN_LOG_FILE)
+    except FileNotFoundError:
+        return
+    if st.st_size < LOGIN_LOG_MAX_BYTES:
+        return
+    last_written = datetime.fromtimestamp(st.st_mtime)
+    rolled = os.path.join(DATA_DIR, f"login_logs-{last_written:%Y-%m-%d-%H%M%S}.csv")
+    suffix = 1
+    while os.path.exists(rolled):
+        rolled = os.path.join(DATA_DIR, f"login_logs-{last_written:%Y-%m-%d-%H%M%S}-{suffix}.csv")
+        suffix += 1
+    os.replace(LOGIN_LOG_FILE, rolled)
+
+
+def flush(timeout=5.0):
+    """Write every queued event, waiting up to timeout seconds for the worker."""
+    thread = _worker['thread']
+    if thread is None:
+        return
+    if thread.is_alive():
+        done = threading.Event()
+        threading.Thread(target=lambda: (_events.join(), done.set()), daemon=True).start()
+        if done.wait(timeout):
+            return
+    # the worker is gone or stuck: write what is left from this thread
+    batch = _next_batch(wait=False)
+    while batch:
+        try:
+            _write(batch)
+        except Exception as e:
+            print(f"Error writing login log ({len(batch)} events lost): {e}")
+        for _ in batch:
+            _events.task_done()
+        batch = _next_batch(wait=False)
@@ -0,0 +1,112 @@
+from utils.helpers import clear_screen
+
+PAGE_SIZE = 15  # rows per screen
+
+
+class Pager:
+    """
+    Page through rows one screen at a time.
+
+    Rows are pulled lazily from any iterable (typically a generator), and only
+    the rows on the current page are formatted and printed. Rows already
+    pulled are kept so 'previous' and jumping back do not re-run the source.
+
+    With key set, the user can pick a row by typing its key (e.g. a slot id);
+    run() then returns that row. run() can be called again after a pick to
+    carry on from the same page.
+    """
+
+    def __init__(self, rows, title, header, format_row, key=None,
+                 page_size=PAGE_SIZE, total=None):
+        self.title = title
+        self.header = header
+        self.format_row = format_row
+        self.key = key
+        self.page_size = page_size
+        self.page = 0
+        self.total = len(rows) if total is None and hasattr(rows, '__len__') else total
+        self._source = iter(rows)
+        self._seen = []
+        self._exhausted = False
+
+    def _fill(self, count):
+        """Pull rows from the source until count rows are buffered or it runs dry."""
+        while len(self._seen) < count and not self._exhausted:
+            try:
+                self._seen.append(next(self._source))
+            except StopIteration:
+                self._exhausted = True
+
+    def is_empty(self):
+        self._fill(1)
+        return not self._seen
+
+    def _page_count(self):
+        """Total number of pages, or None while the source is not exhausted."""
+        total = self.total if self.total is not None else (len(self._seen) if self._exhausted else None)
+        if total is None:
+            return None
+        return max(1, -(-total // self.page_size))
+
+    def _has_next(self):
+        self._fill((self.page + 1) * self.page_size + 1)
+        return len(self._seen) > (self.page + 1) * self.page_size
+
+    def _go_to(self, page):
+        """Move to page (0-based), stopping at the last page that has rows."""
+        self._fill(page * self.page_size + 1)
+        last = max(0, (len(self._seen) - 1) // self.page_size)
+        self.page = max(0, min(page, last))
+
+    def _render(self):
+        start = self.page * self.page_size
+        self._fill(start + self.page_size)
+        clear_screen()
+        print(f"\n===== {self.title} =====")
+        print(self.header)
+        print("-" * len(self.header))
+        for row in self._seen[start:start + self.page_size]:
+            print(self.format_row(row))
+
+        pages = self._page_count()
+        print(f"\nPage {self.page + 1}" + (f" of {pages}" if pages else ""))
+
+    def _find(self, value):
+        """Return the row whose key matches value among the rows pulled so far."""
+        for row in self._seen:
+            if str(self.key(row)) == value:
+                return row
+        return None
+
+    def run(self):
+        """Show pages until the user picks a row (returned) or leaves (None)."""
+        while True:
+            self._render()
+            options = []
+            if self._has_next():
+                options.append("[n]ext")
+            if self.page > 0:
+                options.append("[p]rev")
+            options.append("[j]ump <page>")
+            if self.key is not None:
+                options.append("ID to select")
+            options.append("[c] to go back")
+            choice = input(f"\n{', '.join(options)}: ").strip().lower()
+
+            if choice == 'c':
+                return None
+            if choice == 'n':
+                if self._has_next():
+                    self.page += 1
+            elif choice == 'p':
+                self.page = max(0, self.page - 1)
+            elif choice.startswith('j'):
+                number = choice[1:].strip() or input("Page number: ").strip()
+                if number.isdigit() and int(number) > 0:
+                    self._go_to(int(number) - 1)
+            elif self.key is not None and choice:
+                row = self._find(choice)
+                if row is not None:
+                    return row
+                print("No row with that ID on the pages shown. Please try again.")
+                input("\nPress Enter to continue...")
@@ -0,0 +1,105 @@
+"""
+Salted password hashing (PBKDF2-HMAC-SHA256).
+
+Stored passwords look like 'pbkdf2_sha256$<iterations>$<salt>$<hash>'. The
+iteration count is the cost: set it with PMS_PBKDF2_ITERATIONS, and pick a
+value for a host with the microbenchmark:
+
+    python -m utils.passwords [budget_ms]
+
+which times the hash and prints the largest iteration count that fits the
+latency budget (default PASSWORD_BUDGET_MS). Plaintext passwords left from
+older data, and hashes made with a different cost, are still accepted and are
+re-hashed on the next successful login (see needs_rehash()); plaintext ones
+can also be hashed all at once with python -m utils.hash_passwords.
+"""
+import os
+import sys
+import time
+import base64
+import hashlib
+import hmac
+
+SCHEME = 'pbkdf2_sha256'
+PBKDF2_ITERATIONS = int(os.environ.get('PMS_PBKDF2_ITERATIONS', 200000))
+PASSWORD_BUDGET_MS = int(os.environ.get('PMS_PASSWORD_BUDGET_MS', 100))  # target time per hash
+SALT_BYTES = 16
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+
+
+def hash_password(password, iterations=None):
+    """Return a salted hash of password in the stored format."""
+    iterations = iterations or PBKDF2_ITERATIONS
+    salt = os.urandom(SALT_BYTES)
+    return f"{SCHEME}${iterations}${_b64(salt)}${_b64(_pbkdf2(password, salt, iterations))}"
+
+
+def _parse(stored):
+    """Return (iterations, salt, digest) of a stored hash, or None for plaintext."""
+    parts = (stored or '').split('$')
+    if len(parts) != 4 or parts[0] != SCHEME:
+        return None
+    try:
+        return int(parts[1]), base64.b64decode(parts[2]), base64.b64decode(parts[3])
+    except ValueError:
+        return None
+
+
+def verify_password(password, stored):
+    """Check a password against a stored hash (or a legacy plaintext value)."""
+    parsed = _parse(stored)
+    if parsed is None:
+        return hmac.compare_digest((stored or '').encode('utf-8'), password.encode('utf-8'))
+    iterations, salt, digest = parsed
+    return hmac.compare_digest(_pbkdf2(password, salt, iterations), digest)
+
+
+def is_hashed(stored):
+    """True for values in the stored hash format (False for legacy plaintext)."""
+    return _parse(stored) is not None
+
+
+def needs_rehash(stored):
+    """True for plaintext values and hashes made with a different cost."""
+    parsed = _parse(stored)
+    return parsed is None or parsed[0] != PBKDF2_ITERATIONS
+
+
+def benchmark(budget_ms=PASSWORD_BUDGET_MS, rounds=5):
+    """
+    Time the hash on this host.
+
+    Returns (ms per hash at PBKDF2_ITERATIONS, iterations that fit budget_ms).
+    """
+    sample = 20000
+    best = min(_time_hash(sample) for _ in range(rounds))
+    per_iteration = best / sample
+    current_ms = per_iteration * PBKDF2_ITERATIONS * 1000
+    fitting = int(budget_ms / 1000 / per_iteration) // 1000 * 1000
+    return current_ms, fitting
+
+
+def _time_hash(iterations):
+    salt = os.urandom(SALT_BYTES)
+    start = time.perf_counter()
+    _pbkdf2('benchmark-password', salt, iterations)
+    return time.perf_counter() - start
+
+
+def main():
+    budget_ms = int(sys.argv[1]) if len(sys.argv) > 1 else PASSWORD_BUDGET_MS
+    current_ms, fitting = benchmark(budget_ms)
+    print(f"{SCHEME} with {PBKDF2_ITERATIONS} iterations: {current_ms:.1f} ms per hash")
+    print(f"Iterations within a {budget_ms} ms budget: {fitting}")
+    print(f"Set PMS_PBKDF2_ITERATIONS={fitting} to use it.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Typed rows for the appointments and slots tables.
+
+The data store keeps rows of these tables as Appointment/Slot records instead
+of plain dicts. Their columns live in __slots__, and the date and time are
+parsed once when the row is loaded (or changed), so listings and reports read
+record.start / record.ordinal instead of calling strptime per row. Records
+are Mappings, so they read like the dicts they replace (record['date'],
+record.get('reason'), dict(record)) and can be handed to csv.DictWriter.
+"""
+import os
+from collections.abc import Mapping
+from datetime import date as _date, datetime
+
+_MISSING = object()  # marks a column the table does not have
+
+
+class Record(Mapping):
+    """
+    Base class: FIELDS are stored in slots, any other column in _extra.
+
+    Equality and hashing stay by identity, as the indexes track rows that way.
+    """
+
+    __slots__ = ('_extra',)
+    FIELDS = ()
+
+    def __init__(self, row):
+        self._extra = None
+        for field in self.FIELDS:
+            setattr(self, field, row.get(field, _MISSING))
+        for key, value in row.items():
+            if key not in self.FIELDS:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[key] = value
+        self._parse()
+
+    def _parse(self):
+        pass
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+            if key in ('date', 'time'):
+                self._parse()
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def _columns(self):
+        keys = [field for field in self.FIELDS if getattr(self, field) is not _MISSING]
+        return keys + list(self._extra or ())
+
+    def __iter__(self):
+        return iter(self._columns())
+
+    def __len__(self):
+        return len(self._columns())
+
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+
+class _Dated(Record):
+    """A record with 'date' (YYYY-MM-DD) and 'time' (H:MM) columns."""
+
+    __slots__ = ('start', 'ordinal')
+
+    def _parse(self):
+        # start: datetime of date + time (None if unparsable)
+        # ordinal: date.toordinal() of the date (None if unparsable)
+        self.start = self.ordinal = None
+        try:
+            day = _date.fromisoformat(self.date)
+        except (TypeError, ValueError):
+            return
+        self.ordinal = day.toordinal()
+        try:
+            hours, minutes = self.time.split(':')
+            self.start = datetime(day.year, day.month, day.day, int(hours), int(minutes))
+        except (AttributeError, TypeError, ValueError):
+            pass
+
+
+class Appointment(_Dated):
+    FIELDS = ('id', 'patient_email', 'doctor_id', 'clinic_id', 'date', 'time',
+              'duration', 'reason', 'status', 'slot_id')
+    __slots__ = FIELDS
+
+
+class Slot(_Dated):
+    FIELDS = ('id', 'doctor_id', 'clinic_id', 'date', 'time', 'duration', 'status')
+    __slots__ = FIELDS
+
+
+# table file name -> record type used by the data store
+RECORD_TYPES = {
+    'appointments.csv': Appointment,
+    'slots.csv': Slot,
+}
+
+
+def record_type(filepath):
+    """Return the record class for a table, or None to keep plain dicts."""
+    return RECORD_TYPES.get(os.path.basename(filepath))
+
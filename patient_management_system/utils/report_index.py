@@ -0,0 +1,107 @@
+"""
+Pre-aggregated appointment counts for the clinic and GP reports.
+
+Counts are kept per day and (clinic_id, doctor_id, reason, status), so a
+report over any date range only sums the daily buckets in that range. The
+counts are a maintained index of the cached appointments table (updated as
+appointments are booked or cancelled) and are saved to a sidecar file tagged
+with the table's version, so a fresh process can skip reading the table
+altogether while nothing has changed.
+"""
+import os
+import json
+from bisect import bisect_left, bisect_right, insort
+from utils import data_store
+from utils.storage import STORAGE_BACKEND
+
+DATA_DIR = '../data'
+APPOINTMENTS_FILE = os.path.join(DATA_DIR, 'appointments.csv')
+AGGREGATES_FILE = os.path.join(DATA_DIR, 'appointments.aggregates.json')
+
+
+class AppointmentCounts:
+    """Appointment counts bucketed by date, then (clinic_id, doctor_id, reason, status)."""
+
+    def __init__(self, rows=()):
+        self.by_date = {}  # date -> {(clinic_id, doctor_id, reason, status): count}
+        self.dates = []    # sorted keys of by_date
+        for row in rows:
+            self.add(row)
+
+    @staticmethod
+    def _key(row):
+        return (row.get('clinic_id'), row.get('doctor_id'),
+                row.get('reason') or 'Unknown', row.get('status'))
+
+    def _bump(self, date, key, amount):
+        bucket = self.by_date.get(date)
+        if bucket is None:
+            bucket = self.by_date[date] = {}
+            insort(self.dates, date)
+        count = bucket.get(key, 0) + amount
+        if count > 0:
+            bucket[key] = count
+        else:
+            bucket.pop(key, None)
+
+    def add(self, row):
+        self._bump(row.get('date'), self._key(row), 1)
+
+    def discard(self, row):
+        self._bump(row.get('date'), self._key(row), -1)
+
+    def totals(self, date_from=None, date_to=None):
+        """
+        Sum the buckets for dates in [date_from, date_to] (inclusive,
+        YYYY-MM-DD; None for no limit). Returns {(clinic_id, doctor_id,
+        reason, status): count}.
+        """
+        start = bisect_left(self.dates, date_from) if date_from else 0
+        end = bisect_right(self.dates, date_to) if date_to else len(self.dates)
+        totals = {}
+        for date in self.dates[start:end]:
+            for key, count in self.by_date[date].items():
+                totals[key] = totals.get(key, 0) + count
+        return totals
+
+    def to_json(self):
+        return [[date, *key, count] for date in self.dates for key, count in self.by_date[date].items()]
+
+    @classmethod
+    def from_json(cls, data):
+        counts = cls()
+        for date, clinic_id, doctor_id, reason, status, count in data:
+            counts._bump(date, (clinic_id, doctor_id, reason, status), count)
+        return counts
+
+
+def _sidecar_token():
+    # round-trip through JSON so it compares equal to the saved copy
+    return json.loads(json.dumps([STORAGE_BACKEND, data_store.stat_token(APPOINTMENTS_FILE)]))
+
+
+def get_appointment_counts():
+    """
+    Return the AppointmentCounts for the appointments table.
+
+    Uses the sidecar file if it matches the table's current version, and
+    otherwise the maintained index of the cached table, rewriting the sidecar.
+    """
+    token = _sidecar_token()
+    try:
+        with open(AGGREGATES_FILE, 'r') as file:
+            saved = json.load(file)
+        if saved.get('token') == token:
+            return AppointmentCounts.from_json(saved['counts'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    counts = data_store.get_maintained(APPOINTMENTS_FILE, 'report_counts', AppointmentCounts)
+    try:
+        tmp_path = AGGREGATES_FILE + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump({'token': token, 'counts': counts.to_json()}, file)
+        os.replace(tmp_path, AGGREGATES_FILE)
+    except OSError:
+        pass  # the sidecar is only a shortcut; the report still works without it
+    return counts
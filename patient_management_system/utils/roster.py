@@ -0,0 +1,152 @@
+"""
+Rule-based roster generation.
+
+Turns the free-text `availability` of each doctor (e.g. "Mon,Tue,Thu,Fri:
+9am-5pm") and the `operating_hours` of their clinic into slots for a date
+range. Slots that already exist, or would overlap one, are skipped, so running
+the generator twice over the same range creates nothing the second time.
+"""
+import os
+import re
+from datetime import datetime, timedelta
+from itertools import islice
+from utils import data_store
+from utils.helpers import append_csv_rows, reserve_ids, data_lock
+from utils.slot_index import SlotConflicts
+
+DATA_DIR = '../data'
+DOCTORS_FILE = os.path.join(DATA_DIR, 'doctors.csv')
+CLINICS_FILE = os.path.join(DATA_DIR, 'clinics.csv')
+SLOTS_FILE = os.path.join(DATA_DIR, 'slots.csv')
+
+BATCH_SIZE = 500  # slots per append
+SLOT_FIELDS = ['id', 'doctor_id', 'clinic_id', 'date', 'time', 'duration', 'status']
+
+DAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+_TIME = r'\d{1,2}(?::\d{2})?\s*(?:am|pm)?'
+_DAY = r'(?:mon|tue|wed|thu|fri|sat|sun)[a-z]*'
+# "Mon,Wed-Fri: 9am-5pm" -> days part, start, end
+_RULE = re.compile(rf'((?:{_DAY}\s*(?:-\s*{_DAY})?\s*,\s*)*{_DAY}\s*(?:-\s*{_DAY})?)\s*:\s*({_TIME})\s*-\s*({_TIME})')
+
+
+def _parse_time(text):
+    """'9am' -> 540, '5:30pm' -> 1050, '13:00' -> 780 (minutes after midnight)."""
+    match = re.fullmatch(r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?', text.strip())
+    hours, minutes, suffix = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if suffix == 'pm' and hours != 12:
+        hours += 12
+    elif suffix == 'am' and hours == 12:
+        hours = 0
+    return hours * 60 + minutes
+
+
+def _parse_days(text):
+    """'Mon,Wed-Fri' -> [0, 2, 3, 4]"""
+    days = []
+    for part in text.split(','):
+        ends = [DAYS.index(name.strip()[:3]) for name in part.split('-')]
+        first, last = ends[0], ends[-1]
+        days.extend(range(first, last + 1) if first <= last else list(range(first, 7)) + list(range(0, last + 1)))
+    return days
+
+
+def parse_hours(text):
+    """
+    Parse an availability or operating-hours string.
+
+    Returns {weekday: [(start, end), ...]} with weekday 0 = Monday and times in
+    minutes after midnight. Text that does not match any rule gives {}.
+    """
+    hours = {}
+    for days, start, end in _RULE.findall((text or '').lower()):
+        window = (_parse_time(start), _parse_time(end))
+        for day in _parse_days(days):
+            hours.setdefault(day, []).append(window)
+    return hours
+
+
+def _intersect(windows, limits):
+    """Overlap of two lists of (start, end) windows."""
+    result = []
+    for start, end in windows:
+        for limit_start, limit_end in limits:
+            lo, hi = max(start, limit_start), min(end, limit_end)
+            if lo < hi:
+                result.append((lo, hi))
+    return sorted(result)
+
+
+def _format_time(minutes):
+    # same un-padded form as the existing slots, e.g. 9:00 and 13:15
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+
+def roster_slots(date_from, date_to, doctors, clinic_lookup, duration):
+    """
+    Yield the slots the rules give for each doctor between two dates
+    (inclusive, YYYY-MM-DD), one doctor-day at a time.
+
+    A doctor only works inside their clinic's operating hours when those can
+    be parsed; otherwise their own availability is used as it is.
+    """
+    first = datetime.strptime(date_from, '%Y-%m-%d')
+    days = (datetime.strptime(date_to, '%Y-%m-%d') - first).days + 1
+    for doctor in doctors:
+        working = parse_hours(doctor.get('availability'))
+        opening = parse_hours(clinic_lookup.get(doctor.get('clinic_id'), {}).get('operating_hours'))
+        for offset in range(days):
+            day = first + timedelta(days=offset)
+            windows = working.get(day.weekday(), [])
+            if opening:
+                windows = _intersect(windows, opening.get(day.weekday(), []))
+            for start, end in windows:
+                for minutes in range(start, end - duration + 1, duration):
+                    yield {
+                        'id': None,
+                        'doctor_id': doctor['id'],
+                        'clinic_id': doctor['clinic_id'],
+                        'date': day.strftime('%Y-%m-%d'),
+                        'time': _format_time(minutes),
+                        'duration': str(duration),
+                        'status': 'available'
+                    }
+
+
+def generate_roster(date_from, date_to, doctor_ids=None, duration=15):
+    """
+    Create the roster slots for a date range and save them in batches.
+
+    Candidates are streamed from roster_slots() and checked against the
+    existing slots (and each other) with SlotConflicts; each batch gets one
+    reserved id range and one append. The data lock is held throughout so
+    another terminal cannot add clashing slots meanwhile.
+
+    Returns (created, skipped), or None if saving a batch failed.
+    """
+    doctors = data_store.get_rows(DOCTORS_FILE)
+    if doctor_ids is not None:
+        doctors = [doctor for doctor in doctors if doctor['id'] in doctor_ids]
+    clinic_lookup = data_store.get_lookup(CLINICS_FILE)
+
+    created = skipped = 0
+    with data_lock():
+        conflicts = SlotConflicts(data_store.get_index(SLOTS_FILE, 'doctor_id', 'date'))
+        candidates = roster_slots(date_from, date_to, doctors, clinic_lookup, duration)
+        while True:
+            pulled = list(islice(candidates, BATCH_SIZE))
+            if not pulled:
+                break
+            batch = []
+            for slot in pulled:
+                if conflicts.find(slot['doctor_id'], slot['date'], slot['time'], slot['duration']):
+                    skipped += 1
+                    continue
+                conflicts.add(slot['doctor_id'], slot['date'], slot['time'], slot['duration'])
+                batch.append(slot)
+            if batch:
+                for slot, slot_id in zip(batch, reserve_ids(SLOTS_FILE, len(batch))):
+                    slot['id'] = slot_id
+                if not append_csv_rows(SLOTS_FILE, batch, SLOT_FIELDS):
+                    return None
+                created += len(batch)
+    return created, skipped
@@ -0,0 +1,139 @@
+"""
+Text search over the GP and clinic directories.
+
+DoctorSearch indexes each GP's full name and specialty, ClinicSearch each
+clinic's suburb and postcode (parsed from its location). Text is normalised
+to lower-case words, then split into trigrams with a posting set of row ids
+per trigram, so a substring search only intersects a few sets and checks the
+candidates, however large the directory. Queries shorter than three letters
+have no trigram, so they fall back to a substring scan of the indexed text;
+similar() ranks rows by shared trigrams for "did you mean" suggestions.
+
+Both are maintained indexes of their tables: adding a GP or clinic, or
+editing one through update_csv_fields(), updates the index in place; a full
+rewrite of the table (delete) rebuilds it on next use.
+"""
+import os
+import re
+from utils import data_store
+
+DATA_DIR = '../data'
+CLINICS_FILE = os.path.join(DATA_DIR, 'clinics.csv')
+DOCTORS_FILE = os.path.join(DATA_DIR, 'doctors.csv')
+
+_WORD = re.compile(r'[a-z0-9]+')
+_POSTCODE = re.compile(r'\b(\d{4})\b')
+
+
+def suburb_of(location):
+    """The suburb part of a clinic location ('Clayton, VIC 3168' -> 'Clayton')."""
+    return location.split(',')[0] if ',' in location else location
+
+
+def postcode_of(location):
+    """The four-digit postcode in a clinic location, or ''."""
+    match = _POSTCODE.search(location)
+    return match.group(1) if match else ''
+
+
+def normalize(text):
+    """Lower-case words separated by single spaces ('Dr. John  Smith' -> 'dr john smith')."""
+    return ' '.join(_WORD.findall((text or '').lower()))
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Substring search over one text per row; subclasses define text_of(row)."""
+
+    def __init__(self, rows=()):
+        self._text = {}      # row id -> normalised text
+        self._postings = {}  # trigram -> set of row ids
+        for row in rows:
+            self.add(row)
+
+    def __len__(self):
+        return len(self._text)
+
+    def text_of(self, row):
+        raise NotImplementedError
+
+    def add(self, row):
+        row_id = row.get('id')
+        self.discard(row)
+        text = normalize(self.text_of(row))
+        self._text[row_id] = text
+        # pad so that word starts and ends are trigrams too (helps similar())
+        for gram in _trigrams(f' {text} '):
+            self._postings.setdefault(gram, set()).add(row_id)
+
+    def discard(self, row):
+        row_id = row.get('id')
+        text = self._text.pop(row_id, None)
+        if text is None:
+            return
+        for gram in _trigrams(f' {text} '):
+            bucket = self._postings.get(gram)
+            if bucket is not None:
+                bucket.discard(row_id)
+                if not bucket:
+                    del self._postings[gram]
+
+    def search(self, query):
+        """Ids of the rows whose text contains query (after normalising both)."""
+        query = normalize(query)
+        if not query:
+            return set(self._text)
+        if len(query) < 3:
+            # too short for a trigram: scan the normalised text
+            return {row_id for row_id, text in self._text.items() if query in text}
+        buckets = [self._postings.get(gram, set()) for gram in _trigrams(query)]
+        buckets.sort(key=len)
+        candidates = buckets[0].intersection(*buckets[1:])
+        # trigrams can match out of order, so confirm the substring
+        return {row_id for row_id in candidates if query in self._text[row_id]}
+
+    def similar(self, query, limit=5, min_score=0.3):
+        """Ids of up to limit rows most like query, best first (trigram overlap)."""
+        grams = _trigrams(f' {normalize(query)} ')
+        if not grams:
+            return []
+        shared = {}
+        for gram in grams:
+            for row_id in self._postings.get(gram, ()):
+                shared[row_id] = shared.get(row_id, 0) + 1
+        scored = []
+        for row_id, count in shared.items():
+            # share of the query's trigrams found, so long texts are not penalised
+            score = count / len(grams)
+            if score >= min_score:
+                scored.append((-score, row_id))
+        scored.sort()
+        return [row_id for _, row_id in scored[:limit]]
+
+
+class DoctorSearch(TrigramIndex):
+    """Search over GP names and specialties."""
+
+    def text_of(self, row):
+        return f"{row.get('full_name', '')} {row.get('specialty', '')}"
+
+
+class ClinicSearch(TrigramIndex):
+    """Search over clinic suburbs and postcodes."""
+
+    def text_of(self, row):
+        location = row.get('location', '')
+        return f"{suburb_of(location)} {postcode_of(location)}"
+
+
+def doctor_search():
+    """The DoctorSearch index of the GP table."""
+    return data_store.get_maintained(DOCTORS_FILE, 'search', DoctorSearch)
+
+
+def clinic_search():
+    """The ClinicSearch index of the clinic table."""
+    return data_store.get_maintained(CLINICS_FILE, 'search', ClinicSearch)
@@ -0,0 +1,182 @@
+from bisect import bisect_left, bisect_right, insort
+
+
+class SlotAvailability:
+    """
+    Available slot ids bucketed by doctor, clinic and date.
+
+    Built once from the cached slots table and kept up to date by
+    data_store.record_changes(), so booking or cancelling a slot moves one id
+    between buckets instead of re-scanning the table. Filter queries are
+    intersections of the (small) buckets involved.
+    """
+
+    def __init__(self, rows=()):
+        self.rows = {}       # slot id -> row, available slots only
+        self.by_doctor = {}  # doctor_id -> {slot ids}
+        self.by_clinic = {}  # clinic_id -> {slot ids}
+        self.by_date = {}    # date -> {slot ids}
+        self.dates = []      # sorted dates that still have an available slot
+        self._order = {}     # slot id -> position in the table, for display order
+        for row in rows:
+            self.add(row)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, row):
+        """Track a slot row; only available slots are bucketed."""
+        slot_id = row.get('id')
+        self._order.setdefault(slot_id, len(self._order))
+        if row.get('status') != 'available' or slot_id in self.rows:
+            return
+        self.rows[slot_id] = row
+        self.by_doctor.setdefault(row.get('doctor_id'), set()).add(slot_id)
+        self.by_clinic.setdefault(row.get('clinic_id'), set()).add(slot_id)
+        date = row.get('date')
+        if date not in self.by_date:
+            insort(self.dates, date)
+        self.by_date.setdefault(date, set()).add(slot_id)
+
+    def discard(self, row):
+        """Stop tracking a slot as available (it was booked or changed)."""
+        slot_id = row.get('id')
+        row = self.rows.pop(slot_id, None)
+        if row is None:
+            return
+        _remove(self.by_doctor, row.get('doctor_id'), slot_id)
+        _remove(self.by_clinic, row.get('clinic_id'), slot_id)
+        date = row.get('date')
+        if _remove(self.by_date, date, slot_id):
+            del self.dates[bisect_left(self.dates, date)]
+
+    def doctor_ids(self):
+        """Doctors with at least one available slot."""
+        return list(self.by_doctor)
+
+    def clinic_ids(self):
+        """Clinics with at least one available slot."""
+        return list(self.by_clinic)
+
+    def dates_between(self, date_from=None, date_to=None):
+        """Dates with an available slot in [date_from, date_to] (YYYY-MM-DD strings)."""
+        start = bisect_left(self.dates, date_from) if date_from else 0
+        end = bisect_right(self.dates, date_to) if date_to else len(self.dates)
+        return self.dates[start:end]
+
+    def query(self, doctor_id=None, clinic_id=None, date=None, date_from=None, date_to=None):
+        """Return the available slot rows matching every given filter, in table order."""
+        buckets = []
+        if doctor_id:
+            buckets.append(self.by_doctor.get(doctor_id, set()))
+        if clinic_id:
+            buckets.append(self.by_clinic.get(clinic_id, set()))
+        if date:
+            buckets.append(self.by_date.get(date, set()))
+        if date_from or date_to:
+            in_range = set()
+            for day in self.dates_between(date_from, date_to):
+                in_range |= self.by_date[day]
+            buckets.append(in_range)
+
+        if buckets:
+            buckets.sort(key=len)
+            slot_ids = buckets[0].intersection(*buckets[1:])
+        else:
+            slot_ids = self.rows.keys()
+        return [self.rows[slot_id] for slot_id in sorted(slot_ids, key=self._order.get)]
+
+
+def _remove(buckets, key, slot_id):
+    """Remove slot_id from buckets[key]; return True if the bucket is now gone."""
+    bucket = buckets.get(key)
+    if bucket is None:
+        return False
+    bucket.discard(slot_id)
+    if bucket:
+        return False
+    del buckets[key]
+    return True
+
+
+def normalize_time(value):
+    """Return a time as zero-padded 'HH:MM' ('9:00' -> '09:00'), or None if invalid."""
+    try:
+        hours, minutes = (int(part) for part in value.strip().split(':'))
+    except (AttributeError, ValueError):
+        return None
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        return None
+    return f"{hours:02d}:{minutes:02d}"
+
+
+def _minutes(time_str):
+    hours, minutes = time_str.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+class SlotConflicts:
+    """
+    Slot times per (doctor_id, date), to reject duplicate or overlapping slots
+    before they are saved.
+
+    slots_by_day is the grouped index data_store.get_index(SLOTS_FILE,
+    'doctor_id', 'date'); a day's intervals are only built the first time that
+    day is checked. Slots accepted with add() are checked against too, so a
+    batch cannot clash with itself.
+    """
+
+    def __init__(self, slots_by_day):
+        self._slots_by_day = slots_by_day
+        self._times = set()  # (doctor_id, date, 'HH:MM')
+        self._days = {}      # (doctor_id, date) -> sorted [(start, end, 'HH:MM')]
+
+    def _day(self, doctor_id, date):
+        key = (doctor_id, date)
+        intervals = self._days.get(key)
+        if intervals is None:
+            intervals = []
+            for slot in self._slots_by_day.get(key, []):
+                time = normalize_time(slot.get('time', ''))
+                if time is None:
+                    continue
+                self._times.add((doctor_id, date, time))
+                start = _minutes(time)
+                intervals.append((start, start + _duration(slot.get('duration')), time))
+            intervals.sort()
+            self._days[key] = intervals
+        return intervals
+
+    def find(self, doctor_id, date, time, duration):
+        """Return the time of the slot that clashes with the given one, or None."""
+        intervals = self._day(doctor_id, date)
+        time = normalize_time(time)
+        if (doctor_id, date, time) in self._times:
+            return time
+        start = _minutes(time)
+        end = start + _duration(duration)
+        # of the slots starting later, the first one clashes if any does
+        i = bisect_left(intervals, (start,))
+        if i < len(intervals) and intervals[i][0] < end:
+            return intervals[i][2]
+        # saved slots can overlap each other (a duration edited afterwards),
+        # so a long slot further back may still run past start
+        for _, earlier_end, earlier_time in reversed(intervals[:i]):
+            if earlier_end > start:
+                return earlier_time
+        return None
+
+    def add(self, doctor_id, date, time, duration):
+        """Record a slot accepted into the current batch."""
+        intervals = self._day(doctor_id, date)
+        time = normalize_time(time)
+        self._times.add((doctor_id, date, time))
+        start = _minutes(time)
+        insort(intervals, (start, start + _duration(duration), time))
+
+
+def _duration(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
@@ -0,0 +1,122 @@
+"""
+Per-GP and per-suburb slot counts for the admin statistics screen.
+
+The slots table is kept as integer columns (doctor code, clinic code,
+available flag) in a maintained index of the data store, so a booking only
+flips one flag. Counting is then one pass over the codes: with NumPy installed
+(optional) and a large table it is a handful of bincount calls, otherwise a
+plain loop over the same columns.
+"""
+from array import array
+from utils.search_index import suburb_of
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+NUMPY_MIN_ROWS = 10000  # below this the plain loop is as fast
+
+
+class SlotColumns:
+    """The slots table as columns of small integer codes."""
+
+    def __init__(self, rows=()):
+        self.doctor_ids = []  # code -> doctor_id, in first-seen order
+        self.clinic_ids = []  # code -> clinic_id, in first-seen order
+        self._doctor_codes = {}
+        self._clinic_codes = {}
+        self.doctor = array('i')
+        self.clinic = array('i')
+        self.available = array('b')
+        self.live = array('b')  # 0 while a row is being changed
+        self._position = {}     # id(row) -> position in the columns
+        for row in rows:
+            self.add(row)
+
+    def __len__(self):
+        return len(self.doctor)
+
+    @staticmethod
+    def _encode(value, codes, values):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def add(self, row):
+        doctor = self._encode(row.get('doctor_id'), self._doctor_codes, self.doctor_ids)
+        clinic = self._encode(row.get('clinic_id'), self._clinic_codes, self.clinic_ids)
+        available = 1 if row.get('status') == 'available' else 0
+        position = self._position.get(id(row))
+        if position is None:
+            self._position[id(row)] = len(self.doctor)
+            self.doctor.append(doctor)
+            self.clinic.append(clinic)
+            self.available.append(available)
+            self.live.append(1)
+        else:
+            self.doctor[position] = doctor
+            self.clinic[position] = clinic
+            self.available[position] = available
+            self.live[position] = 1
+
+    def discard(self, row):
+        position = self._position.get(id(row))
+        if position is not None:
+            self.live[position] = 0
+
+    def counts(self):
+        """
+        Return (doctor_totals, doctor_available, clinic_totals, clinic_available),
+        each a list indexed by code.
+        """
+        if np is not None and len(self) >= NUMPY_MIN_ROWS:
+            return self._counts_numpy()
+        doctor_totals = [0] * len(self.doctor_ids)
+        doctor_available = [0] * len(self.doctor_ids)
+        clinic_totals = [0] * len(self.clinic_ids)
+        clinic_available = [0] * len(self.clinic_ids)
+        for doctor, clinic, available, live in zip(self.doctor, self.clinic, self.available, self.live):
+            if live:
+                doctor_totals[doctor] += 1
+                clinic_totals[clinic] += 1
+                if available:
+                    doctor_available[doctor] += 1
+                    clinic_available[clinic] += 1
+        return doctor_totals, doctor_available, clinic_totals, clinic_available
+
+    def _counts_numpy(self):
+        # np.array copies, so the array.array columns can keep growing
+        doctor = np.array(self.doctor, dtype=np.int32)
+        clinic = np.array(self.clinic, dtype=np.int32)
+        live = np.array(self.live, dtype=np.int8)
+        available = np.array(self.available, dtype=np.int8) & live
+        return tuple(
+            np.bincount(codes, weights=weights, minlength=size).astype(np.int64).tolist()
+            for codes, size in ((doctor, len(self.doctor_ids)), (clinic, len(self.clinic_ids)))
+            for weights in (live, available)
+        )
+
+
+def slot_statistics(columns, clinic_lookup):
+    """
+    Return ({doctor_id: (total, available)}, {suburb: (total, available)}),
+    in the order GPs and clinics first appear in the slots table.
+    """
+    doctor_totals, doctor_available, clinic_totals, clinic_available = columns.counts()
+
+    by_gp = {}
+    for code, doctor_id in enumerate(columns.doctor_ids):
+        if doctor_totals[code]:
+            by_gp[doctor_id] = (doctor_totals[code], doctor_available[code])
+
+    # the suburb is derived once per clinic rather than once per slot
+    by_suburb = {}
+    for code, clinic_id in enumerate(columns.clinic_ids):
+        if clinic_totals[code]:
+            suburb = suburb_of(clinic_lookup.get(clinic_id, {}).get('location', ''))
+            total, available = by_suburb.get(suburb, (0, 0))
+            by_suburb[suburb] = (total + clinic_totals[code], available + clinic_available[code])
+    return by_gp, by_suburb
@@ -0,0 +1,29 @@
+"""
+Slot lookups shared by the patient and admin screens.
+"""
+import os
+from utils import data_store
+from utils.slot_index import normalize_time
+
+DATA_DIR = '../data'
+SLOTS_FILE = os.path.join(DATA_DIR, 'slots.csv')
+
+
+def slot_of_appointment(appointment):
+    """
+    Return the slot row an appointment was booked on, or None.
+
+    Appointments booked since slot_id was added name their slot, which is
+    found by primary key. Older rows without one fall back to matching
+    doctor, date and (normalised) time within that doctor's day.
+    """
+    slot_id = appointment.get('slot_id')
+    if slot_id:
+        matches = data_store.select(SLOTS_FILE, id=slot_id)
+        return matches[0] if matches else None
+
+    time = normalize_time(appointment.get('time', ''))
+    for slot in data_store.select(SLOTS_FILE, doctor_id=appointment['doctor_id'], date=appointment['date']):
+        if normalize_time(slot['time']) == time:
+            return slot
+    return None
@@ -0,0 +1,516 @@
+import os
+import csv
+import json
+import sqlite3
+from contextlib import contextmanager
+
+DATA_DIR = '../data'  # Data directory path
+STORAGE_BACKEND = os.environ.get('PMS_STORAGE', 'csv')  # 'csv' or 'sqlite'
+SQLITE_FILE = os.path.join(DATA_DIR, 'clinic.db')
+JOURNAL_COMPACT_BYTES = 256 * 1024  # Fold a table's journal back into it past this size
+TRANSACTION_FILE = os.path.join(DATA_DIR, 'transaction.json')  # Plan of the commit in progress
+
+# Column used to address rows in updates (default 'id')
+PRIMARY_KEYS = {'users.csv': 'email'}
+
+# Secondary indexes kept by the SQLite backend, per table
+SQLITE_INDEXES = {
+    'slots': [('doctor_id', 'date', 'status')],
+    'appointments': [('patient_email',)],
+    'notifications': [('user_id',)],
+}
+
+
+def primary_key(filepath):
+    """Return the column that identifies rows of a table."""
+    return PRIMARY_KEYS.get(os.path.basename(filepath), 'id')
+
+
+def table_name(filepath):
+    """Return the table name for a data file, e.g. '../data/slots.csv' -> 'slots'."""
+    return os.path.splitext(os.path.basename(filepath))[0]
+
+
+def _fsync_dir(path):
+    """Flush the directory entry of a renamed/created file where the OS allows it."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows, where directories cannot be opened
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class CommitPending(Exception):
+    """
+    A commit whose plan is durable but could not be applied yet.
+
+    The commit stands: recover() finishes it before the next commit, or at
+    startup, and nothing can be written in between that contradicts it.
+    """
+
+
+class StorageBackend:
+    """
+    Interface implemented by every storage backend.
+
+    Tables are addressed by their CSV path (e.g. SLOTS_FILE) whatever the
+    backend, and rows are dicts of strings. Writers raise on failure; the
+    helpers in utils.helpers report the error and return False. Callers hold
+    helpers.data_lock() around every write.
+    """
+
+    # True if select() runs an indexed query rather than a scan
+    supports_queries = False
+
+    def exists(self, filepath):
+        raise NotImplementedError
+
+    def version(self, filepath):
+        """Return a token that changes whenever the table changes (None if missing)."""
+        raise NotImplementedError
+
+    def read_table(self, filepath):
+        """Return (rows, fieldnames) for a whole table."""
+        raise NotImplementedError
+
+    def select(self, filepath, criteria):
+        """Return the rows whose columns equal every value in criteria."""
+        rows, _ = self.read_table(filepath)
+        return [row for row in rows if all(row.get(k) == v for k, v in criteria.items())]
+
+    def write_table(self, filepath, rows, fieldnames):
+        """Replace a table's contents."""
+        raise NotImplementedError
+
+    def append_rows(self, filepath, rows, fieldnames=None):
+        """Add rows to a table, creating it with fieldnames if it is missing."""
+        raise NotImplementedError
+
+    def update_fields(self, filepath, updates):
+        """Apply (row_id, field, value) changes, addressing rows by primary key."""
+        raise NotImplementedError
+
+    def commit(self, operations):
+        """Apply a list of save/append/update operations all-or-nothing."""
+        raise NotImplementedError
+
+    def recover(self):
+        """Finish or roll back a commit interrupted by a crash."""
+        return True
+
+    def has_pending(self):
+        """True if a commit was left unfinished and recover() should run first."""
+        return False
+
+
+class CsvBackend(StorageBackend):
+    """
+    The original one-file-per-table CSV layout.
+
+    Single-field changes go to an append-only <table>.journal.csv that is
+    replayed on load and compacted into the table once it passes
+    JOURNAL_COMPACT_BYTES. Full rewrites go through an fsynced temp file and
+    an atomic rename, and multi-table commits through TRANSACTION_FILE.
+    """
+
+    def journal_path(self, filepath):
+        """Return the path of a table's journal, e.g. slots.journal.csv."""
+        return os.path.splitext(filepath)[0] + '.journal.csv'
+
+    def exists(self, filepath):
+        return os.path.isfile(filepath)
+
+    def version(self, filepath):
+        base = self._file_token(filepath)
+        if base is None:
+            return None
+        return base, self._file_token(self.journal_path(filepath))
+
+    @staticmethod
+    def _file_token(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def read_table(self, filepath):
+        with open(filepath, 'r', newline='') as file:
+            reader = csv.DictReader(file)
+            rows = list(reader)
+            fieldnames = list(reader.fieldnames or [])
+        self._replay_journal(filepath, rows, fieldnames)
+        return rows, fieldnames
+
+    def _replay_journal(self, filepath, rows, fieldnames):
+        """Apply the (id, field, value) entries of a table's journal to its rows."""
+        path = self.journal_path(filepath)
+        if not os.path.isfile(path):
+            return
+        key_field = primary_key(filepath)
+        by_key = {row.get(key_field): row for row in rows}
+        with open(path, 'r', newline='') as file:
+            for entry in csv.DictReader(file):
+                # a torn last line from an interrupted append has missing columns
+                if entry.get('value') is None:
+                    continue
+                row = by_key.get(entry['id'])
+                if row is not None:
+                    row[entry['field']] = entry['value']
+                    if entry['field'] not in fieldnames:
+                        fieldnames.append(entry['field'])
+
+    @staticmethod
+    def _write_file(path, rows, fieldnames):
+        """Write a complete CSV file and fsync it."""
+        with open(path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(fieldnames))
+            writer.writeheader()
+            writer.writerows(rows)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _replace_table(self, filepath, tmp_path):
+        """Atomically swap a staged file in for a table."""
+        os.replace(tmp_path, filepath)
+        # the rewritten file already contains every journalled change
+        journal = self.journal_path(filepath)
+        if os.path.exists(journal):
+            os.remove(journal)
+        _fsync_dir(filepath)
+
+    def write_table(self, filepath, rows, fieldnames):
+        tmp_path = filepath + '.tmp'
+        try:
+            self._write_file(tmp_path, rows, fieldnames)
+            self._replace_table(filepath, tmp_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _read_header(filepath):
+        """Read just the header line of a CSV file."""
+        with open(filepath, 'r', newline='') as file:
+            return next(csv.reader(file), [])
+
+    @staticmethod
+    def _ends_with_newline(filepath):
+        """Check whether a non-empty file ends with a line break."""
+        with open(filepath, 'rb') as file:
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) in (b'\n', b'\r')
+
+    def append_rows(self, filepath, rows, fieldnames=None):
+        exists = os.path.isfile(filepath) and os.path.getsize(filepath) > 0
+        header = self._read_header(filepath) if exists else []
+        if not header:
+            header = list(fieldnames or rows[0].keys())
+        extra = [k for row in rows for k in row if k not in header]
+        if exists and extra:
+            # a new column: rewrite once with the widened header
+            current, _ = self.read_table(filepath)
+            self.write_table(filepath, current + list(rows), header + list(dict.fromkeys(extra)))
+            return
+
+        with open(filepath, 'a', newline='') as file:
+            if exists and not self._ends_with_newline(filepath):
+                file.write('\n')
+            writer = csv.DictWriter(file, fieldnames=header)
+            if not exists:
+                writer.writeheader()
+            writer.writerows(rows)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def update_fields(self, filepath, updates):
+        journal = self.journal_path(filepath)
+        exists = os.path.isfile(journal) and os.path.getsize(journal) > 0
+        with open(journal, 'a', newline='') as file:
+            if exists and not self._ends_with_newline(journal):
+                file.write('\n')
+            writer = csv.writer(file)
+            if not exists:
+                writer.writerow(['id', 'field', 'value'])
+            writer.writerows(updates)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.getsize(journal) > JOURNAL_COMPACT_BYTES:
+            self.compact_journal(filepath)
+
+    def compact_journal(self, filepath):
+        """Rewrite a table with its journal applied and drop the journal."""
+        if os.path.exists(self.journal_path(filepath)):
+            rows, fieldnames = self.read_table(filepath)
+            self.write_table(filepath, rows, fieldnames)
+
+    def commit(self, operations):
+        # an earlier commit that could not be finished must land before a new one
+        if os.path.exists(TRANSACTION_FILE):
+            self.recover()
+
+        # stage full rewrites, then durably record the plan: that is the commit point
+        plan = []
+        try:
+            for op in operations:
+                if op['op'] == 'save':
+                    tmp_path = op['path'] + '.txn.tmp'
+                    plan.append({'op': 'save', 'path': op['path'], 'tmp': tmp_path})
+                    self._write_file(tmp_path, op['rows'], op['fieldnames'])
+                else:
+                    plan.append(op)
+            self._write_plan(plan)
+        except Exception:
+            # nothing has been applied yet, so just discard what was staged
+            for op in plan:
+                if op['op'] == 'save' and os.path.exists(op['tmp']):
+                    os.remove(op['tmp'])
+            raise
+
+        try:
+            self._apply_plan(plan, recovering=False)
+        except Exception:
+            # roll the plan forward now rather than leave it half-applied; if
+            # that fails too the plan stays for the next commit or startup
+            try:
+                self._apply_plan(plan, recovering=True)
+            except Exception as e:
+                raise CommitPending(e) from e
+        os.remove(TRANSACTION_FILE)
+        _fsync_dir(TRANSACTION_FILE)
+
+    def has_pending(self):
+        return os.path.exists(TRANSACTION_FILE)
+
+    @staticmethod
+    def _write_plan(plan):
+        if os.path.exists(TRANSACTION_FILE):
+            raise RuntimeError("an earlier transaction is still unfinished")
+        tmp_path = TRANSACTION_FILE + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(plan, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, TRANSACTION_FILE)
+        _fsync_dir(TRANSACTION_FILE)
+
+    def _apply_plan(self, plan, recovering):
+        """Apply a transaction plan. Every step is safe to repeat after a crash."""
+        for op in plan:
+            if op['op'] == 'save':
+                # on recovery a missing temp file means the rename already happened
+                if os.path.exists(op['tmp']):
+                    self._replace_table(op['path'], op['tmp'])
+            elif op['op'] == 'append':
+                rows = op['rows']
+                if recovering:
+                    rows = [row for row in rows if not self._row_exists(op['path'], row)]
+                if rows:
+                    self.append_rows(op['path'], rows, op['fieldnames'])
+            else:
+                self.update_fields(op['path'], [tuple(u) for u in op['updates']])
+
+    def _row_exists(self, filepath, row):
+        """Check whether an appended row already made it into a table."""
+        if not os.path.isfile(filepath):
+            return False
+        rows, _ = self.read_table(filepath)
+        key_field = primary_key(filepath)
+        if row.get(key_field):
+            return any(existing.get(key_field) == row[key_field] for existing in rows)
+        return any(all(existing.get(k) == v for k, v in row.items()) for existing in rows)
+
+    def recover(self):
+        if os.path.exists(TRANSACTION_FILE):
+            try:
+                with open(TRANSACTION_FILE, 'r') as file:
+                    plan = json.load(file)
+            except ValueError:
+                plan = None  # the plan never finished writing, so nothing was applied
+            if plan is not None:
+                self._apply_plan(plan, recovering=True)
+            os.remove(TRANSACTION_FILE)
+            _fsync_dir(TRANSACTION_FILE)
+        if os.path.isdir(DATA_DIR):
+            for name in os.listdir(DATA_DIR):
+                if name.endswith('.tmp'):
+                    os.remove(os.path.join(DATA_DIR, name))
+        return True
+
+
+def _quote(name):
+    """Quote an SQL identifier taken from a CSV header."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqliteBackend(StorageBackend):
+    """
+    All tables in one local SQLite file (SQLITE_FILE) in WAL mode.
+
+    Every column is TEXT, so rows round-trip exactly as they do through CSV,
+    and rowid keeps file order. Each write bumps a per-table counter in
+    _versions, which the data store uses to tell when to reload.
+    """
+
+    supports_queries = True
+
+    def __init__(self, db_path=SQLITE_FILE):
+        self.db_path = db_path
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS _versions '
+                         '(name TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _columns(self, table):
+        info = self._connection().execute(f'PRAGMA table_info({_quote(table)})').fetchall()
+        return [col[1] for col in info]
+
+    def _create_table(self, conn, table, fieldnames, key_field):
+        columns = ', '.join(f'{_quote(f)} TEXT' for f in fieldnames)
+        conn.execute(f'CREATE TABLE {_quote(table)} ({columns})')
+        wanted = [(key_field,)] + SQLITE_INDEXES.get(table, [])
+        for cols in wanted:
+            if all(c in fieldnames for c in cols):
+                name = _quote(f"idx_{table}_{'_'.join(cols)}")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {_quote(table)} "
+                             f"({', '.join(_quote(c) for c in cols)})")
+
+    def _ensure_columns(self, conn, filepath, fieldnames):
+        """Create a table, or add columns it lacks, so fieldnames can be stored."""
+        table = table_name(filepath)
+        existing = self._columns(table)
+        if not existing:
+            self._create_table(conn, table, fieldnames, primary_key(filepath))
+            return
+        for field in fieldnames:
+            if field not in existing:
+                conn.execute(f'ALTER TABLE {_quote(table)} ADD COLUMN {_quote(field)} TEXT')
+
+    def _bump_version(self, conn, filepath):
+        conn.execute('INSERT INTO _versions (name, version) VALUES (?, 1) '
+                     'ON CONFLICT(name) DO UPDATE SET version = version + 1',
+                     (table_name(filepath),))
+
+    @staticmethod
+    def _to_rows(cursor):
+        names = [d[0] for d in cursor.description]
+        return [{n: '' if v is None else v for n, v in zip(names, values)} for values in cursor]
+
+    def exists(self, filepath):
+        return bool(self._columns(table_name(filepath)))
+
+    def version(self, filepath):
+        if not self.exists(filepath):
+            return None
+        row = self._connection().execute('SELECT version FROM _versions WHERE name = ?',
+                                         (table_name(filepath),)).fetchone()
+        return row[0] if row else 0
+
+    def read_table(self, filepath):
+        table = table_name(filepath)
+        fieldnames = self._columns(table)
+        if not fieldnames:
+            return [], []
+        cursor = self._connection().execute(f'SELECT * FROM {_quote(table)} ORDER BY rowid')
+        return self._to_rows(cursor), fieldnames
+
+    def select(self, filepath, criteria):
+        table = table_name(filepath)
+        if not self._columns(table):
+            return []
+        where = ' AND '.join(f'{_quote(k)} = ?' for k in criteria) or '1'
+        cursor = self._connection().execute(
+            f'SELECT * FROM {_quote(table)} WHERE {where} ORDER BY rowid', list(criteria.values()))
+        return self._to_rows(cursor)
+
+    def _write(self, conn, filepath, rows, fieldnames):
+        table = table_name(filepath)
+        fieldnames = list(fieldnames)
+        conn.execute(f'DROP TABLE IF EXISTS {_quote(table)}')
+        self._create_table(conn, table, fieldnames, primary_key(filepath))
+        self._insert(conn, table, rows, fieldnames)
+        self._bump_version(conn, filepath)
+
+    @staticmethod
+    def _insert(conn, table, rows, fieldnames):
+        columns = ', '.join(_quote(f) for f in fieldnames)
+        marks = ', '.join('?' for _ in fieldnames)
+        conn.executemany(f'INSERT INTO {_quote(table)} ({columns}) VALUES ({marks})',
+                         ([None if row.get(f) is None else str(row.get(f)) for f in fieldnames]
+                          for row in rows))
+
+    def _append(self, conn, filepath, rows, fieldnames):
+        fieldnames = list(fieldnames or rows[0].keys())
+        fieldnames += [k for row in rows for k in row if k not in fieldnames]
+        fieldnames = list(dict.fromkeys(fieldnames))
+        self._ensure_columns(conn, filepath, fieldnames)
+        self._insert(conn, table_name(filepath), rows, fieldnames)
+        self._bump_version(conn, filepath)
+
+    def _update(self, conn, filepath, updates):
+        table = table_name(filepath)
+        key_field = primary_key(filepath)
+        self._ensure_columns(conn, filepath, [field for _, field, _ in updates])
+        for row_id, field, value in updates:
+            conn.execute(f'UPDATE {_quote(table)} SET {_quote(field)} = ? WHERE {_quote(key_field)} = ?',
+                         (value, row_id))
+        self._bump_version(conn, filepath)
+
+    def write_table(self, filepath, rows, fieldnames):
+        with self._transaction() as conn:
+            self._write(conn, filepath, rows, fieldnames)
+
+    def append_rows(self, filepath, rows, fieldnames=None):
+        with self._transaction() as conn:
+            self._append(conn, filepath, rows, fieldnames)
+
+    def update_fields(self, filepath, updates):
+        with self._transaction() as conn:
+            self._update(conn, filepath, updates)
+
+    def commit(self, operations):
+        with self._transaction() as conn:
+            for op in operations:
+                if op['op'] == 'save':
+                    self._write(conn, op['path'], op['rows'], op['fieldnames'])
+                elif op['op'] == 'append':
+                    self._append(conn, op['path'], op['rows'], op['fieldnames'])
+                else:
+                    self._update(conn, op['path'], [tuple(u) for u in op['updates']])
+
+
+_backend = None
+
+
+def get_backend():
+    """Return the configured storage backend (PMS_STORAGE=csv|sqlite)."""
+    global _backend
+    if _backend is None:
+        _backend = SqliteBackend() if STORAGE_BACKEND == 'sqlite' else CsvBackend()
+    return _backend
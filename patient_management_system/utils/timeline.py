@@ -0,0 +1,134 @@
+"""
+Per-patient appointment timelines for the "My Appointments" screen.
+
+A PatientTimeline holds one patient's appointments sorted by date and time,
+joined with the GP name and clinic suburb, and split into upcoming and past.
+Timelines are cached in a maintained index of the appointments table
+(PatientTimelines): a booking, cancellation or status change drops only the
+timeline of the patient it belongs to. Changes to the GP or clinic tables
+drop every timeline, since the joined names may have changed.
+"""
+import os
+from bisect import bisect_right
+from datetime import datetime
+from utils import data_store
+from utils.search_index import suburb_of
+
+DATA_DIR = '../data'
+APPOINTMENTS_FILE = os.path.join(DATA_DIR, 'appointments.csv')
+CLINICS_FILE = os.path.join(DATA_DIR, 'clinics.csv')
+DOCTORS_FILE = os.path.join(DATA_DIR, 'doctors.csv')
+
+CLOSED_STATUSES = ('cancelled', 'cancelled by patient', 'attended')
+
+STATUS_DISPLAY = {
+    'confirmed': "Confirmed",
+    'cancelled': "Cancelled by Clinic",
+    'cancelled by patient': "Cancelled by Patient",
+    'attended': "Attended",
+}
+
+
+def status_display(status):
+    """Human-readable form of an appointment status."""
+    return STATUS_DISPLAY.get(status, status.capitalize())
+
+
+class TimelineEntry:
+    """One appointment with the display fields joined in (get() reads the appointment)."""
+
+    __slots__ = ('appointment', 'doctor_name', 'suburb', 'status_display')
+
+    def __init__(self, appointment, doctor_lookup, clinic_lookup):
+        self.appointment = appointment
+        self.doctor_name = doctor_lookup.get(appointment['doctor_id'], {}).get('full_name', 'Unknown')
+        self.suburb = suburb_of(clinic_lookup.get(appointment['clinic_id'], {}).get('location', ''))
+        self.status_display = status_display(appointment['status'])
+
+    def get(self, field, default=None):
+        return self.appointment.get(field, default)
+
+
+class PatientTimeline:
+    """
+    One patient's appointments, sorted, with upcoming/past partitions.
+
+    The partitions are worked out for a moment in time and reused until the
+    next appointment start passes, so switching between the views is free.
+    """
+
+    def __init__(self, appointments, doctor_lookup, clinic_lookup):
+        entries = [TimelineEntry(appt, doctor_lookup, clinic_lookup) for appt in appointments]
+        entries.sort(key=lambda e: (e.appointment['date'], e.appointment.start or datetime.min))
+        self.entries = entries
+        self._starts = sorted(e.appointment.start for e in entries if e.appointment.start)
+        self._valid_until = None  # partitions hold while now < this (None: not computed)
+        self._upcoming = self._past = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _partition(self, now):
+        if self._valid_until is not None and now < self._valid_until:
+            return
+        upcoming, past = [], []
+        for entry in self.entries:
+            appt = entry.appointment
+            started = appt.start is not None and appt.start <= now
+            if started or appt['status'] in CLOSED_STATUSES:
+                past.append(entry)
+            elif appt['status'] == 'confirmed':
+                upcoming.append(entry)
+        i = bisect_right(self._starts, now)
+        self._valid_until = self._starts[i] if i < len(self._starts) else datetime.max
+        self._upcoming, self._past = upcoming, past
+
+    def upcoming(self, now=None):
+        """Confirmed appointments that have not started yet."""
+        self._partition(now or datetime.now())
+        return self._upcoming
+
+    def past(self, now=None):
+        """Appointments that have started, plus closed (cancelled/attended) ones."""
+        self._partition(now or datetime.now())
+        return self._past
+
+    def view(self, mode, now=None):
+        """Entries for a view mode: 'upcoming', 'past' or 'all'."""
+        if mode == 'upcoming':
+            return self.upcoming(now)
+        if mode == 'past':
+            return self.past(now)
+        return self.entries
+
+
+class PatientTimelines:
+    """Maintained index of the appointments table: patient email -> PatientTimeline."""
+
+    def __init__(self, rows=()):
+        self._timelines = {}
+        self._joined = None  # (GP table token, clinic table token) the timelines were built with
+
+    def add(self, row):
+        self._timelines.pop(row.get('patient_email'), None)
+
+    discard = add
+
+    def get(self, patient_email):
+        joined = (data_store.stat_token(DOCTORS_FILE), data_store.stat_token(CLINICS_FILE))
+        if joined != self._joined:
+            self._timelines.clear()
+            self._joined = joined
+        timeline = self._timelines.get(patient_email)
+        if timeline is None:
+            timeline = PatientTimeline(
+                data_store.select(APPOINTMENTS_FILE, patient_email=patient_email),
+                data_store.get_lookup(DOCTORS_FILE),
+                data_store.get_lookup(CLINICS_FILE))
+            self._timelines[patient_email] = timeline
+        return timeline
+
+
+def get_patient_timeline(patient_email):
+    """Return the cached timeline of a patient, rebuilding it if their rows changed."""
+    return data_store.get_maintained(APPOINTMENTS_FILE, 'timelines', PatientTimelines).get(patient_email)
@@ -0,0 +1,54 @@
+"""
+User repository: finds accounts by e-mail without scanning users.csv.
+
+Built on the data store, so the table is parsed once per process and only
+re-read when another terminal changes it; the e-mail index is kept up to date
+as users register or change their details.
+
+set_password() stores a new password hash by rewriting users.csv instead of
+journalling the change, so an old (possibly plaintext) value never stays on
+disk next to the new hash.
+"""
+import os
+from utils import data_store
+from utils.helpers import load_csv_data, save_csv_data, data_lock
+
+DATA_DIR = '../data'
+USERS_FILE = os.path.join(DATA_DIR, 'users.csv')
+
+
+class EmailIndex:
+    """{lower-cased email: row} over the users table."""
+
+    def __init__(self, rows=()):
+        self.by_email = {}
+        for row in rows:
+            self.add(row)
+
+    def add(self, row):
+        self.by_email[(row.get('email') or '').lower()] = row
+
+    def discard(self, row):
+        key = (row.get('email') or '').lower()
+        if self.by_email.get(key) is row:
+            del self.by_email[key]
+
+
+def find_user(email):
+    """Return the (read-only) user row for an email, ignoring case, or None."""
+    index = data_store.get_maintained(USERS_FILE, 'by_email', EmailIndex)
+    return index.by_email.get(email.strip().lower())
+
+
+def set_password(email, password_hash):
+    """Replace a user's stored password hash, rewriting the table. Returns success."""
+    key = email.strip().lower()
+    with data_lock():
+        users = load_csv_data(USERS_FILE)
+        for user in users:
+            if user['email'].lower() == key:
+                user['password'] = password_hash
+                break
+        else:
+            return False
+        return save_csv_data(USERS_FILE, users, data_store.get_fieldnames(USERS_FILE))